@@ -2,27 +2,24 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from .models import CustomUser
 from services.models import ServiceOrder
+from core.admin_inlines import LatestRowsInline
 from import_export.admin import ImportExportModelAdmin
 
 
-class ServiceOrderInline(admin.TabularInline):
+class ServiceOrderInline(LatestRowsInline):
     """
-    Displays a user's order history on their detail page.
+    Displays a user's latest orders on their detail page, with a link to the rest.
     """
     model = ServiceOrder
-    extra = 0  # Don't show empty forms for adding new orders here
     
     # --- FIX: Corrected field names to match your services/models.py ---
     fields = ('id', 'service', 'progress_status', 'created_at')
     readonly_fields = ('id', 'service', 'progress_status', 'created_at')
+    ordering = ('-created_at',)
+    list_select_related = ('service__category', 'user')  # Service.__str__ shows its category
 
-    can_delete = False # Prevent deleting orders from the user page
     show_change_link = True # Add a link to the full order detail page
 
-    def has_add_permission(self, request, obj=None):
-        # Disable the ability to add orders from the user page
-        return False
-
 
 class CustomUserAdmin(ImportExportModelAdmin, UserAdmin):
     model = CustomUser
@@ -0,0 +1,85 @@
+# accounts/management/commands/send_queued_emails.py
+
+import time
+from datetime import timedelta
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from accounts.outbox import RETENTION, build_message, claim_emails, mark_failed, mark_sent, purge_emails
+
+# How often a long-running worker deletes old sent/failed rows.
+PURGE_INTERVAL = 3600
+
+
+class Command(BaseCommand):
+    help = 'Worker that delivers queued emails (see accounts.outbox) over one reused connection.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help='Messages claimed per round.')
+        parser.add_argument('--sleep', type=float, default=1.0, help='Seconds to wait when the outbox is empty.')
+        parser.add_argument('--once', action='store_true', help='Drain the due messages and exit instead of polling.')
+        parser.add_argument(
+            '--keep-days', type=int, default=RETENTION.days,
+            help='Delete sent and failed messages older than this many days.',
+        )
+        parser.add_argument(
+            '--backend',
+            help="Email backend to deliver with, e.g. 'django.core.mail.backends.console.EmailBackend'. "
+                 "Defaults to settings.EMAIL_BACKEND.",
+        )
+
+    def handle(self, *args, **options):
+        connection = get_connection(backend=options['backend'])
+        sent = failed = 0
+        retention = timedelta(days=options['keep_days'])
+        last_purge = None
+        self.stdout.write("Email worker started.")
+
+        try:
+            while True:
+                if last_purge is None or time.monotonic() - last_purge >= PURGE_INTERVAL:
+                    purged = purge_emails(retention)
+                    last_purge = time.monotonic()
+                    if purged:
+                        self.stdout.write(f"Purged {purged} old message(s).")
+
+                emails = claim_emails(options['batch_size'])
+                if not emails:
+                    if options['once']:
+                        break
+                    # Don't hold an idle SMTP session open while waiting for work.
+                    connection.close()
+                    time.sleep(options['sleep'])
+                    continue
+
+                # open() is a no-op while the session is still up, so the TLS
+                # handshake and login happen once per busy period, not per email.
+                try:
+                    connection.open()
+                except Exception as e:
+                    for email in emails:
+                        mark_failed(email, e)
+                    failed += len(emails)
+                    self.stderr.write(self.style.ERROR(f"Could not connect to the mail server: {e}"))
+                    if options['once']:
+                        break
+                    time.sleep(options['sleep'])
+                    continue
+
+                for email in emails:
+                    try:
+                        build_message(email, connection=connection).send()
+                    except Exception as e:
+                        mark_failed(email, e)
+                        failed += 1
+                        self.stderr.write(self.style.WARNING(f"Email #{email.pk} to {email.to} failed: {e}"))
+                        # The session may be broken; the next send() reconnects.
+                        connection.close()
+                    else:
+                        mark_sent(email)
+                        sent += 1
+        finally:
+            connection.close()
+
+        self.stdout.write(self.style.SUCCESS(f"Outbox drained: {sent} sent, {failed} failed."))
@@ -1,6 +1,7 @@
 # accounts/models.py
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.db import models
+from django.utils import timezone
 from .utils import generate_customer_id
 
 class CustomUserManager(BaseUserManager):
@@ -64,3 +65,37 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
             self.customer_id = generate_customer_id()
         super().save(*args, **kwargs)
 
+
+
+class OutboundEmail(models.Model):
+    """
+    An email waiting to be delivered by the send_queued_emails worker, so
+    request handlers never block on the SMTP dialog.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+
+    to = models.JSONField(help_text="List of recipient addresses.")
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    is_html = models.BooleanField(default=False)
+    from_email = models.CharField(max_length=255, blank=True)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'run_after'])]
+        ordering = ['run_after']
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
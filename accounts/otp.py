@@ -0,0 +1,69 @@
+# accounts/otp.py
+
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare, get_random_string, salted_hmac
+
+OTP_TTL = 300  # seconds an OTP stays valid
+OTP_MAX_ATTEMPTS = 5
+VERIFIED_TTL = 600  # seconds a verified OTP may still be used to reset the password
+
+
+def _key(scope, identifier, part):
+    return f"otp:{scope}:{identifier}:{part}"
+
+
+def _hash(scope, identifier, code):
+    # Only a keyed hash is kept in the cache, never the code itself.
+    return salted_hmac(f"otp:{scope}", f"{identifier}:{code}").hexdigest()
+
+
+def issue_otp(scope, identifier):
+    """
+    Generates a 6-digit OTP for (scope, identifier), replacing any earlier one,
+    and returns the plain code so the caller can send it.
+    """
+    code = get_random_string(length=6, allowed_chars="0123456789")
+    cache.set(_key(scope, identifier, 'hash'), _hash(scope, identifier, code), timeout=OTP_TTL)
+    cache.set(_key(scope, identifier, 'attempts'), 0, timeout=OTP_TTL)
+    cache.delete(_key(scope, identifier, 'verified'))
+    return code
+
+
+def verify_otp(scope, identifier, code):
+    """
+    Checks a submitted code. Returns (ok, message). After OTP_MAX_ATTEMPTS wrong
+    guesses the OTP is discarded and a new one must be requested.
+    """
+    stored_hash = cache.get(_key(scope, identifier, 'hash'))
+    if stored_hash is None:
+        return False, "OTP has expired or was not sent. Please request a new one."
+
+    try:
+        attempts = cache.incr(_key(scope, identifier, 'attempts'))
+    except ValueError:
+        attempts = 1
+        cache.set(_key(scope, identifier, 'attempts'), attempts, timeout=OTP_TTL)
+    if attempts > OTP_MAX_ATTEMPTS:
+        discard_otp(scope, identifier)
+        return False, "Too many incorrect attempts. Please request a new OTP."
+
+    if not constant_time_compare(stored_hash, _hash(scope, identifier, code or '')):
+        return False, "Invalid OTP."
+
+    cache.delete_many([_key(scope, identifier, 'hash'), _key(scope, identifier, 'attempts')])
+    cache.set(_key(scope, identifier, 'verified'), True, timeout=VERIFIED_TTL)
+    return True, "OTP verified."
+
+
+def is_otp_verified(scope, identifier):
+    """True if verify_otp() succeeded for this identifier and it hasn't been consumed."""
+    return bool(cache.get(_key(scope, identifier, 'verified')))
+
+
+def discard_otp(scope, identifier):
+    """Forgets every trace of the OTP, e.g. once the password has been reset."""
+    cache.delete_many([
+        _key(scope, identifier, 'hash'),
+        _key(scope, identifier, 'attempts'),
+        _key(scope, identifier, 'verified'),
+    ])
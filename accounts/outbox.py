@@ -0,0 +1,98 @@
+# accounts/outbox.py
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+# Retry delay is RETRY_BASE_DELAY * 2 ** (attempts - 1), capped at RETRY_MAX_DELAY.
+RETRY_BASE_DELAY = timedelta(seconds=15)
+RETRY_MAX_DELAY = timedelta(minutes=30)
+# A message still "sending" after this long belongs to a worker that died; reclaim it.
+SENDING_TIMEOUT = timedelta(minutes=5)
+# Sent and failed rows are deleted this long after they were queued.
+RETENTION = timedelta(days=7)
+
+
+def queue_email(subject, body, to, html=False, from_email=None):
+    """
+    Stores an email for the send_queued_emails worker and returns immediately.
+    `to` may be a single address or a list of addresses.
+    """
+    if isinstance(to, str):
+        to = [to]
+    return OutboundEmail.objects.create(
+        to=list(to),
+        subject=subject,
+        body=body,
+        is_html=html,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+    )
+
+
+def claim_emails(limit):
+    """
+    Marks up to `limit` due messages as sending and returns them. Rows locked
+    by another worker are skipped, so several workers can drain the outbox.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status='pending', run_after__lte=now)
+                | Q(status='sending', run_after__lt=now - SENDING_TIMEOUT)
+            )
+            .order_by('run_after')[:limit]
+        )
+        if emails:
+            OutboundEmail.objects.filter(pk__in=[email.pk for email in emails]).update(status='sending', run_after=now)
+    return emails
+
+
+def build_message(email, connection=None):
+    msg = EmailMessage(
+        email.subject,
+        email.body,
+        email.from_email or settings.DEFAULT_FROM_EMAIL,
+        email.to,
+        connection=connection,
+    )
+    if email.is_html:
+        msg.content_subtype = "html"
+    return msg
+
+
+def mark_sent(email):
+    email.attempts += 1
+    email.status = 'sent'
+    email.sent_at = timezone.now()
+    email.last_error = ''
+    # Bodies can carry OTP codes; don't keep them once they can't be sent again.
+    email.body = ''
+    email.save(update_fields=['attempts', 'status', 'sent_at', 'last_error', 'body'])
+
+
+def mark_failed(email, error):
+    """Reschedules the message with exponential backoff, or gives up after max_attempts."""
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= email.max_attempts:
+        email.status = 'failed'
+        email.body = ''
+    else:
+        email.status = 'pending'
+        email.run_after = timezone.now() + min(RETRY_BASE_DELAY * 2 ** (email.attempts - 1), RETRY_MAX_DELAY)
+    email.save(update_fields=['attempts', 'status', 'last_error', 'run_after', 'body'])
+
+
+def purge_emails(older_than=RETENTION):
+    """Deletes sent and failed messages queued more than `older_than` ago. Returns how many."""
+    cutoff = timezone.now() - older_than
+    deleted, _ = OutboundEmail.objects.filter(status__in=('sent', 'failed'), created_at__lt=cutoff).delete()
+    return deleted
@@ -1,38 +1,39 @@
 import datetime
-from django.db import transaction
+
+def _customer_id_prefix():
+    return f"CUS-{datetime.date.today().year}"
+
 
 def generate_customer_id():
     """
     Generates a unique B2C Customer ID in the format CUS-YYYY-NNNNN.
     e.g., CUS-2025-00001
+    The sequence comes from a per-year counter, so no user rows are scanned or locked.
     """
-    from .models import CustomUser # Or whatever your user model is named
+    from core.sequences import next_value
 
-    current_year = datetime.date.today().year
-    prefix = f"CUS-{current_year}"
+    prefix = _customer_id_prefix()
+    return f"{prefix}-{next_value(prefix):05d}"
 
-    with transaction.atomic():
-        # Filter for B2C users only if you have a way to distinguish them (e.g., user_type field)
-        last_user = CustomUser.objects.select_for_update().filter(customer_id__startswith=prefix).order_by('customer_id').last()
 
-        if last_user and last_user.customer_id:
-            last_sequence = int(last_user.customer_id.split('-')[-1])
-            new_sequence = last_sequence + 1
-        else:
-            new_sequence = 1
+def reserve_customer_ids(n):
+    """Allocates `n` customer IDs in one round trip, for bulk imports."""
+    from core.sequences import reserve_block
 
-    return f"{prefix}-{new_sequence:05d}"
+    prefix = _customer_id_prefix()
+    return [f"{prefix}-{sequence:05d}" for sequence in reserve_block(prefix, n)]
 
 # accounts/utils.py
 
-from django.core.mail import EmailMessage
 from django.template.loader import render_to_string
-from django.conf import settings
 
 def send_otp_email(email, otp, context="Profile Update"):
     """
-    Sends an OTP email using a styled HTML template.
+    Queues an OTP email using a styled HTML template. Delivery happens in the
+    send_queued_emails worker, so the request never waits on SMTP.
     """
+    from .outbox import queue_email
+
     # Prepare the email context to be passed to the template
     template_context = {
         'otp': otp,
@@ -43,21 +44,4 @@ def send_otp_email(email, otp, context="Profile Update"):
     html_content = render_to_string('accounts/otp_profile_update.html', template_context)
     
     subject = f"Your OTP for {context} - LegalMunshi"
-    from_email = settings.DEFAULT_FROM_EMAIL
-    
-    # Create the EmailMessage object
-    msg = EmailMessage(
-        subject,
-        html_content,  # Use the rendered HTML content
-        from_email,
-        [email]
-    )
-    
-    # Set the content type to HTML
-    msg.content_subtype = "html"
-    
-    try:
-        msg.send()
-        print(f"OTP email sent to {email} successfully!")
-    except Exception as e:
-        print(f"Failed to send email: {e}")
\ No newline at end of file
+    queue_email(subject, html_content, email, html=True)
@@ -21,6 +21,7 @@ from django.core.cache import cache
 from django.core.mail import send_mail
 from django.db.models import Q
 from .utils import generate_customer_id,send_otp_email
+from .otp import discard_otp, is_otp_verified, issue_otp, verify_otp as verify_otp_code
 from django.core.mail import send_mail
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist 
@@ -138,10 +139,7 @@ def verify_otp(request):
             last_name=temp_data['last_name'],
             password=temp_data['password1']  # create_user hashes it
         )
-
-         # Generate and assign the unique B2C customer ID
-        user.customer_id = generate_customer_id()
-        user.save()
+        # CustomUser.save() has already assigned the unique B2C customer ID
 
         
 
@@ -294,8 +292,8 @@ def logout_view(request):
 # --- B2C FORGOT PASSWORD (EMAIL ONLY) ---
 User = get_user_model()
 
-# Temporary OTP store (use DB/cache in production)
-otp_store = {}
+# OTPs live in the shared cache (see accounts.otp), so any worker can verify them
+PASSWORD_RESET_OTP_SCOPE = "password_reset"
 
 
 def reset_password_view(request):
@@ -322,8 +320,7 @@ def ajax_send_otp(request):
         except User.DoesNotExist:
             return JsonResponse({"success": False, "message": "No account found with that email."})
 
-        otp = get_random_string(length=6, allowed_chars="0123456789")
-        otp_store[user.id] = otp
+        otp = issue_otp(PASSWORD_RESET_OTP_SCOPE, user.id)
         send_otp_email(user.email, otp, context="Password Reset")
         return JsonResponse({"success": True, "message": "OTP sent to your registered email."})
     return JsonResponse({"success": False, "message": "Invalid request method."})
@@ -339,10 +336,8 @@ def ajax_verify_otp(request):
         except User.DoesNotExist:
             return JsonResponse({"success": False, "message": "Account not found."})
 
-        if otp_store.get(user.id) == otp_entered:
-            return JsonResponse({"success": True, "message": "OTP verified."})
-        else:
-            return JsonResponse({"success": False, "message": "Invalid OTP."})
+        verified, message = verify_otp_code(PASSWORD_RESET_OTP_SCOPE, user.id, otp_entered)
+        return JsonResponse({"success": verified, "message": message})
     return JsonResponse({"success": False, "message": "Invalid request method."})
 
 def ajax_reset_password(request):
@@ -356,8 +351,11 @@ def ajax_reset_password(request):
         except User.DoesNotExist:
             return JsonResponse({"success": False, "message": "Account not found."})
 
+        if not is_otp_verified(PASSWORD_RESET_OTP_SCOPE, user.id):
+            return JsonResponse({"success": False, "message": "Please verify the OTP first."})
+
         user.password = make_password(new_password)
         user.save()
-        otp_store.pop(user.id, None)
+        discard_otp(PASSWORD_RESET_OTP_SCOPE, user.id)
         return JsonResponse({"success": True, "message": "Password updated successfully."})
     return JsonResponse({"success": False, "message": "Invalid request method."})
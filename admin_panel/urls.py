@@ -14,6 +14,11 @@ urlpatterns = [
     # 👇 This is the correct route for service categories management
     path("service-categories/", views.service_category_list, name="service_category_list"),
      path('services/', views.service_list, name='service_list'),
+
+    # Streamed CSV/XLSX exports (?format=xlsx, ?since=/?until=YYYY-MM-DD)
+    path("exports/orders/", views.export_orders, name="export_orders"),
+    path("exports/customers/", views.export_customers, name="export_customers"),
+    path("exports/wallet-transactions/", views.export_wallet_transactions, name="export_wallet_transactions"),
 ]
 
 
@@ -1,10 +1,17 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required, user_passes_test
-from django.db.models import Sum
 from services.models import ServiceOrder
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
 from services.models import ServiceCategory
+from django.utils.dateparse import parse_date
+from core.exports import export_response
+from partner.exports import (
+    CUSTOMER_EXPORT_COLUMNS, WALLET_TRANSACTION_EXPORT_COLUMNS,
+    customer_export_queryset, wallet_transaction_export_queryset,
+)
+from services.exports import ORDER_EXPORT_COLUMNS, order_export_queryset
+from services.stats import get_dashboard_stats
 
 
 
@@ -44,26 +51,7 @@ def staff_required(view_func):
 
 @staff_required
 def dashboard(request):
-    total_orders = ServiceOrder.objects.count()
-    pending_orders = ServiceOrder.objects.filter(status='pending').count()
-    completed_orders = ServiceOrder.objects.filter(status='paid').count()
-    rejected_orders = ServiceOrder.objects.filter(status='cancelled').count()
-    
-    # Only sum sales of paid orders
-    total_sales = ServiceOrder.objects.filter(status='paid').aggregate(
-        total=Sum('service__price_user')
-    )['total'] or 0
-
-    recent_orders = ServiceOrder.objects.select_related('service', 'user').order_by('-created_at')[:5]
-
-    context = {
-        "total_orders": total_orders,
-        "pending_orders": pending_orders,
-        "completed_orders": completed_orders,
-        "rejected_orders": rejected_orders,
-        "total_sales": total_sales,
-        "recent_orders": recent_orders,
-    }
+    context = get_dashboard_stats()
     return render(request, "admin_panel/dashboard.html", context)
 
 from django.shortcuts import render
@@ -93,4 +81,38 @@ def service_category_list(request):
 @user_passes_test(lambda u: u.is_staff, login_url='admin_panel:login')
 def service_list(request):
     # Fetch your Service objects here once the model is ready
-    return render(request, 'admin_panel/service_list.html', {})
\ No newline at end of file
+    return render(request, 'admin_panel/service_list.html', {})
+
+
+# --- Full data exports (streamed; memory stays flat however many rows) ---
+
+def _created_range(request, queryset, field):
+    """Applies optional ?since=YYYY-MM-DD&until=YYYY-MM-DD filters on a date field."""
+    since = parse_date(request.GET.get('since') or '')
+    until = parse_date(request.GET.get('until') or '')
+    if since:
+        queryset = queryset.filter(**{f'{field}__date__gte': since})
+    if until:
+        queryset = queryset.filter(**{f'{field}__date__lte': until})
+    return queryset
+
+@login_required(login_url='admin_panel:login')
+@user_passes_test(lambda u: u.is_staff, login_url='admin_panel:login')
+def export_orders(request):
+    orders = _created_range(request, order_export_queryset(), 'created_at')
+    payment_status = request.GET.get('payment_status')
+    if payment_status:
+        orders = orders.filter(payment_status=payment_status)
+    return export_response(request, orders, ORDER_EXPORT_COLUMNS, "all-orders")
+
+@login_required(login_url='admin_panel:login')
+@user_passes_test(lambda u: u.is_staff, login_url='admin_panel:login')
+def export_customers(request):
+    customers = _created_range(request, customer_export_queryset(), 'created_at')
+    return export_response(request, customers, CUSTOMER_EXPORT_COLUMNS, "all-customers")
+
+@login_required(login_url='admin_panel:login')
+@user_passes_test(lambda u: u.is_staff, login_url='admin_panel:login')
+def export_wallet_transactions(request):
+    transactions = _created_range(request, wallet_transaction_export_queryset(), 'timestamp')
+    return export_response(request, transactions, WALLET_TRANSACTION_EXPORT_COLUMNS, "wallet-transactions")
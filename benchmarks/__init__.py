@@ -0,0 +1,8 @@
+"""
+End-to-end benchmarks for the order funnel.
+
+Run with `python manage.py bench_funnel`. The command creates a throwaway
+test database, seeds it (benchmarks.fixtures), drives the views through the
+Django test client (benchmarks.scenarios) and writes a JSON report to
+benchmarks/results/ that later runs can be compared against with --compare.
+"""
@@ -0,0 +1,69 @@
+# benchmarks/fixtures.py
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+
+from partner.models import Customer, Partner, PartnerPlan, PartnerSubscription, PartnerWallet
+from services.models import DynamicServiceField, RequiredDocument, Service, ServiceCategory
+
+User = get_user_model()
+
+PASSWORD = "bench-password"
+
+
+def seed_funnel_data(categories=5, services_per_category=8):
+    """
+    Creates the catalog and the two actors the scenarios log in as: a B2C
+    customer and an approved partner with a funded wallet and one customer.
+    Returns the ids and credentials the scenarios need.
+    """
+    services = []
+    for c in range(categories):
+        category = ServiceCategory.objects.create(name=f"Bench Category {c}", icon_class="fa-solid fa-scale-balanced")
+        for s in range(services_per_category):
+            services.append(Service.objects.create(
+                category=category,
+                title=f"Bench Service {c}-{s}",
+                short_description="Benchmark service.",
+                long_description="Benchmark service. " * 50,
+                price_user=Decimal('999.00'),
+                price_partner_default=Decimal('799.00'),
+                order=s,
+            ))
+
+    service = services[0]
+    RequiredDocument.objects.create(service=service, name="Aadhaar Card", is_mandatory=True)
+    RequiredDocument.objects.create(service=service, name="PAN Card", is_mandatory=False)
+    DynamicServiceField.objects.create(service=service, name="father_name", label="Father's Name", is_mandatory=True)
+    DynamicServiceField.objects.create(
+        service=service, name="address", label="Address", field_type='textarea', is_mandatory=False
+    )
+
+    customer_user = User.objects.create_user(
+        email="bench.customer@example.com", phone="9000000001", password=PASSWORD,
+        first_name="Bench", last_name="Customer",
+    )
+
+    partner_user = User.objects.create_user(
+        email="bench.partner@example.com", phone="9000000002", password=PASSWORD,
+        user_type='partner', is_partner_approved=True,
+    )
+    partner = Partner.objects.create(user=partner_user, business_name="Bench Associates", city="Pune")
+    # Enough balance that every wallet payment in the run succeeds
+    PartnerWallet.objects.create(partner=partner, balance=Decimal('10000000.00'))
+    plan = PartnerPlan.objects.create(
+        name="Bench Plan", plan_type=PartnerPlan.PlanType.SUBSCRIPTION, price=Decimal('0.00'), duration_days=365
+    )
+    PartnerSubscription.objects.create(partner=partner, plan=plan, is_active=True)
+    customer = Customer.objects.create(
+        partner=partner, full_name="Bench Client", email="bench.client@example.com", phone="9000000003"
+    )
+
+    return {
+        'service_slug': service.slug,
+        'customer_email': customer_user.email,
+        'partner_email': partner_user.email,
+        'password': PASSWORD,
+        'partner_customer_id': customer.pk,
+    }
@@ -0,0 +1,130 @@
+# benchmarks/runner.py
+
+import math
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from .scenarios import SCENARIOS
+
+
+class BenchmarkError(Exception):
+    """A step returned an unexpected status, so the numbers would be meaningless."""
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class Recorder:
+    """Collects (latency ms, query count) samples per step from any number of threads."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def fetcher(self, client, record=True):
+        def fetch(step, method, url, **kwargs):
+            # secure=True: production settings redirect plain http to https
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = getattr(client, method)(url, secure=True, **kwargs)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+            if response.status_code >= 400:
+                raise BenchmarkError(f"{step}: {method.upper()} {url} returned {response.status_code}")
+            if method == 'post' and response.status_code == 200:
+                # Our POST steps all redirect on success; a 200 is a re-rendered form.
+                raise BenchmarkError(f"{step}: POST {url} was rejected (form errors?)")
+            if record:
+                with self._lock:
+                    self.samples[step].append((elapsed_ms, len(captured)))
+            return response
+        return fetch
+
+
+def _worker(recorder, scenario_names, data, iterations, warmup):
+    User = get_user_model()
+    try:
+        for name in scenario_names:
+            scenario, logs_in = SCENARIOS[name]
+            client = Client()
+            if not logs_in:
+                client.force_login(User.objects.get(email=data['customer_email']))
+            for i in range(warmup + iterations):
+                scenario(recorder.fetcher(client, record=i >= warmup), data)
+    finally:
+        connection.close()
+
+
+def run_benchmark(data, scenario_names, iterations=20, warmup=2, threads=1):
+    """
+    Runs every scenario `iterations` times per thread (after `warmup`
+    unrecorded passes) and returns the summary dict written to the report.
+    """
+    recorder = Recorder()
+    started = time.perf_counter()
+    if threads == 1:
+        # Stay on this thread so the test database connection is reused as-is.
+        _worker(recorder, scenario_names, data, iterations, warmup)
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            futures = [
+                pool.submit(_worker, recorder, scenario_names, data, iterations, warmup)
+                for _ in range(threads)
+            ]
+            for future in futures:
+                future.result()
+    wall_seconds = time.perf_counter() - started
+    return summarize(recorder.samples, wall_seconds, threads)
+
+
+def summarize(samples, wall_seconds, threads):
+    steps = {}
+    total_requests = 0
+    for step, values in samples.items():
+        latencies = sorted(ms for ms, _ in values)
+        queries = [count for _, count in values]
+        total_requests += len(values)
+        steps[step] = {
+            'requests': len(values),
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'mean_queries': round(sum(queries) / len(queries), 2),
+            'max_queries': max(queries),
+        }
+    return {
+        'threads': threads,
+        'wall_seconds': round(wall_seconds, 3),
+        'requests': total_requests,
+        # Includes warmup passes in the wall time, so it slightly understates throughput.
+        'throughput_rps': round(total_requests / wall_seconds, 2) if wall_seconds else 0.0,
+        'steps': steps,
+    }
+
+
+def compare(current, baseline, tolerance=0.10):
+    """
+    Returns human-readable regressions of `current` against `baseline`: any
+    step whose query count grew, or whose p95 grew by more than `tolerance`.
+    """
+    regressions = []
+    for step, now in current['steps'].items():
+        before = baseline.get('steps', {}).get(step)
+        if not before:
+            continue
+        if now['max_queries'] > before['max_queries']:
+            regressions.append(f"{step}: queries {before['max_queries']} -> {now['max_queries']}")
+        if before['p95_ms'] and now['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{step}: p95 {before['p95_ms']:.1f} ms -> {now['p95_ms']:.1f} ms")
+    return regressions
@@ -0,0 +1,77 @@
+# benchmarks/scenarios.py
+
+"""
+Each scenario walks one user journey. `fetch(step, method, url, **kwargs)`
+is supplied by the runner: it issues the request through the scenario's test
+client, records latency and query count under `step`, and returns the response.
+"""
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import resolve, reverse
+
+
+def _order_id_from(response):
+    # service_order_create redirects to services:checkout on success
+    return resolve(response['Location']).kwargs['order_id']
+
+
+def _order_form_data(full_name, email, phone):
+    return {
+        'full_name': full_name,
+        'email': email,
+        'phone': phone,
+        'additional_info': "Submitted by the benchmark.",
+        'dynamic_field_father_name': "Bench Father",
+        'dynamic_field_address': "1 Benchmark Road",
+        'document_aadhaar-card': SimpleUploadedFile("aadhaar.pdf", b"%PDF-1.4 bench", content_type="application/pdf"),
+    }
+
+
+def customer_order(fetch, data):
+    """B2C: browse the catalog, fill the order form and hand off to the gateway."""
+    slug = data['service_slug']
+    apply_url = reverse('services:apply', args=[slug])
+
+    fetch('services:list', 'get', reverse('services:list'))
+    fetch('services:info', 'get', reverse('services:info', args=[slug]))
+    fetch('services:apply [GET]', 'get', apply_url)
+    response = fetch(
+        'services:apply [POST]', 'post', apply_url,
+        data=_order_form_data("Bench Customer", data['customer_email'], "9000000001"),
+    )
+    order_id = _order_id_from(response)
+    fetch('services:checkout', 'get', reverse('services:checkout', args=[order_id]))
+    fetch(
+        'services:process_payment [gateway]', 'post', reverse('services:process_payment', args=[order_id]),
+        data={'payment_method': 'gateway'},
+    )
+
+
+def partner_order(fetch, data):
+    """Partner: log in, open the dashboard, order for a customer and pay from the wallet."""
+    slug = data['service_slug']
+    customer_query = f"?customer_id={data['partner_customer_id']}"
+    apply_url = reverse('services:apply', args=[slug]) + customer_query
+
+    fetch('partner:login', 'post', reverse('partner:login'), data={
+        'email': data['partner_email'], 'password': data['password'],
+    })
+    fetch('partner:dashboard', 'get', reverse('partner:dashboard'))
+    fetch('services:info [partner]', 'get', reverse('services:info', args=[slug]) + customer_query)
+    response = fetch(
+        'services:apply [partner POST]', 'post', apply_url,
+        data=_order_form_data("Bench Client", "bench.client@example.com", "9000000003"),
+    )
+    order_id = _order_id_from(response)
+    fetch('services:checkout [partner]', 'get', reverse('services:checkout', args=[order_id]))
+    fetch(
+        'services:process_payment [wallet]', 'post', reverse('services:process_payment', args=[order_id]),
+        data={'payment_method': 'wallet'},
+    )
+
+
+# name -> (scenario, logs in by itself)
+SCENARIOS = {
+    'customer_order': (customer_order, False),
+    'partner_order': (partner_order, True),
+}
@@ -0,0 +1,64 @@
+# core/admin_inlines.py
+
+from django.contrib import admin
+from django.forms.models import BaseInlineFormSet
+from django.urls import reverse
+
+
+class LatestRowsFormSet(BaseInlineFormSet):
+    """Inline formset that only loads the first `max_rows` related rows."""
+
+    max_rows = 20
+
+    def get_queryset(self):
+        if not hasattr(self, '_limited_queryset'):
+            self._limited_queryset = super().get_queryset()[:self.max_rows]
+            # Forms, existing-object lookups and saving all reuse this one slice.
+            self._queryset = self._limited_queryset
+        return self._limited_queryset
+
+    @property
+    def total_count(self):
+        if not hasattr(self, '_total_count'):
+            rows = len(self.get_queryset())
+            self._total_count = rows if rows < self.max_rows else self.queryset.count()
+        return self._total_count
+
+    @property
+    def is_truncated(self):
+        return self.total_count > self.max_rows
+
+
+class LatestRowsInline(admin.TabularInline):
+    """
+    Read-only tabular inline showing the latest `max_rows` related rows (by
+    `ordering`) with a "view all" link to the changelist filtered to the
+    parent, so change pages render in bounded time however many rows exist.
+    List every FK the row or its __str__ displays in `list_select_related`.
+    """
+
+    template = 'admin/edit_inline/latest_rows_tabular.html'
+    formset = LatestRowsFormSet
+    max_rows = 20
+    list_select_related = ()
+    extra = 0
+    can_delete = False
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if self.list_select_related:
+            queryset = queryset.select_related(*self.list_select_related)
+        return queryset
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.max_rows = self.max_rows
+        opts = self.model._meta
+        if obj is not None:
+            formset.changelist_url = '{}?{}__id__exact={}'.format(
+                reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist'), formset.fk.name, obj.pk,
+            )
+        return formset
+
+    def has_add_permission(self, request, obj=None):
+        return False
@@ -9,4 +9,7 @@ class CoreConfig(AppConfig):
         from .admin_setup import auto_register_models
 
         # 2. Call the new, corrected function.
-        auto_register_models()
\ No newline at end of file
+        auto_register_models()
+
+        from .middleware import instrument_templates
+        instrument_templates()
\ No newline at end of file
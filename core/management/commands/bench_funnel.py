@@ -0,0 +1,110 @@
+# core/management/commands/bench_funnel.py
+
+import contextlib
+import io
+import json
+import os
+import subprocess
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from benchmarks.fixtures import seed_funnel_data
+from benchmarks.runner import BenchmarkError, compare, run_benchmark
+from benchmarks.scenarios import SCENARIOS
+
+RESULTS_DIR = os.path.join(settings.BASE_DIR, 'benchmarks', 'results')
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the order funnel end to end against a freshly seeded test database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                            help='Scenario to run; repeatable. Defaults to all of them.')
+        parser.add_argument('--iterations', type=int, default=20, help='Recorded passes per scenario and thread.')
+        parser.add_argument('--warmup', type=int, default=2, help='Unrecorded passes first (caches, form classes).')
+        parser.add_argument('--threads', type=int, default=1,
+                            help='Concurrent clients. Use with PostgreSQL; SQLite serialises writers.')
+        parser.add_argument('--output', help='Report path. Defaults to benchmarks/results/<time>-<revision>.json.')
+        parser.add_argument('--compare', metavar='REPORT', help='Earlier report to check for regressions.')
+
+    def handle(self, *args, **options):
+        scenario_names = options['scenario'] or sorted(SCENARIOS)
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            # Uploaded order documents go to a scratch directory, not MEDIA_ROOT.
+            with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+                data = seed_funnel_data()
+                # Some views still print debug output; keep it out of the report.
+                with contextlib.redirect_stdout(io.StringIO()):
+                    summary = run_benchmark(
+                        data, scenario_names,
+                        iterations=options['iterations'], warmup=options['warmup'], threads=options['threads'],
+                    )
+        except BenchmarkError as e:
+            raise CommandError(str(e))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        revision = _git_revision()
+        report = {
+            'revision': revision,
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'scenarios': scenario_names,
+            'iterations': options['iterations'],
+            **summary,
+        }
+
+        self._print_report(report)
+
+        output = options['output'] or os.path.join(
+            RESULTS_DIR, f"{timezone.now():%Y%m%d-%H%M%S}-{revision}.json"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Report written to {output}"))
+
+        if baseline:
+            regressions = compare(report, baseline)
+            if regressions:
+                self.stdout.write(self.style.WARNING(f"Regressions against {baseline.get('revision', '?')}:"))
+                for line in regressions:
+                    self.stdout.write(self.style.WARNING(f"  {line}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"No regressions against {baseline.get('revision', '?')}."))
+
+    def _print_report(self, report):
+        self.stdout.write(f"{'step':<38} {'n':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}")
+        for step, stats in report['steps'].items():
+            self.stdout.write(
+                f"{step:<38} {stats['requests']:>5} {stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} "
+                f"{stats['p99_ms']:>8.1f} {stats['mean_queries']:>8.1f}"
+            )
+        self.stdout.write(
+            f"{report['requests']} requests in {report['wall_seconds']:.1f}s "
+            f"({report['throughput_rps']:.1f} req/s, {report['threads']} thread(s))"
+        )
@@ -0,0 +1,507 @@
+# core/management/commands/seed_scale.py
+
+import random
+import time
+from array import array
+from bisect import bisect
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from accounts.utils import reserve_customer_ids
+from partner.models import (
+    Customer, Partner, PartnerPlan, PartnerSubscription, PartnerWallet, WalletTransaction,
+)
+from partner.stats import rebuild_partner_stats
+from partner.subscriptions import refresh_current_subscriptions
+from partner.utils import generate_partner_customer_ids, reserve_partner_ids
+from services.models import (
+    DynamicFieldResponse, DynamicServiceField, OrderDocument, RequiredDocument, Service, ServiceCategory,
+    ServiceOrder,
+)
+from services.rollups import rebuild_daily_stats
+
+User = get_user_model()
+
+FIRST_NAMES = [
+    "Aarav", "Vivaan", "Aditya", "Vihaan", "Arjun", "Sai", "Reyansh", "Krishna", "Ishaan", "Rohan",
+    "Ananya", "Diya", "Priya", "Saanvi", "Aadhya", "Kavya", "Isha", "Meera", "Neha", "Pooja",
+]
+LAST_NAMES = [
+    "Sharma", "Verma", "Patel", "Gupta", "Singh", "Kumar", "Reddy", "Nair", "Iyer", "Joshi",
+    "Mehta", "Shah", "Das", "Chopra", "Bose", "Kulkarni", "Rao", "Mishra", "Pandey", "Yadav",
+]
+CITIES = [
+    ("Mumbai", "Maharashtra"), ("Pune", "Maharashtra"), ("Delhi", "Delhi"), ("Bengaluru", "Karnataka"),
+    ("Chennai", "Tamil Nadu"), ("Hyderabad", "Telangana"), ("Kolkata", "West Bengal"),
+    ("Ahmedabad", "Gujarat"), ("Jaipur", "Rajasthan"), ("Lucknow", "Uttar Pradesh"),
+]
+
+# (value, weight) pairs for the order funnel outcome
+PAYMENT_STATUS_WEIGHTS = [('paid', 85), ('pending', 10), ('failed', 4), ('refunded', 1)]
+PROGRESS_WEIGHTS = [('completed', 60), ('in_progress', 25), ('placed', 12), ('cancelled', 3)]
+
+
+class WeightedChoice:
+    """Fast repeated sampling from a fixed list of (value, weight) pairs."""
+
+    def __init__(self, rng, pairs):
+        self.rng = rng
+        self.values = [value for value, _ in pairs]
+        self.cumulative = list(accumulate(weight for _, weight in pairs))
+        self.total = self.cumulative[-1]
+
+    def __call__(self):
+        return self.values[bisect(self.cumulative, self.rng.random() * self.total)]
+
+
+@contextmanager
+def historical_timestamps(*fields):
+    """
+    Lets bulk_create keep the timestamps we generate instead of auto_now(_add)
+    overwriting them with the current time.
+    """
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    try:
+        for field, _, _ in saved:
+            field.auto_now = field.auto_now_add = False
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _field(model, name):
+    return model._meta.get_field(name)
+
+
+def insert_rows(model, fields, rows):
+    """
+    Plain executemany INSERT for leaf rows whose pks are never needed back.
+    Skips bulk_create's per-value field preparation, which dominates at
+    millions of rows; callers pass values already adapted for the database.
+    """
+    if not rows:
+        return
+    qn = connection.ops.quote_name
+    columns = ", ".join(qn(_field(model, name).column) for name in fields)
+    placeholders = ", ".join(["%s"] * len(fields))
+    with connection.cursor() as cursor:
+        cursor.executemany(f"INSERT INTO {qn(model._meta.db_table)} ({columns}) VALUES ({placeholders})", rows)
+
+
+class Command(BaseCommand):
+    help = 'Generates production-scale synthetic partners, customers, orders and wallet history for load testing.'
+
+    TRANSACTION_FIELDS = ('wallet', 'transaction_type', 'amount', 'timestamp', 'details')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--partners', type=int, default=10_000)
+        parser.add_argument('--customers', type=int, default=1_000_000, help='Partner customers, spread over partners.')
+        parser.add_argument('--users', type=int, default=100_000, help='B2C customer accounts.')
+        parser.add_argument('--orders', type=int, default=5_000_000)
+        parser.add_argument('--partner-share', type=float, default=0.7, help='Fraction of orders placed by partners.')
+        parser.add_argument('--days', type=int, default=730, help='History length the orders are spread over.')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows per bulk_create/transaction.')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed, for reproducible data sets.')
+        parser.add_argument('--force', action='store_true', help='Run even when DEBUG is off.')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError("Refusing to seed synthetic data with DEBUG off. Pass --force if this is intended.")
+        if options['partners'] < 1 and options['customers']:
+            raise CommandError("Partner customers need at least one partner.")
+
+        self.rng = random.Random(options['seed'])
+        self.chunk_size = options['chunk_size']
+        self.now = timezone.now()
+        self.password = make_password(None)  # unusable; hashing once keeps user creation cheap
+        started = time.monotonic()
+
+        services = self._load_catalog()
+        partners = self._create_partners(options['partners'])
+        partner_customers = self._create_customers(partners, options['customers'])
+        b2c_users = self._create_b2c_users(options['users'])
+        wallet_spend = self._create_orders(
+            services, partners, partner_customers, b2c_users,
+            options['orders'], options['partner_share'], options['days'],
+        )
+        self._fund_wallets(partners, wallet_spend, options['days'])
+        # bulk_create skips the save signals that maintain the rollups.
+        if options['orders']:
+            self.stdout.write("Rebuilding daily order stats...")
+            rebuild_daily_stats()
+        self.stdout.write("Rebuilding partner stats...")
+        rebuild_partner_stats()
+
+        self.stdout.write(self.style.SUCCESS(f"Seeding finished in {time.monotonic() - started:.0f}s."))
+
+    # --- helpers -------------------------------------------------------------
+
+    def _progress(self, label, done, total, started):
+        rate = done / max(time.monotonic() - started, 1e-6)
+        self.stdout.write(f"  {label}: {done:,}/{total:,} ({rate:,.0f}/s)")
+
+    def _user_offset(self):
+        # Emails and phones are derived from ids above the current maximum, so
+        # repeated runs never collide with each other or with real accounts.
+        last = User.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        return last + 1
+
+    def db_datetime(self, value):
+        return connection.ops.adapt_datetimefield_value(value)
+
+    def _random_name(self):
+        return self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+
+    def _random_past(self, days):
+        # Density grows linearly towards today, like a growing business.
+        return self.now - timedelta(days=days * (1 - self.rng.random() ** 0.5))
+
+    def _pareto_weights(self, n, alpha=1.16):
+        # alpha ~1.16 gives the classic 80/20 split
+        return [self.rng.paretovariate(alpha) for _ in range(n)]
+
+    def _split(self, total, weights, minimum=0):
+        """Distributes `total` over len(weights) buckets in proportion to the weights."""
+        if not weights:
+            return []
+        floor = minimum * len(weights)
+        if floor > total:
+            minimum, floor = 0, 0
+        scale = (total - floor) / sum(weights)
+        counts = [minimum + int(weight * scale) for weight in weights]
+        for i in self.rng.sample(range(len(counts)), k=min(total - sum(counts), len(counts))):
+            counts[i] += 1
+        return counts
+
+    # --- catalog -------------------------------------------------------------
+
+    def _load_catalog(self):
+        services = list(Service.objects.filter(is_active=True).only('id', 'price_user', 'price_partner_default'))
+        if not services:
+            self.stdout.write("No active services found; creating a synthetic catalog...")
+            services = self._create_catalog()
+
+        dynamic_fields = {}
+        for field in DynamicServiceField.objects.filter(service__in=services).only('id', 'service_id', 'field_type'):
+            dynamic_fields.setdefault(field.service_id, []).append(field)
+        documents = {}
+        for doc in RequiredDocument.objects.filter(service__in=services).only('service_id', 'name', 'is_mandatory'):
+            documents.setdefault(doc.service_id, []).append((doc.name, slugify(doc.name), doc.is_mandatory))
+
+        for service in services:
+            service.seed_fields = dynamic_fields.get(service.pk, [])
+            service.seed_documents = documents.get(service.pk, [])
+
+        # Zipf-like popularity: a few services take most of the orders
+        self.rng.shuffle(services)
+        self.pick_service = WeightedChoice(
+            self.rng, [(service, 1 / (rank ** 1.1)) for rank, service in enumerate(services, start=1)]
+        )
+        self.stdout.write(f"Catalog: {len(services)} services.")
+        return services
+
+    def _create_catalog(self, categories=8, per_category=6):
+        services = []
+        for c in range(categories):
+            category = ServiceCategory.objects.create(name=f"Scale Category {c + 1}")
+            for s in range(per_category):
+                price = Decimal(self.rng.choice([499, 999, 1499, 2499, 4999]))
+                service = Service.objects.create(
+                    category=category, title=f"Scale Service {c + 1}.{s + 1}", order=s,
+                    price_user=price, price_partner_default=price * Decimal('0.8'),
+                )
+                RequiredDocument.objects.create(service=service, name="Aadhaar Card", is_mandatory=True)
+                RequiredDocument.objects.create(service=service, name="PAN Card", is_mandatory=s % 2 == 0)
+                DynamicServiceField.objects.create(service=service, name="father_name", label="Father's Name")
+                DynamicServiceField.objects.create(
+                    service=service, name="address", label="Address", field_type='textarea'
+                )
+                services.append(service)
+        return services
+
+    # --- partners and customers ---------------------------------------------
+
+    def _create_partners(self, total):
+        if not total:
+            return []
+        started = time.monotonic()
+        offset = self._user_offset()
+        plans = list(PartnerPlan.objects.all()) or [
+            PartnerPlan.objects.create(
+                name="Scale Annual", plan_type=PartnerPlan.PlanType.SUBSCRIPTION,
+                price=Decimal('4999.00'), duration_days=365,
+            ),
+            PartnerPlan.objects.create(
+                name="Scale Lifetime", plan_type=PartnerPlan.PlanType.LIFETIME, price=Decimal('24999.00'),
+            ),
+        ]
+        partners = []
+
+        with historical_timestamps(_field(User, 'date_joined')):
+            for start in range(0, total, self.chunk_size):
+                n = min(self.chunk_size, total - start)
+                with transaction.atomic():
+                    users = []
+                    for i in range(start, start + n):
+                        first, last = self._random_name()
+                        users.append(User(
+                            email=f"scale.partner{offset + i}@example.test", phone=f"+91{offset + i:012d}",
+                            first_name=first, last_name=last, password=self.password,
+                            user_type='partner', is_partner_approved=True,
+                            date_joined=self._random_past(1000),
+                        ))
+                    User.objects.bulk_create(users)
+
+                    chunk = []
+                    for user, partner_id in zip(users, reserve_partner_ids(n)):
+                        city, state = self.rng.choice(CITIES)
+                        chunk.append(Partner(
+                            user=user, partner_id=partner_id, city=city, state=state,
+                            business_name=f"{user.last_name} & Associates",
+                            pincode=f"{self.rng.randint(110001, 855999)}",
+                        ))
+                    Partner.objects.bulk_create(chunk)
+                    PartnerWallet.objects.bulk_create([PartnerWallet(partner=partner) for partner in chunk])
+
+                    subscriptions = []
+                    for partner, user in zip(chunk, users):
+                        plan = self.rng.choice(plans)
+                        end_date = user.date_joined + timedelta(days=plan.duration_days) if plan.duration_days else None
+                        subscriptions.append(PartnerSubscription(
+                            partner=partner, plan=plan, start_date=user.date_joined, end_date=end_date,
+                            is_active=end_date is None or end_date > self.now,
+                        ))
+                    PartnerSubscription.objects.bulk_create(subscriptions)
+                    refresh_current_subscriptions([partner.pk for partner in chunk])
+                partners.extend(chunk)
+                self._progress("partners", len(partners), total, started)
+
+        return partners
+
+    def _create_customers(self, partners, total):
+        """Returns one array of customer pks per partner (same order as `partners`)."""
+        partner_customers = [array('q') for _ in partners]
+        self.partner_weights = [1] * len(partners)
+        if not total:
+            return partner_customers
+        started = time.monotonic()
+        counts = self._split(total, self._pareto_weights(len(partners)), minimum=1)
+        self.partner_weights = counts
+
+        done = 0
+        buffer, owners = [], []
+
+        def flush():
+            nonlocal done
+            with historical_timestamps(_field(Customer, 'created_at')):
+                Customer.objects.bulk_create(buffer)
+            for owner, customer in zip(owners, buffer):
+                partner_customers[owner].append(customer.pk)
+            done += len(buffer)
+            buffer.clear()
+            owners.clear()
+            self._progress("customers", done, total, started)
+
+        for index, (partner, count) in enumerate(zip(partners, counts)):
+            if not count:
+                continue
+            joined = partner.user.date_joined
+            for customer_id in generate_partner_customer_ids(partner, count):
+                first, last = self._random_name()
+                buffer.append(Customer(
+                    partner=partner, partner_customer_id=customer_id,
+                    full_name=f"{first} {last}", email=f"{customer_id.lower()}@example.test",
+                    phone=f"9{self.rng.randint(0, 999_999_999):09d}",
+                    created_at=joined + (self.now - joined) * self.rng.random(),
+                ))
+                owners.append(index)
+                if len(buffer) >= self.chunk_size:
+                    flush()
+        if buffer:
+            flush()
+        return partner_customers
+
+    def _create_b2c_users(self, total):
+        users = array('q')
+        if not total:
+            return users
+        started = time.monotonic()
+        offset = self._user_offset()
+        with historical_timestamps(_field(User, 'date_joined')):
+            for start in range(0, total, self.chunk_size):
+                n = min(self.chunk_size, total - start)
+                chunk = []
+                for i, customer_id in zip(range(start, start + n), reserve_customer_ids(n)):
+                    first, last = self._random_name()
+                    chunk.append(User(
+                        email=f"scale.user{offset + i}@example.test", phone=f"+92{offset + i:012d}",
+                        first_name=first, last_name=last, password=self.password,
+                        customer_id=customer_id, date_joined=self._random_past(1000),
+                    ))
+                with transaction.atomic():
+                    User.objects.bulk_create(chunk)
+                users.extend(user.pk for user in chunk)
+                self._progress("b2c users", len(users), total, started)
+        return users
+
+    # --- orders --------------------------------------------------------------
+
+    def _create_orders(self, services, partners, partner_customers, b2c_users, total, partner_share, days):
+        """Creates the orders with their field responses and documents; returns wallet spend per partner."""
+        wallet_spend = [Decimal('0.00')] * len(partners)
+        if not total:
+            return wallet_spend
+        if not partners:
+            partner_share = 0.0
+        if not b2c_users:
+            partner_share = 1.0
+        if not partners and not b2c_users:
+            raise CommandError("Orders need partners or B2C users to belong to.")
+
+        started = time.monotonic()
+        pick_payment = WeightedChoice(self.rng, PAYMENT_STATUS_WEIGHTS)
+        pick_progress = WeightedChoice(self.rng, PROGRESS_WEIGHTS)
+        # Busy partners order more; partners without customers can't order
+        pick_partner = WeightedChoice(self.rng, [
+            (index, weight) for index, weight in enumerate(self.partner_weights)
+            if partner_customers[index]
+        ]) if partners and any(partner_customers) else None
+        if pick_partner is None:
+            partner_share = 0.0
+
+        timestamp_fields = (
+            _field(ServiceOrder, 'created_at'), _field(ServiceOrder, 'updated_at'),
+        )
+        done = 0
+        with historical_timestamps(*timestamp_fields):
+            for start in range(0, total, self.chunk_size):
+                n = min(self.chunk_size, total - start)
+                orders, wallet_payers = [], []
+                for _ in range(n):
+                    service = self.pick_service()
+                    created_at = self._random_past(days)
+                    payment_status = pick_payment()
+                    progress_status = pick_progress() if payment_status == 'paid' else 'placed'
+                    first, last = self._random_name()
+
+                    if self.rng.random() < partner_share:
+                        index = pick_partner()
+                        partner = partners[index]
+                        user_id = partner.user_id
+                        customer_id = self.rng.choice(partner_customers[index])
+                        price = service.price_partner_default
+                        paid_by_wallet = payment_status in ('paid', 'refunded') and self.rng.random() < 0.6
+                    else:
+                        index = None
+                        user_id = self.rng.choice(b2c_users)
+                        customer_id = None
+                        price = service.price_user
+                        paid_by_wallet = False
+
+                    if paid_by_wallet:
+                        payment_method = 'wallet'
+                    elif payment_status in ('paid', 'refunded', 'failed'):
+                        payment_method = 'gateway'
+                    else:
+                        payment_method = 'not_paid'
+
+                    order = ServiceOrder(
+                        user_id=user_id, service_id=service.pk, customer_id=customer_id,
+                        full_name=f"{first} {last}", email=f"{first}.{last}@example.test".lower(),
+                        phone=f"9{self.rng.randint(0, 999_999_999):09d}",
+                        payment_status=payment_status, payment_method=payment_method,
+                        progress_status=progress_status, price=price,
+                        created_at=created_at, updated_at=created_at + timedelta(hours=self.rng.randint(0, 240)),
+                    )
+                    order.seed_service = service
+                    orders.append(order)
+                    if paid_by_wallet:
+                        wallet_payers.append((order, index))
+
+                with transaction.atomic():
+                    ServiceOrder.objects.bulk_create(orders)
+                    self._create_order_children(orders)
+                    self._create_wallet_payments(partners, wallet_payers, wallet_spend)
+
+                done += n
+                self._progress("orders", done, total, started)
+        return wallet_spend
+
+    def _create_order_children(self, orders):
+        responses, documents = [], []
+        for order in orders:
+            service = order.seed_service
+            for field in service.seed_fields:
+                value = "1 Scale Test Road, Pune" if field.field_type == 'textarea' else order.full_name
+                responses.append((order.pk, field.pk, value))
+            if service.seed_documents:
+                uploaded_at = self.db_datetime(order.created_at)
+            for name, slug, is_mandatory in service.seed_documents:
+                if is_mandatory or self.rng.random() < 0.5:
+                    # Path only; no file is written to storage
+                    documents.append((order.pk, name, f"service_orders/order_{order.pk}/{slug}.pdf", uploaded_at))
+        insert_rows(DynamicFieldResponse, ('order', 'field', 'value'), responses)
+        insert_rows(OrderDocument, ('order', 'document_name', 'file', 'uploaded_at'), documents)
+
+    def _create_wallet_payments(self, partners, wallet_payers, wallet_spend):
+        transactions = []
+        for order, index in wallet_payers:
+            wallet_id = partners[index].wallet.pk
+            wallet_spend[index] += order.price
+            transactions.append((
+                wallet_id, WalletTransaction.TransactionType.SERVICE_PAYMENT, -order.price,
+                self.db_datetime(order.created_at), f"Payment for Service Order #{order.pk}",
+            ))
+            if order.payment_status == 'refunded':
+                wallet_spend[index] -= order.price
+                transactions.append((
+                    wallet_id, WalletTransaction.TransactionType.REFUND, order.price,
+                    self.db_datetime(order.updated_at), f"Refund for Service Order #{order.pk}",
+                ))
+        insert_rows(WalletTransaction, self.TRANSACTION_FIELDS, transactions)
+
+    def _fund_wallets(self, partners, wallet_spend, days):
+        """
+        Adds the top-ups that paid for each partner's wallet orders plus a
+        leftover balance, and sets the balance to the ledger sum.
+        """
+        if not partners:
+            return
+        started = time.monotonic()
+        done = 0
+        with historical_timestamps(_field(PartnerWallet, 'updated_at')):
+            for start in range(0, len(partners), self.chunk_size):
+                chunk = partners[start:start + self.chunk_size]
+                transactions, wallets = [], []
+                for offset, partner in enumerate(chunk, start=start):
+                    leftover = Decimal(self.rng.choice([0, 0, 500, 1000, 2500, 5000, 10000]))
+                    needed = wallet_spend[offset] + leftover
+                    topups = max(1, min(12, int(needed // 5000)))
+                    share = (needed / topups).quantize(Decimal('0.01'))
+                    amounts = [share] * (topups - 1) + [needed - share * (topups - 1)]
+                    for amount in amounts:
+                        if amount:
+                            transactions.append((
+                                partner.wallet.pk, WalletTransaction.TransactionType.TOP_UP, amount,
+                                self.db_datetime(self._random_past(days)), "Wallet top-up",
+                            ))
+                    wallet = partner.wallet
+                    wallet.balance = leftover
+                    wallet.updated_at = self.now
+                    wallets.append(wallet)
+                with transaction.atomic():
+                    insert_rows(WalletTransaction, self.TRANSACTION_FIELDS, transactions)
+                    PartnerWallet.objects.bulk_update(wallets, ['balance', 'updated_at'])
+                done += len(chunk)
+                self._progress("wallets", done, len(partners), started)
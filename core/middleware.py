@@ -0,0 +1,121 @@
+# core/middleware.py
+
+import logging
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGET = {'queries': 50, 'ms': 1000}
+
+# Stats of the request being handled on this thread/task, or None outside a request.
+_current_stats = ContextVar('request_stats', default=None)
+
+
+class RequestStats:
+    __slots__ = ('queries', 'db_time', 'template_time', 'template_depth')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # Installed as a connection.execute_wrapper(); times every query.
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+
+def get_budget(view_name):
+    """Returns the {'queries': ..., 'ms': ...} budget for a URL name ("namespace:name")."""
+    budgets = getattr(settings, 'REQUEST_BUDGETS', {})
+    budget = {**DEFAULT_BUDGET, **budgets.get('default', {})}
+    budget.update(budgets.get(view_name, {}))
+    return budget
+
+
+def instrument_templates():
+    """
+    Wraps Template.render so the middleware can attribute time to template
+    rendering. Only the outermost render is timed; {% include %} and
+    {% extends %} run inside it. Called once from CoreConfig.ready().
+    """
+    from django.template.base import Template
+
+    if getattr(Template.render, 'is_timed', False):
+        return
+    original_render = Template.render
+
+    def render(self, context):
+        stats = _current_stats.get()
+        if stats is None or stats.template_depth:
+            return original_render(self, context)
+        stats.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return original_render(self, context)
+        finally:
+            stats.template_depth -= 1
+            stats.template_time += time.perf_counter() - started
+
+    render.is_timed = True
+    Template.render = render
+
+
+class RequestTimingMiddleware:
+    """
+    Records query count, DB time, template time and total latency per request.
+    Staff users get them back in a Server-Timing header (visible in the
+    browser's network tab); requests over their REQUEST_BUDGETS entry are
+    logged as warnings under the resolved URL name.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            _current_stats.reset(token)
+        total_ms = (time.perf_counter() - started) * 1000
+
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        if view_name:
+            self._check_budget(request, view_name, stats, total_ms)
+
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_staff:
+            response['Server-Timing'] = (
+                f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries", '
+                f'tpl;dur={stats.template_time * 1000:.1f};desc="templates", '
+                f'total;dur={total_ms:.1f};desc="{view_name or "unresolved"}"'
+            )
+        return response
+
+    def _check_budget(self, request, view_name, stats, total_ms):
+        budget = get_budget(view_name)
+        if stats.queries > budget['queries'] or total_ms > budget['ms']:
+            logger.warning(
+                "%s %s (%s) over budget: %d queries (budget %d), %.0f ms (budget %d ms), "
+                "db %.0f ms, templates %.0f ms",
+                request.method, request.path, view_name,
+                stats.queries, budget['queries'], total_ms, budget['ms'],
+                stats.db_time * 1000, stats.template_time * 1000,
+            )
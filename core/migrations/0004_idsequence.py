@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-18 03:35
+
+from django.db import migrations, models
+
+
+def seed_sequences(apps, schema_editor):
+    """Start each PRT-/CUS- counter after the highest id already issued."""
+    IdSequence = apps.get_model('core', 'IdSequence')
+    Partner = apps.get_model('partner', 'Partner')
+    CustomUser = apps.get_model('accounts', 'CustomUser')
+
+    last_values = {}
+    issued = list(Partner.objects.values_list('partner_id', flat=True))
+    issued += list(CustomUser.objects.exclude(customer_id__isnull=True).values_list('customer_id', flat=True))
+    for value in issued:
+        prefix, _, sequence = (value or '').rpartition('-')
+        if prefix and sequence.isdigit():
+            last_values[prefix] = max(last_values.get(prefix, 0), int(sequence))
+
+    IdSequence.objects.bulk_create(
+        [IdSequence(key=key, last_value=last) for key, last in last_values.items()]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_callbackrequest'),
+        ('accounts', '0005_customuser_customer_id'),
+        ('partner', '0004_alter_wallettransaction_transaction_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=50, unique=True)),
+                ('last_value', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_sequences, migrations.RunPython.noop),
+    ]
@@ -42,3 +42,15 @@ class CallbackRequest(models.Model):
 
     def __str__(self):
         return f"{self.name} - {self.subject}"
+
+
+class IdSequence(models.Model):
+    """
+    A named counter used to hand out human-readable ids (e.g. PRT-2025-0001).
+    One row per prefix/year; see core.sequences for the atomic allocator.
+    """
+    key = models.CharField(max_length=50, unique=True)
+    last_value = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.key} @ {self.last_value}"
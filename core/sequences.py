@@ -0,0 +1,42 @@
+# core/sequences.py
+
+from django.db import connection, transaction
+from django.db.models import F
+
+from .models import IdSequence
+
+
+def reserve_block(key, n=1):
+    """
+    Atomically reserves `n` consecutive values of the counter `key` and
+    returns them as a range. The counter row is created on first use.
+
+    On PostgreSQL and SQLite this is a single INSERT ... ON CONFLICT DO UPDATE
+    ... RETURNING round trip; the row lock it takes is held until the caller's
+    transaction ends, so two callers can never receive the same value.
+    """
+    if n < 1:
+        raise ValueError("n must be at least 1.")
+
+    if connection.vendor in ('postgresql', 'sqlite'):
+        table = connection.ops.quote_name(IdSequence._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (key, last_value) VALUES (%s, %s) "
+                f"ON CONFLICT (key) DO UPDATE SET last_value = {table}.last_value + EXCLUDED.last_value "
+                f"RETURNING last_value",
+                [key, n],
+            )
+            last_value = cursor.fetchone()[0]
+    else:
+        with transaction.atomic():
+            IdSequence.objects.get_or_create(key=key)
+            IdSequence.objects.filter(key=key).update(last_value=F('last_value') + n)
+            last_value = IdSequence.objects.values_list('last_value', flat=True).get(key=key)
+
+    return range(last_value - n + 1, last_value + 1)
+
+
+def next_value(key):
+    """Returns the next value of the counter `key`."""
+    return reserve_block(key, 1)[0]
@@ -0,0 +1,39 @@
+# core/testing.py
+
+from urllib.parse import urlsplit
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+from .middleware import get_budget
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin for checking views against settings.REQUEST_BUDGETS:
+
+        class PartnerViewTests(QueryBudgetMixin, TestCase):
+            def test_dashboard(self):
+                self.client.force_login(self.partner_user)
+                self.assertWithinBudget(reverse('partner:dashboard'))
+    """
+
+    def assertWithinBudget(self, url, method='get', max_queries=None, **kwargs):
+        """
+        Requests `url` with self.client and fails if it ran more queries than
+        its budget (or `max_queries`). Returns the response for further checks.
+        """
+        view_name = resolve(urlsplit(url).path).view_name
+        if max_queries is None:
+            max_queries = get_budget(view_name)['queries']
+
+        with CaptureQueriesContext(connection) as captured:
+            response = getattr(self.client, method)(url, **kwargs)
+
+        if len(captured) > max_queries:
+            queries = "\n".join(
+                f"{i}. {query['sql']}" for i, query in enumerate(captured.captured_queries, start=1)
+            )
+            self.fail(f"{view_name} ran {len(captured)} queries, budget is {max_queries}:\n{queries}")
+        return response
@@ -45,16 +45,45 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    'core.middleware.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'partner.context.PartnerContextMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-view budgets for core.middleware.RequestTimingMiddleware, keyed by URL name.
+# Requests over budget are logged; core.testing.QueryBudgetMixin asserts them in tests.
+REQUEST_BUDGETS = {
+    'default': {'queries': 30, 'ms': 500},
+    'services:list': {'queries': 10},
+    'services:info': {'queries': 10},
+    'services:apply': {'queries': 12},
+    'partner:dashboard': {'queries': 8},
+    # Bulk import: a few queries per 1000-row chunk
+    'partner:import_customers': {'queries': 500, 'ms': 30000},
+    # Password hashing alone takes ~0.5 s by design
+    'accounts:login': {'ms': 1000},
+    'partner:login': {'ms': 1000},
+    'admin_panel:dashboard': {'queries': 6, 'ms': 800},
+    # Per-row values are annotated; must not grow with the page size
+    'admin:partner_partner_changelist': {'queries': 10},
+    # Reads the daily_order_stats rollup; should not grow with order history
+    'services:service_order_chart_json': {'queries': 5, 'ms': 200},
+    # CSV exports stream after the view returns; XLSX is built inside the view
+    'partner:export_customers': {'ms': 30000},
+    'partner:export_orders': {'ms': 30000},
+    'partner:export_wallet_transactions': {'ms': 30000},
+    'admin_panel:export_orders': {'ms': 60000},
+    'admin_panel:export_customers': {'ms': 60000},
+    'admin_panel:export_wallet_transactions': {'ms': 60000},
+}
+
 ROOT_URLCONF = 'legalmunshi_backend.urls'
 
 AUTHENTICATION_BACKENDS = [
@@ -79,6 +108,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'services.context_processors.navbar_categories',
+                'partner.context_processors.partner_context',
 
             ],
         },
@@ -101,6 +131,28 @@ DATABASES = {
 
 
 
+# ---------------------------------------------------------
+# ✅ Cache
+# ---------------------------------------------------------
+# OTPs and the navbar catalog version live here, so every gunicorn worker must
+# share it: set REDIS_URL in production. Without it each process gets its own
+# in-memory cache, which is only fine for a single-process dev server.
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -146,7 +198,9 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
 #Email OTP Setup
-EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+# OTP mails are queued (accounts.outbox) and delivered by `manage.py send_queued_emails`.
+# Set EMAIL_BACKEND to the console or file backend for local runs and tests.
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', "django.core.mail.backends.smtp.EmailBackend")
 EMAIL_HOST = "smtp.gmail.com"
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
@@ -1,17 +1,20 @@
 # partners/admin.py
 from django.urls import reverse
 from django.contrib import admin
-from django.utils.html import format_html
+from django.utils.html import format_html, format_html_join
 from django.contrib.auth import get_user_model
-from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from services.models import ServiceOrder
+from core.admin_inlines import LatestRowsInline
 from .forms import PartnerCreationForm
 from import_export.admin import ImportExportModelAdmin
 from .models import (
     PartnerPlan, Partner, PartnerSubscription, PartnerWallet, 
     WalletTransaction, PartnerRequest, DocumentType, 
-    PartnerRequestDocument, Customer,  PartnerDocument
+    PartnerRequestDocument, Customer,  PartnerDocument, PartnerApprovalJob
 )
+from .approvals import INLINE_APPROVAL_LIMIT, approve_partner_requests, enqueue_approval
 User = get_user_model()
 
 # --- Configuration for Plans and Signup ---
@@ -56,62 +59,29 @@ class PartnerRequestAdmin(ImportExportModelAdmin):
     
     
     
-    @transaction.atomic
     def approve_selected_requests(self, request, queryset):
         """
         Admin action to approve selected partner requests and create all necessary accounts.
+        Large selections are handed to the process_approval_jobs worker.
         """
-        approved_count = 0
-        for partner_request in queryset.filter(payment_status='paid'):
-            try:
-                # The create_user call with all arguments and the closing parenthesis
-                user = User.objects.create_user(
-                    email=partner_request.email,
-                    password=partner_request.password,
-                    phone=partner_request.phone
-                )
-
-                full_name_parts = partner_request.full_name.split()
-                user.first_name = full_name_parts[0] if full_name_parts else ''
-                user.last_name = ' '.join(full_name_parts[1:]) if len(full_name_parts) > 1 else ''
-                
-                # 3. Save the updated name fields to the user object
-                user.save(update_fields=['first_name', 'last_name'])
-
-                user.password = partner_request.password
-                user.save()
-
-
-                partner = Partner.objects.create(
-                user=user, 
-                business_name=partner_request.business_name,
-                address=partner_request.address,
-                city=partner_request.city,
-                state=partner_request.state,
-                pincode=partner_request.pincode
-            )
-                
-                
-
-                for doc in partner_request.documents.all():
-                   PartnerDocument.objects.create(
-                    partner=partner,
-                    document_type=doc.document_type,
-                    file=doc.file
-                )
-                
-                # Creates the wallet and subscription
-                PartnerWallet.objects.create(partner=partner)
-                
-                if partner_request.selected_plan:
-                    PartnerSubscription.objects.create(partner=partner, plan=partner_request.selected_plan)
-
-                approved_count += 1
-            except Exception as e:
-                self.message_user(request, f"Error approving {partner_request.business_name}: {e}", level='error')
-    
-        if approved_count > 0:
-            self.message_user(request, f"Successfully approved {approved_count} partner(s).")
+        request_ids = list(queryset.filter(payment_status='paid').order_by('pk').values_list('pk', flat=True))
+        if not request_ids:
+            self.message_user(request, "None of the selected requests are paid.", level='warning')
+            return
+
+        if len(request_ids) > INLINE_APPROVAL_LIMIT:
+            job = enqueue_approval(request_ids, user=request.user)
+            self.message_user(request, format_html(
+                'Queued {} paid request(s) for approval. <a href="{}">Follow its progress</a>.',
+                len(request_ids), reverse('admin:partner_partnerapprovaljob_change', args=[job.pk]),
+            ))
+            return
+
+        result = approve_partner_requests(request_ids)
+        for _, business_name, message in result.errors:
+            self.message_user(request, f"Error approving {business_name}: {message}", level='error')
+        if result.approved > 0:
+            self.message_user(request, f"Successfully approved {result.approved} partner(s).")
 
     approve_selected_requests.short_description = "Approve selected paid requests"
 
@@ -132,22 +102,18 @@ class PartnerSubscriptionInline(admin.TabularInline):
     readonly_fields = ('plan', 'start_date', 'end_date', 'is_active')
     can_delete = False
 
-class WalletTransactionInline(admin.TabularInline):
+class WalletTransactionInline(LatestRowsInline):
     model = WalletTransaction
-    extra = 0
     readonly_fields = ('timestamp', 'transaction_type', 'amount', 'details')
-    can_delete = False
-    def has_add_permission(self, request, obj=None): return False
+    ordering = ('-timestamp', '-id')
+    list_select_related = ('wallet__partner',)  # used by __str__
 
-class CustomerInline(admin.TabularInline):
+class CustomerInline(LatestRowsInline):
     model = Customer
-    extra = 0
     fields = ('full_name', 'email', 'phone')
     readonly_fields = ('full_name', 'email', 'phone')
+    ordering = ('-created_at', '-id')
     show_change_link = True
-    
-    def has_add_permission(self, request, obj=None):
-        return False
 
 @admin.register(PartnerWallet)
 class PartnerWalletAdmin(ImportExportModelAdmin):
@@ -225,10 +191,29 @@ class PartnerAdmin(ImportExportModelAdmin):
     
     
     # --- General Admin Configuration ---
-    list_display = ('business_name','user_full_name', 'partner_id', 'user_email', 'user_phone', 'get_wallet_balance', 'has_active_access')
+    list_display = ('business_name','user_full_name', 'partner_id', 'user_email', 'user_phone', 'get_wallet_balance', 'get_order_count', 'has_active_access')
+    list_select_related = ('user', 'wallet')
     search_fields = ('business_name', 'user__email', 'partner_id')
     inlines = [PartnerDocumentInline, PartnerSubscriptionInline, CustomerInline]
 
+    def get_queryset(self, request):
+        # Every per-row value is computed inside the changelist query, so a
+        # page costs the same number of queries however many rows it shows.
+        # The EXISTS is served by the partial active-subscription index.
+        order_count = (
+            ServiceOrder.objects.filter(user=OuterRef('user'))
+            .order_by().values('user').annotate(count=Count('pk')).values('count')
+        )
+        return super().get_queryset(request).annotate(
+            active_access=Exists(PartnerSubscription.objects.filter(partner=OuterRef('pk'), is_active=True)),
+            wallet_balance=F('wallet__balance'),
+            order_count=Coalesce(Subquery(order_count), 0),
+        )
+
+    @admin.display(description='Has active access', boolean=True, ordering='active_access')
+    def has_active_access(self, obj):
+        return obj.active_access
+
     # This method dynamically shows the correct fields for adding vs. editing
     def get_fieldsets(self, request, obj=None):
         if not obj:
@@ -282,7 +267,7 @@ class PartnerAdmin(ImportExportModelAdmin):
         else: # This runs when updating an existing partner
             super().save_model(request, obj, form, change)
 
-            # --- NEW METHOD TO CREATE THE WALLET LINK ---
+    # --- NEW METHOD TO CREATE THE WALLET LINK ---
     @admin.display(description='Wallet Details')
     def view_wallet_details_link(self, obj):
         # Check if the partner has a wallet yet
@@ -297,12 +282,12 @@ class PartnerAdmin(ImportExportModelAdmin):
         # Create a clickable HTML link
         return format_html('<a href="{}">View Wallet & Transactions</a>', wallet_url)
 
-    # --- Your existing display methods ---
+    # --- Display methods; user and wallet come from list_select_related ---
     @admin.display(description='Partner Name', ordering='user__first_name')
     def user_full_name(self, obj):
         return obj.user.get_full_name() or obj.user.email
 
-    @admin.display(description='Email')
+    @admin.display(description='Email', ordering='user__email')
     def user_email(self, obj):
         return obj.user.email
 
@@ -310,54 +295,27 @@ class PartnerAdmin(ImportExportModelAdmin):
     def user_phone(self, obj):
         return obj.user.phone
 
-    @admin.display(description='Wallet Balance', ordering='wallet__balance')
+    @admin.display(description='Wallet Balance', ordering='wallet_balance')
     def get_wallet_balance(self, obj):
-        if hasattr(obj, 'wallet'):
-            return f"₹{obj.wallet.balance}"
-        return "N/A"
-    
-    @admin.display(description='Order History')
-    def view_order_history_link(self, obj):
-        count = ServiceOrder.objects.filter(user=obj.user).count()
-        if count == 0:
-            return "No orders found."
-        url = (
-            reverse("admin:services_serviceorder_changelist")
-            + f"?user__id__exact={obj.user.id}"
-        )
-        return format_html('<a href="{}">View {} Orders</a>', url, count)
+        if obj.wallet_balance is None:
+            return "N/A"
+        return f"₹{obj.wallet_balance}"
 
-    @admin.display(description='Partner Name', ordering='user__first_name')
-    def user_full_name(self, obj):
-        return obj.user.get_full_name() or obj.user.email
-
-    @admin.display(description='Email')
-    def user_email(self, obj):
-        return obj.user.email
-
-    # New method to display the phone number
-    @admin.display(description='Phone')
-    def user_phone(self, obj):
-        return obj.user.phone
+    @admin.display(description='Orders', ordering='order_count')
+    def get_order_count(self, obj):
+        return obj.order_count
 
-    @admin.display(description='Wallet Balance', ordering='wallet__balance')
-    def get_wallet_balance(self, obj):
-        if hasattr(obj, 'wallet'):
-            return f"₹{obj.wallet.balance}"
-        return "N/A"
-    
     @admin.display(description='Order History')
     def view_order_history_link(self, obj):
-        count = ServiceOrder.objects.filter(user=obj.user).count()
-        if count == 0:
+        if not obj.order_count:
             return "No orders found."
         
         # Create the URL for the ServiceOrder admin list, filtered by this partner's user ID
         url = (
             reverse("admin:services_serviceorder_changelist")
-            + f"?user__id__exact={obj.user.id}"
+            + f"?user__id__exact={obj.user_id}"
         )
-        return format_html('<a href="{}">View {} Orders</a>', url, count)
+        return format_html('<a href="{}">View {} Orders</a>', url, obj.order_count)
     
 
 
@@ -370,4 +328,36 @@ class CustomerAdmin(ImportExportModelAdmin):
 
 # Register other models for basic viewing
 admin.site.register(PartnerSubscription)
-admin.site.register(WalletTransaction)
+
+
+@admin.register(PartnerApprovalJob)
+class PartnerApprovalJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'status', 'progress', 'approved', 'error_count', 'created_by', 'created_at', 'updated_at')
+    list_filter = ('status',)
+    fields = ('status', 'progress', 'approved', 'error_count', 'error_list', 'last_error', 'created_by', 'created_at', 'updated_at')
+    readonly_fields = fields
+    actions = ['requeue_jobs']
+
+    def progress(self, obj):
+        return f"{obj.processed} / {obj.total}"
+
+    def error_list(self, obj):
+        return format_html_join(
+            '\n', '<div>Request #{}, {}: {}</div>', ((pk, name, message) for pk, name, message in obj.errors)
+        ) or "-"
+    error_list.short_description = "Errors"
+
+    @admin.action(description="Re-queue selected failed jobs (resumes where they stopped)")
+    def requeue_jobs(self, request, queryset):
+        queued = queryset.filter(status='failed').update(status='pending', last_error='')
+        self.message_user(request, f"Re-queued {queued} job(s).")
+
+    def has_add_permission(self, request): return False
+    def has_change_permission(self, request, obj=None): return False
+
+
+@admin.register(WalletTransaction)
+class WalletTransactionAdmin(admin.ModelAdmin):
+    # Target of the wallet inline's "View all" link; __str__ reads wallet.partner.
+    list_select_related = ('wallet__partner',)
+
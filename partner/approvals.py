@@ -0,0 +1,235 @@
+# partner/approvals.py
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.base_user import BaseUserManager
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import (
+    Partner, PartnerApprovalJob, PartnerDocument, PartnerPlan, PartnerRequest,
+    PartnerStats, PartnerSubscription, PartnerWallet, WalletTransaction,
+)
+from .subscriptions import refresh_current_subscriptions
+from .utils import reserve_partner_ids
+
+User = get_user_model()
+
+APPROVAL_CHUNK_SIZE = 100
+# Bigger selections are queued for the process_approval_jobs worker instead
+# of being approved inside the admin request.
+INLINE_APPROVAL_LIMIT = 50
+MAX_REPORTED_ERRORS = 1000
+# A job still "running" after this long without progress belongs to a worker that died; reclaim it.
+RUNNING_TIMEOUT = timedelta(minutes=10)
+
+
+class ApprovalResult:
+    def __init__(self):
+        self.processed = 0
+        self.approved = 0
+        self.errors = []  # [request id, business name, message], capped at MAX_REPORTED_ERRORS
+        self.error_count = 0
+
+    def add_error(self, partner_request, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append([partner_request.pk, partner_request.business_name, message])
+
+
+def _check_requests(partner_requests, result):
+    """
+    Drops requests that would clash with an existing user or with another
+    request in the chunk, reporting each one. One query for the whole chunk.
+    """
+    for partner_request in partner_requests:
+        partner_request.email = BaseUserManager.normalize_email(partner_request.email)
+    taken = User.objects.filter(
+        Q(email__in=[r.email for r in partner_requests]) | Q(phone__in=[r.phone for r in partner_requests])
+    ).values_list('email', 'phone')
+    taken_emails = {email for email, _ in taken}
+    taken_phones = {phone for _, phone in taken}
+
+    candidates = []
+    for partner_request in partner_requests:
+        if not partner_request.email or not partner_request.phone:
+            result.add_error(partner_request, "Email and phone are required.")
+        elif partner_request.email in taken_emails:
+            result.add_error(partner_request, "A user with this email already exists.")
+        elif partner_request.phone in taken_phones:
+            result.add_error(partner_request, "A user with this phone already exists.")
+        else:
+            taken_emails.add(partner_request.email)
+            taken_phones.add(partner_request.phone)
+            candidates.append(partner_request)
+    return candidates
+
+
+def _create_partners(partner_requests):
+    """
+    Creates the user, partner, stats, wallet, documents and subscription for
+    each request with one bulk INSERT per table. bulk_create skips save() and
+    the post_save signals, so what they would do is done here explicitly.
+    """
+    now = timezone.now()
+    users = []
+    for partner_request in partner_requests:
+        names = partner_request.full_name.split()
+        users.append(User(
+            email=partner_request.email,
+            phone=partner_request.phone,
+            password=partner_request.password,  # already hashed at signup
+            first_name=names[0] if names else '',
+            last_name=' '.join(names[1:]),
+            user_type='partner',
+            is_partner_approved=True,
+        ))
+    User.objects.bulk_create(users)
+
+    partners = [
+        Partner(
+            user=user,
+            partner_id=partner_id,
+            business_name=partner_request.business_name,
+            address=partner_request.address,
+            city=partner_request.city,
+            state=partner_request.state,
+            pincode=partner_request.pincode,
+        )
+        for partner_request, user, partner_id in zip(partner_requests, users, reserve_partner_ids(len(users)))
+    ]
+    Partner.objects.bulk_create(partners)
+    PartnerStats.objects.bulk_create([PartnerStats(partner=partner) for partner in partners])
+
+    wallets, subscriptions, credits, documents = [], [], [], []
+    for partner_request, partner in zip(partner_requests, partners):
+        wallet = PartnerWallet(partner=partner)
+        plan = partner_request.selected_plan
+        if plan:
+            end_date = now + timedelta(days=plan.duration_days) if plan.duration_days else None
+            subscriptions.append(PartnerSubscription(partner=partner, plan=plan, start_date=now, end_date=end_date))
+            if plan.plan_type == PartnerPlan.PlanType.WALLET_CREDIT:
+                # Same credit PartnerSubscription.save() applies through partner.wallet.credit
+                wallet.balance = plan.price
+                wallet.balance_expires_at = end_date
+                credits.append((wallet, plan))
+        wallets.append(wallet)
+        documents.extend(
+            PartnerDocument(partner=partner, document_type_id=doc.document_type_id, file=doc.file.name)
+            for doc in partner_request.documents.all()
+        )
+
+    PartnerWallet.objects.bulk_create(wallets)
+    WalletTransaction.objects.bulk_create([
+        WalletTransaction(
+            wallet=wallet,
+            transaction_type=WalletTransaction.TransactionType.INITIAL_CREDIT,
+            amount=plan.price,
+            details=f"Initial credit from '{plan.name}' plan purchase.",
+        )
+        for wallet, plan in credits
+    ])
+    PartnerDocument.objects.bulk_create(documents)
+    PartnerSubscription.objects.bulk_create(subscriptions)
+    refresh_current_subscriptions([partner.pk for partner in partners])
+    return partners
+
+
+def _approve_chunk(request_ids, result):
+    partner_requests = list(
+        PartnerRequest.objects.filter(pk__in=request_ids, payment_status='paid')
+        .select_related('selected_plan').prefetch_related('documents').order_by('pk')
+    )
+    candidates = _check_requests(partner_requests, result) if partner_requests else []
+    if not candidates:
+        return
+    try:
+        with transaction.atomic():
+            _create_partners(candidates)
+    except Exception:
+        # Something in the chunk failed (e.g. a user signed up with one of these
+        # emails meanwhile); redo it row by row so only the bad requests are rejected.
+        for partner_request in candidates:
+            try:
+                with transaction.atomic():
+                    _create_partners([partner_request])
+            except Exception as e:
+                result.add_error(partner_request, str(e))
+            else:
+                result.approved += 1
+    else:
+        result.approved += len(candidates)
+
+
+def approve_partner_requests(request_ids, chunk_size=APPROVAL_CHUNK_SIZE, on_chunk=None):
+    """
+    Approves the paid PartnerRequests among `request_ids`, `chunk_size` at a
+    time, and returns an ApprovalResult. Per chunk: one query for clashing
+    users, one block of partner IDs and one INSERT per table. Requests that
+    fail are reported; the rest are approved. `on_chunk(result)` runs inside
+    each chunk's transaction, so progress saved there commits with the chunk.
+    """
+    result = ApprovalResult()
+    request_ids = list(request_ids)
+    for start in range(0, len(request_ids), chunk_size):
+        chunk = request_ids[start:start + chunk_size]
+        with transaction.atomic():
+            _approve_chunk(chunk, result)
+            result.processed += len(chunk)
+            if on_chunk:
+                on_chunk(result)
+    return result
+
+
+def enqueue_approval(request_ids, user=None):
+    """Queues a large approval for the process_approval_jobs worker."""
+    request_ids = list(request_ids)
+    return PartnerApprovalJob.objects.create(request_ids=request_ids, total=len(request_ids), created_by=user)
+
+
+def claim_approval_jobs(limit):
+    """
+    Marks up to `limit` pending (or abandoned) jobs as running and returns
+    them. Rows locked by another worker are skipped.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            PartnerApprovalJob.objects.select_for_update(skip_locked=True)
+            .filter(Q(status='pending') | Q(status='running', updated_at__lt=now - RUNNING_TIMEOUT))
+            .order_by('created_at')[:limit]
+        )
+        if jobs:
+            PartnerApprovalJob.objects.filter(pk__in=[job.pk for job in jobs]).update(status='running', updated_at=now)
+    return jobs
+
+
+def run_approval_job(job, chunk_size=APPROVAL_CHUNK_SIZE):
+    """
+    Approves the job's remaining requests, saving progress with every chunk.
+    A job that crashes is marked failed; re-queueing it resumes after the
+    last committed chunk. Returns True when the job finished.
+    """
+    offset, approved, error_count, errors = job.processed, job.approved, job.error_count, list(job.errors)
+
+    def save_progress(result):
+        job.processed = offset + result.processed
+        job.approved = approved + result.approved
+        job.error_count = error_count + result.error_count
+        job.errors = (errors + result.errors)[:MAX_REPORTED_ERRORS]
+        job.save(update_fields=['processed', 'approved', 'error_count', 'errors', 'updated_at'])
+
+    try:
+        approve_partner_requests(job.request_ids[offset:], chunk_size=chunk_size, on_chunk=save_progress)
+    except Exception as e:
+        job.status = 'failed'
+        job.last_error = str(e)
+        job.save(update_fields=['status', 'last_error', 'updated_at'])
+        return False
+
+    job.status = 'done'
+    job.last_error = ''
+    job.save(update_fields=['status', 'last_error', 'updated_at'])
+    return True
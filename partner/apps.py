@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class PartnerConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'partner'
+
+    def ready(self):
+        # Connect the partner stats receivers.
+        from . import signals  # noqa: F401
@@ -0,0 +1,73 @@
+# partner/context.py
+
+from django.http import Http404
+from django.utils.functional import SimpleLazyObject
+
+from .models import Partner, PartnerWallet
+
+
+class PartnerContext:
+    """The signed-in user's partner profile, wallet and active subscription; each may be None."""
+
+    __slots__ = ('partner', 'wallet', 'subscription')
+
+    def __init__(self, partner=None, wallet=None, subscription=None):
+        self.partner = partner
+        self.wallet = wallet
+        self.subscription = subscription
+
+    @property
+    def is_partner(self):
+        return self.partner is not None
+
+    def __bool__(self):
+        return self.is_partner
+
+    @property
+    def plan_type(self):
+        return self.subscription.plan.plan_type if self.subscription else None
+
+
+def load_partner_context(user):
+    """
+    Loads partner, wallet, stats and active subscription (with its plan) in
+    one joined query. Also primes user.partner, so hasattr(user, 'partner') and
+    templates using user.partner don't query again.
+    """
+    if not user.is_authenticated:
+        return PartnerContext()
+
+    partner = (
+        Partner.objects
+        .select_related('wallet', 'stats', 'current_subscription__plan')
+        .filter(user=user)
+        .first()
+    )
+    if partner is None:
+        Partner._meta.get_field('user').remote_field.set_cached_value(user, None)
+        return PartnerContext()
+
+    partner.user = user
+    try:
+        wallet = partner.wallet
+    except PartnerWallet.DoesNotExist:
+        wallet = None
+    return PartnerContext(partner, wallet, partner.current_subscription)
+
+
+def get_partner_or_404(request):
+    """request.partner_ctx.partner, or Http404 for users without a partner profile."""
+    if not request.partner_ctx.is_partner:
+        raise Http404("No partner profile for this user.")
+    return request.partner_ctx.partner
+
+
+class PartnerContextMiddleware:
+    """Adds a lazy request.partner_ctx, loaded on first use and kept for the request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.partner_ctx = SimpleLazyObject(lambda: load_partner_context(request.user))
+        return self.get_response(request)
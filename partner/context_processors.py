@@ -0,0 +1,3 @@
+def partner_context(request):
+    # request.partner_ctx is lazy; pages that never check it don't query.
+    return {'partner_ctx': getattr(request, 'partner_ctx', None)}
@@ -0,0 +1,96 @@
+# partner/customers.py
+
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+
+from .models import Customer
+
+PAGE_SIZE = 25
+AUTOCOMPLETE_LIMIT = 10
+
+
+def search_customers(partner, query=""):
+    """
+    A partner's customers, optionally narrowed by a search term. Name and email
+    match anywhere (trigram indexes on UPPER(col), which is what icontains
+    compiles to on PostgreSQL); phone and customer ID match by prefix (pattern
+    indexes), which is how they are typed in practice.
+    """
+    customers = Customer.objects.filter(partner=partner)
+    query = (query or "").strip()
+    if query:
+        customers = customers.filter(
+            Q(full_name__icontains=query)
+            | Q(email__icontains=query)
+            | Q(phone__startswith=query)
+            | Q(partner_customer_id__startswith=query.upper())
+        )
+    return customers
+
+
+def encode_cursor(customer):
+    payload = json.dumps([customer.full_name, customer.pk]).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def decode_cursor(token):
+    """Returns the (full_name, id) a cursor points at, or None if it is missing or malformed."""
+    if not token:
+        return None
+    try:
+        full_name, pk = json.loads(base64.urlsafe_b64decode(token.encode()))
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+        return None
+    if not isinstance(full_name, str) or not isinstance(pk, int):
+        return None
+    return full_name, pk
+
+
+class CustomerPage:
+    def __init__(self, customers, next_cursor=None, prev_cursor=None):
+        self.customers = customers
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_other_pages(self):
+        return bool(self.next_cursor or self.prev_cursor)
+
+
+def paginate_customers(customers, after=None, before=None, page_size=PAGE_SIZE):
+    """
+    Keyset pagination over (full_name, id). Each page is a single indexed range
+    scan of page_size + 1 rows, however deep into the list it is, unlike
+    OFFSET which reads and discards every earlier row.
+    """
+    after, before = decode_cursor(after), decode_cursor(before)
+
+    if before:
+        full_name, pk = before
+        rows = list(
+            customers.filter(Q(full_name__lt=full_name) | Q(full_name=full_name, pk__lt=pk))
+            .order_by('-full_name', '-id')[:page_size + 1]
+        )
+        has_more = len(rows) > page_size
+        rows = rows[:page_size][::-1]
+        # We came back from a later page, so there is always a next one.
+        return CustomerPage(
+            rows,
+            next_cursor=encode_cursor(rows[-1]) if rows else None,
+            prev_cursor=encode_cursor(rows[0]) if rows and has_more else None,
+        )
+
+    if after:
+        full_name, pk = after
+        customers = customers.filter(Q(full_name__gt=full_name) | Q(full_name=full_name, pk__gt=pk))
+    rows = list(customers.order_by('full_name', 'id')[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    return CustomerPage(
+        rows,
+        next_cursor=encode_cursor(rows[-1]) if rows and has_more else None,
+        prev_cursor=encode_cursor(rows[0]) if rows and after else None,
+    )
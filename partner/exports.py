@@ -0,0 +1,49 @@
+# partner/exports.py
+
+from .models import Customer, WalletTransaction
+
+# (header, attribute path) pairs for core.exports.export_response
+CUSTOMER_EXPORT_COLUMNS = [
+    ("Customer ID", 'partner_customer_id'),
+    ("Full Name", 'full_name'),
+    ("Email", 'email'),
+    ("Phone", 'phone'),
+    ("Address", 'address'),
+    ("Added On", 'created_at'),
+    ("Partner ID", 'partner.partner_id'),
+    ("Partner", 'partner.business_name'),
+]
+
+WALLET_TRANSACTION_EXPORT_COLUMNS = [
+    ("Transaction ID", 'id'),
+    ("Date", 'timestamp'),
+    ("Partner ID", 'wallet.partner.partner_id'),
+    ("Partner", 'wallet.partner.business_name'),
+    ("Type", 'get_transaction_type_display'),
+    ("Amount", 'amount'),
+    ("Details", 'details'),
+]
+
+
+def customer_export_queryset():
+    return (
+        Customer.objects
+        .select_related('partner')
+        .only(
+            'id', 'partner_customer_id', 'full_name', 'email', 'phone', 'address', 'created_at',
+            'partner__partner_id', 'partner__business_name',
+        )
+        .order_by('id')
+    )
+
+
+def wallet_transaction_export_queryset():
+    return (
+        WalletTransaction.objects
+        .select_related('wallet__partner')
+        .only(
+            'id', 'timestamp', 'transaction_type', 'amount', 'details',
+            'wallet__id', 'wallet__partner__partner_id', 'wallet__partner__business_name',
+        )
+        .order_by('id')
+    )
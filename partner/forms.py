@@ -2,6 +2,7 @@
 from django import forms
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.core.validators import FileExtensionValidator
 from .models import Partner, PartnerPlan,Customer
 
 
@@ -71,6 +72,18 @@ class PartnerCreationForm(forms.ModelForm):
         phone = cleaned_data.get("phone")
         password = cleaned_data.get("password")
 
+class CustomerImportForm(forms.Form):
+    """
+    Upload of a customer spreadsheet (see partner.imports for the columns).
+    """
+    file = forms.FileField(
+        label="Customer file",
+        validators=[FileExtensionValidator(['csv', 'xlsx'])],
+        help_text="CSV or XLSX with columns: full_name, email, phone and optionally address.",
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,.xlsx'}),
+    )
+
+
 class CustomerEditForm(forms.ModelForm):
     """
     A form for editing an existing customer's details.
@@ -0,0 +1,217 @@
+# partner/imports.py
+
+import codecs
+import csv
+import os
+from itertools import islice
+
+from django.contrib.auth.base_user import BaseUserManager
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+from .models import Customer
+from .stats import record_customers_added
+from .utils import generate_partner_customer_ids
+
+IMPORT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+# Spreadsheet header (lower-cased, stripped) -> Customer field
+HEADER_ALIASES = {
+    'full_name': 'full_name', 'full name': 'full_name', 'name': 'full_name', 'customer name': 'full_name',
+    'email': 'email', 'email address': 'email', 'e-mail': 'email',
+    'phone': 'phone', 'phone number': 'phone', 'mobile': 'phone', 'mobile number': 'phone',
+    'address': 'address',
+}
+REQUIRED_FIELDS = ('full_name', 'email', 'phone')
+# Tried in order; cp1252 is what Excel's plain "CSV" export uses on Windows.
+CSV_ENCODINGS = ('utf-8-sig', 'cp1252')
+
+
+class ImportFileError(Exception):
+    """The upload can't be read at all (unknown format, missing columns, ...)."""
+
+
+class ImportResult:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.errors = []  # (row number, message), capped at MAX_REPORTED_ERRORS
+        self.error_count = 0
+
+    def add_error(self, row_number, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((row_number, message))
+
+
+def _map_header(header):
+    columns = [HEADER_ALIASES.get(str(name or '').strip().lower()) for name in header]
+    missing = [field for field in REQUIRED_FIELDS if field not in columns]
+    if missing:
+        raise ImportFileError(f"Missing column(s): {', '.join(missing)}.")
+    return columns
+
+
+def _rows(columns, records, first_row_number=2):
+    """Turns raw records into (row number, {field: value}) pairs, skipping blank lines."""
+    for row_number, record in enumerate(records, start=first_row_number):
+        values = {}
+        for field, value in zip(columns, record):
+            if field:
+                values[field] = '' if value is None else str(value).strip()
+        if any(values.values()):
+            yield row_number, values
+
+
+def _csv_encoding(uploaded_file):
+    """
+    The first of CSV_ENCODINGS the whole file decodes and parses with. Runs
+    before any row is imported, so a bad byte or quote half-way through the
+    file is a form error rather than a partial import.
+    """
+    for encoding in CSV_ENCODINGS:
+        uploaded_file.seek(0)
+        try:
+            for _ in csv.reader(codecs.iterdecode(uploaded_file, encoding)):
+                pass
+        except UnicodeDecodeError:
+            continue
+        except csv.Error as e:
+            raise ImportFileError(f"The CSV file is malformed: {e}.")
+        uploaded_file.seek(0)
+        return encoding
+    raise ImportFileError("The file's text encoding isn't supported; save it as \"CSV UTF-8\" and upload it again.")
+
+
+def _read_csv(uploaded_file):
+    # Decode incrementally so the upload is never held in memory as a whole.
+    reader = csv.reader(codecs.iterdecode(uploaded_file, _csv_encoding(uploaded_file)))
+    header = next(reader, None)
+    if header is None:
+        raise ImportFileError("The file is empty.")
+    yield from _rows(_map_header(header), reader)
+
+
+def _read_xlsx(uploaded_file):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFileError("XLSX import needs the openpyxl package; upload a CSV instead.")
+    try:
+        # read_only streams rows instead of building the whole sheet in memory
+        workbook = load_workbook(uploaded_file, read_only=True, data_only=True)
+    except Exception:
+        raise ImportFileError("The file is not a valid .xlsx workbook.")
+    try:
+        records = workbook.active.iter_rows(values_only=True)
+        header = next(records, None)
+        if header is None:
+            raise ImportFileError("The file is empty.")
+        yield from _rows(_map_header(header), records)
+    finally:
+        workbook.close()
+
+
+def read_customer_rows(uploaded_file):
+    extension = os.path.splitext(uploaded_file.name)[1].lower()
+    if extension == '.csv':
+        return _read_csv(uploaded_file)
+    if extension == '.xlsx':
+        return _read_xlsx(uploaded_file)
+    raise ImportFileError("Upload a .csv or .xlsx file.")
+
+
+def _validate(values):
+    full_name = values.get('full_name', '')
+    email = values.get('email', '')
+    phone = values.get('phone', '')
+    if not all([full_name, email, phone]):
+        return "Full name, email and phone are required."
+    if len(full_name) > 255:
+        return "Full name is longer than 255 characters."
+    if len(phone) > 15:
+        return "Phone is longer than 15 characters."
+    try:
+        validate_email(email)
+    except ValidationError:
+        return "Enter a valid email address."
+    return None
+
+
+def import_customers(partner, uploaded_file, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Streams customer rows from a CSV/XLSX upload and creates them in chunks.
+    Per chunk: one query for emails the partner already has, one UPDATE for
+    a block of customer IDs and one bulk INSERT. Rows that fail are reported
+    by row number; the rest are imported.
+    """
+    result = ImportResult()
+    seen_emails = {}  # email -> row number, to catch duplicates within the file
+    rows = read_customer_rows(uploaded_file)
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        result.rows += len(chunk)
+
+        candidates = []
+        for row_number, values in chunk:
+            error = _validate(values)
+            if error:
+                result.add_error(row_number, error)
+                continue
+            values['email'] = BaseUserManager.normalize_email(values['email'])
+            first_seen = seen_emails.setdefault(values['email'], row_number)
+            if first_seen != row_number:
+                result.add_error(row_number, f"Duplicate email; already on row {first_seen}.")
+                continue
+            candidates.append((row_number, values))
+
+        result.created += _create_chunk(partner, candidates, result)
+
+    return result
+
+
+def _create_chunk(partner, candidates, result, retry=True):
+    if not candidates:
+        return 0
+    existing = set(
+        Customer.objects.filter(partner=partner, email__in=[values['email'] for _, values in candidates])
+        .values_list('email', flat=True)
+    )
+    new_rows = []
+    for row_number, values in candidates:
+        if values['email'] in existing:
+            result.add_error(row_number, "A customer with this email already exists.")
+        else:
+            new_rows.append(values)
+    if not new_rows:
+        return 0
+
+    try:
+        with transaction.atomic():
+            customer_ids = generate_partner_customer_ids(partner, len(new_rows))
+            Customer.objects.bulk_create([
+                Customer(
+                    partner=partner,
+                    partner_customer_id=customer_id,
+                    full_name=values['full_name'],
+                    email=values['email'],
+                    phone=values['phone'],
+                    address=values.get('address', ''),
+                )
+                for values, customer_id in zip(new_rows, customer_ids)
+            ])
+            # bulk_create skips the save signal that keeps PartnerStats current
+            record_customers_added(partner.pk, len(new_rows))
+    except IntegrityError:
+        # A customer with one of these emails was added while we were importing;
+        # re-check the chunk once against the database.
+        if not retry:
+            raise
+        remaining = [(row_number, values) for row_number, values in candidates if values['email'] not in existing]
+        return _create_chunk(partner, remaining, result, retry=False)
+    return len(new_rows)
@@ -1,72 +1,117 @@
 # partners/management/commands/check_subscriptions.py
 
+import time
+from decimal import Decimal
+
 from django.core.management.base import BaseCommand
-from django.utils import timezone
 from django.db import transaction
+from django.utils import timezone
 from partner.models import PartnerSubscription, PartnerPlan, PartnerWallet, WalletTransaction
-from decimal import Decimal
+from partner.subscriptions import refresh_current_subscriptions
 
 class Command(BaseCommand):
     help = 'Deactivates expired subscriptions and resets wallet balances for WALLET_CREDIT plans.'
 
-    @transaction.atomic
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Wallets reset per transaction.')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would change without writing.')
+
     def handle(self, *args, **options):
         now = timezone.now()
-        self.stdout.write("Starting expiration process...")
-        
-        # --- 1. Process Expired Time-Based Subscriptions ---
+        dry_run = options['dry_run']
+        self.stdout.write("Starting expiration process..." + (" (dry run)" if dry_run else ""))
+
+        self._expire_subscriptions(now, dry_run)
+        self.stdout.write("-" * 50)
+        self._expire_wallets(now, options['batch_size'], dry_run)
+
+        self.stdout.write(self.style.SUCCESS("Expiration process finished."))
+
+    def _report(self, phase, count, started):
+        elapsed_ms = (time.monotonic() - started) * 1000
+        self.stdout.write(self.style.SUCCESS(f"{phase}: {count} in {elapsed_ms:.0f} ms"))
+
+    # --- 1. Process Expired Time-Based Subscriptions ---
+    def _expire_subscriptions(self, now, dry_run):
+        started = time.monotonic()
         expired_subscriptions = PartnerSubscription.objects.filter(
             is_active=True,
             plan__plan_type=PartnerPlan.PlanType.SUBSCRIPTION, # Filter by plan type
             end_date__lt=now
         )
-        
-        if expired_subscriptions.exists():
-            for sub in expired_subscriptions:
-                sub.is_active = False
-                sub.save()
-                self.stdout.write(self.style.SUCCESS(
-                    f"Deactivated subscription for {sub.partner.business_name} (Plan: {sub.plan.name})."
-                ))
-        else:
-            self.stdout.write("No expired time-based subscriptions to process.")
-        
-        self.stdout.write("-" * 50)
+        if dry_run:
+            count = expired_subscriptions.count()
+            self._report("Time-based subscriptions that would be deactivated", count, started)
+            return
+
+        # A single UPDATE, no per-row save(); then re-point the partners' current plan
+        with transaction.atomic():
+            partner_ids = list(expired_subscriptions.values_list('partner_id', flat=True).distinct())
+            count = expired_subscriptions.update(is_active=False)
+            refresh_current_subscriptions(partner_ids)
+        self._report("Deactivated time-based subscriptions", count, started)
 
-        # --- 2. Process Expired Wallet Balances ---
+    # --- 2. Process Expired Wallet Balances ---
+    def _expire_wallets(self, now, batch_size, dry_run):
+        """
+        Resets expired WALLET_CREDIT balances in id-ordered chunks. Each chunk is
+        its own short transaction: lock the wallets, bulk-insert the EXPIRY
+        ledger rows, zero the balances and deactivate their wallet subscriptions.
+        """
+        started = time.monotonic()
         # This will only find wallets with a balance_expires_at date,
         # which is set exclusively for WALLET_CREDIT plans.
         expired_wallets = PartnerWallet.objects.filter(
             balance_expires_at__lt=now,
             balance__gt=Decimal('0.00')
-        ).select_related('partner', 'partner__subscriptions') # Add select_related for efficiency
-
-        if expired_wallets.exists():
-            for wallet in expired_wallets:
-                expired_balance = wallet.balance
-                
-                # Deactivate the related subscription for this wallet plan
-                wallet_subscription = wallet.partner.subscriptions.filter(plan__plan_type=PartnerPlan.PlanType.WALLET_CREDIT, is_active=True).first()
-                if wallet_subscription:
-                    wallet_subscription.is_active = False
-                    wallet_subscription.save()
-
-                # Log the expiry transaction and reset the balance
-                WalletTransaction.objects.create(
-                    wallet=wallet,
-                    transaction_type=WalletTransaction.TransactionType.EXPIRY,
-                    amount=-expired_balance,
-                    details=f"Balance expired from Wallet Credit plan."
+        )
+
+        if dry_run:
+            count = expired_wallets.count()
+            self._report("Wallets that would be reset", count, started)
+            return
+
+        wallets_reset = 0
+        subscriptions_closed = 0
+        last_id = 0
+        while True:
+            with transaction.atomic():
+                wallets = list(
+                    expired_wallets.select_for_update()
+                    .filter(id__gt=last_id)
+                    .order_by('id')
+                    .only('id', 'partner_id', 'balance')[:batch_size]
                 )
-                
-                wallet.balance = Decimal('0.00')
-                wallet.balance_expires_at = None  # Reset the expiry date
-                wallet.save()
-                
-                self.stdout.write(self.style.SUCCESS(
-                    f"Reset wallet balance for {wallet.partner.business_name} and deactivated related subscription."
-                ))
-        else:
-            self.stdout.write("No expired wallet balances to process.")
-        
-        self.stdout.write(self.style.SUCCESS("Expiration process finished."))
\ No newline at end of file
+                if not wallets:
+                    break
+                last_id = wallets[-1].id
+                wallet_ids = [wallet.id for wallet in wallets]
+
+                # Log the expiry transactions and reset the balances
+                WalletTransaction.objects.bulk_create([
+                    WalletTransaction(
+                        wallet_id=wallet.id,
+                        transaction_type=WalletTransaction.TransactionType.EXPIRY,
+                        amount=-wallet.balance,
+                        details="Balance expired from Wallet Credit plan."
+                    )
+                    for wallet in wallets
+                ])
+                PartnerWallet.objects.filter(id__in=wallet_ids).update(
+                    balance=Decimal('0.00'), balance_expires_at=None, updated_at=timezone.now()
+                )
+
+                # Deactivate the related subscriptions for these wallet plans
+                partner_ids = [wallet.partner_id for wallet in wallets]
+                subscriptions_closed += PartnerSubscription.objects.filter(
+                    partner_id__in=partner_ids,
+                    plan__plan_type=PartnerPlan.PlanType.WALLET_CREDIT,
+                    is_active=True
+                ).update(is_active=False)
+                refresh_current_subscriptions(partner_ids)
+
+            wallets_reset += len(wallets)
+            self.stdout.write(f"  reset {wallets_reset} wallets so far...")
+
+        self._report("Reset expired wallet balances", wallets_reset, started)
+        self.stdout.write(f"Deactivated {subscriptions_closed} wallet-credit subscriptions.")
@@ -1,32 +1,52 @@
 # partners/management/commands/fix_customer_ids.py
 
+from itertools import groupby
+
 from django.core.management.base import BaseCommand
 from django.db import transaction
-from partner.models import Customer
-from partner.utils import generate_partner_customer_id
+from django.db.models import Q
+from partner.models import Customer, Partner
+from partner.utils import generate_partner_customer_ids
 
 class Command(BaseCommand):
     help = 'Finds all customers without a partner_customer_id and generates one for them.'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows written per bulk_update.')
+
     @transaction.atomic
     def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
         # Find all customers where the ID is null or an empty string
-        customers_to_fix = Customer.objects.filter(partner_customer_id__isnull=True) | Customer.objects.filter(partner_customer_id='')
-        
-        if not customers_to_fix.exists():
+        customers_to_fix = list(
+            Customer.objects.filter(Q(partner_customer_id__isnull=True) | Q(partner_customer_id=''))
+            .order_by('partner_id', 'id')
+            .only('id', 'partner_id')
+        )
+
+        if not customers_to_fix:
             self.stdout.write(self.style.SUCCESS("No customers needed fixing. All have IDs."))
             return
 
-        self.stdout.write(f"Found {customers_to_fix.count()} customers to fix...")
+        self.stdout.write(f"Found {len(customers_to_fix)} customers to fix...")
 
-        fixed_count = 0
-        for customer in customers_to_fix:
+        partners = Partner.objects.in_bulk({customer.partner_id for customer in customers_to_fix})
+
+        fixed = []
+        for partner_pk, group in groupby(customers_to_fix, key=lambda customer: customer.partner_id):
+            group = list(group)
+            partner = partners[partner_pk]
             try:
-                # Generate a new ID using the existing utility function
-                customer.partner_customer_id = generate_partner_customer_id(customer.partner)
-                customer.save()
-                fixed_count += 1
-            except Exception as e:
-                self.stderr.write(self.style.ERROR(f"Could not fix customer {customer.id} ({customer.full_name}): {e}"))
-        
-        self.stdout.write(self.style.SUCCESS(f"Successfully fixed {fixed_count} customers."))
\ No newline at end of file
+                # One counter bump per partner covers the whole group
+                new_ids = generate_partner_customer_ids(partner, len(group))
+            except ValueError as e:
+                self.stderr.write(self.style.ERROR(f"Could not fix {len(group)} customers of {partner}: {e}"))
+                continue
+
+            for customer, new_id in zip(group, new_ids):
+                customer.partner_customer_id = new_id
+            fixed.extend(group)
+
+        Customer.objects.bulk_update(fixed, ['partner_customer_id'], batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Successfully fixed {len(fixed)} customers."))
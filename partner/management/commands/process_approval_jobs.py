@@ -0,0 +1,41 @@
+# partner/management/commands/process_approval_jobs.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from partner.approvals import APPROVAL_CHUNK_SIZE, claim_approval_jobs, run_approval_job
+
+
+class Command(BaseCommand):
+    help = 'Worker that approves large partner request selections queued from the admin (see partner.approvals).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=APPROVAL_CHUNK_SIZE, help='Requests approved per transaction.')
+        parser.add_argument('--sleep', type=float, default=2.0, help='Seconds to wait when the queue is empty.')
+        parser.add_argument('--once', action='store_true', help='Drain the queued jobs and exit instead of polling.')
+
+    def handle(self, *args, **options):
+        self.stdout.write("Approval worker started.")
+
+        while True:
+            jobs = claim_approval_jobs(1)
+            if not jobs:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+
+            job = jobs[0]
+            started = time.monotonic()
+            if run_approval_job(job, chunk_size=options['chunk_size']):
+                self.stdout.write(self.style.SUCCESS(
+                    f"Approval job #{job.pk}: {job.approved} approved, {job.error_count} rejected "
+                    f"of {job.total} in {time.monotonic() - started:.1f}s."
+                ))
+            else:
+                self.stderr.write(self.style.ERROR(
+                    f"Approval job #{job.pk} stopped at {job.processed}/{job.total}: {job.last_error}"
+                ))
+
+        self.stdout.write(self.style.SUCCESS("Approval queue drained."))
@@ -0,0 +1,30 @@
+# partner/management/commands/rebuild_partner_stats.py
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from partner.models import Partner
+from partner.stats import rebuild_partner_stats
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the denormalized PartnerStats rows from customers and orders.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--partner', action='append', default=[], help='Partner ID (e.g. PRT-2025-0001); may be repeated.')
+
+    def handle(self, *args, **options):
+        partner_ids = None
+        if options['partner']:
+            found = dict(Partner.objects.filter(partner_id__in=options['partner']).values_list('partner_id', 'pk'))
+            missing = sorted(set(options['partner']) - set(found))
+            if missing:
+                raise CommandError(f"Unknown partner ID(s): {', '.join(missing)}")
+            partner_ids = found.values()
+
+        started = time.monotonic()
+        rebuilt = rebuild_partner_stats(partner_ids)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt stats for {rebuilt} partner(s) in {time.monotonic() - started:.1f}s."
+        ))
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-18 03:36
+
+from django.db import migrations, models
+
+
+def seed_next_customer_seq(apps, schema_editor):
+    """Continue each partner's sequence after the highest customer id already issued."""
+    Partner = apps.get_model('partner', 'Partner')
+    Customer = apps.get_model('partner', 'Customer')
+
+    last_seq = {}
+    for partner_id, customer_id in Customer.objects.values_list('partner_id', 'partner_customer_id'):
+        sequence = (customer_id or '').rpartition('-')[2]
+        if sequence.isdigit():
+            last_seq[partner_id] = max(last_seq.get(partner_id, 0), int(sequence))
+
+    partners = list(Partner.objects.filter(pk__in=last_seq))
+    for partner in partners:
+        partner.next_customer_seq = last_seq[partner.pk] + 1
+    Partner.objects.bulk_update(partners, ['next_customer_seq'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partner', '0004_alter_wallettransaction_transaction_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='partner',
+            name='next_customer_seq',
+            field=models.PositiveIntegerField(default=1, editable=False, help_text="Sequence number the partner's next customer ID will use."),
+        ),
+        migrations.RunPython(seed_next_customer_seq, migrations.RunPython.noop),
+    ]
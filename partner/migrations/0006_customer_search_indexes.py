@@ -0,0 +1,44 @@
+# Generated by Django 5.2.5 on 2026-10-18 03:48
+
+from django.db import migrations, models
+
+# PostgreSQL-only search indexes for partner.customers.search_customers():
+# trigram GIN indexes serve the substring (ILIKE '%q%') name/email lookups,
+# varchar_pattern_ops btrees serve the prefix (LIKE 'q%') phone/ID lookups.
+SEARCH_INDEXES = [
+    ("partner_customer_name_trgm", "USING gin (full_name gin_trgm_ops)"),
+    ("partner_customer_email_trgm", "USING gin (email gin_trgm_ops)"),
+    ("partner_customer_phone_like", "(partner_id, phone varchar_pattern_ops)"),
+    ("partner_customer_cid_like", "(partner_customer_id varchar_pattern_ops)"),
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    table = schema_editor.quote_name(apps.get_model('partner', 'Customer')._meta.db_table)
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, definition in SEARCH_INDEXES:
+        schema_editor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} {definition}")
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in SEARCH_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partner', '0005_partner_next_customer_seq'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['partner', 'full_name', 'id'], name='partner_customer_name_idx'),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
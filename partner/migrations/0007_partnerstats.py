@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:01
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partner', '0006_customer_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PartnerStats',
+            fields=[
+                ('partner', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='partner.partner')),
+                ('customer_count', models.IntegerField(default=0)),
+                ('order_count', models.IntegerField(default=0)),
+                ('orders_placed', models.IntegerField(default=0)),
+                ('orders_in_progress', models.IntegerField(default=0)),
+                ('orders_completed', models.IntegerField(default=0)),
+                ('orders_cancelled', models.IntegerField(default=0)),
+                ('lifetime_spend', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text="Total price of the partner's paid orders.", max_digits=14)),
+                ('last_order_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'partner stats',
+            },
+        ),
+    ]
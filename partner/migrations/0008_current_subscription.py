@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-18 04:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def point_partners_at_active_subscription(apps, schema_editor):
+    Partner = apps.get_model('partner', 'Partner')
+    PartnerSubscription = apps.get_model('partner', 'PartnerSubscription')
+    Partner.objects.update(current_subscription=Subquery(
+        PartnerSubscription.objects.filter(partner=OuterRef('pk'), is_active=True)
+        .order_by('pk').values('pk')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partner', '0007_partnerstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='partner',
+            name='current_subscription',
+            field=models.ForeignKey(blank=True, editable=False, help_text='The active subscription plan checks use; kept in sync by partner.subscriptions.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='partner.partnersubscription'),
+        ),
+        migrations.AddIndex(
+            model_name='partnersubscription',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['partner'], name='active_subscription_idx'),
+        ),
+        migrations.RunPython(point_partners_at_active_subscription, migrations.RunPython.noop),
+    ]
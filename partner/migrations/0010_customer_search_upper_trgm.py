@@ -0,0 +1,42 @@
+from django.db import migrations
+
+# icontains compiles to UPPER("col"::text) LIKE UPPER(%s) on PostgreSQL, which
+# trigram indexes on the raw columns (0006) can't serve. Index that expression.
+OLD_INDEXES = [
+    ("partner_customer_name_trgm", "USING gin (full_name gin_trgm_ops)"),
+    ("partner_customer_email_trgm", "USING gin (email gin_trgm_ops)"),
+]
+NEW_INDEXES = [
+    ("partner_customer_name_upper_trgm", "USING gin (UPPER(full_name::text) gin_trgm_ops)"),
+    ("partner_customer_email_upper_trgm", "USING gin (UPPER(email::text) gin_trgm_ops)"),
+]
+
+
+def _swap(apps, schema_editor, drop, create):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    table = schema_editor.quote_name(apps.get_model('partner', 'Customer')._meta.db_table)
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, definition in create:
+        schema_editor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} {definition}")
+    for name, _ in drop:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+def use_upper_indexes(apps, schema_editor):
+    _swap(apps, schema_editor, drop=OLD_INDEXES, create=NEW_INDEXES)
+
+
+def use_column_indexes(apps, schema_editor):
+    _swap(apps, schema_editor, drop=NEW_INDEXES, create=OLD_INDEXES)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partner', '0009_partnerapprovaljob'),
+    ]
+
+    operations = [
+        migrations.RunPython(use_upper_indexes, use_column_indexes),
+    ]
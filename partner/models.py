@@ -1,6 +1,6 @@
 # partners/models.py
 
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta
@@ -59,21 +59,39 @@ class Partner(models.Model):
     city = models.CharField(max_length=100, blank=True)
     state = models.CharField(max_length=100, blank=True)
     pincode = models.CharField(max_length=10, blank=True)
+    next_customer_seq = models.PositiveIntegerField(
+        default=1, editable=False,
+        help_text="Sequence number the partner's next customer ID will use."
+    )
+    current_subscription = models.ForeignKey(
+        'PartnerSubscription', on_delete=models.SET_NULL, null=True, blank=True,
+        editable=False, related_name='+',
+        help_text="The active subscription plan checks use; kept in sync by partner.subscriptions."
+    )
     # Add other partner-specific fields here
 
     def __str__(self):
         return f"{self.business_name} ({self.partner_id or 'No ID'})"
 
+    # Moved only by single-row UPDATEs (customer ID reservations, subscription
+    # refreshes); a full save from an instance loaded earlier would rewind them.
+    DB_MANAGED_FIELDS = ('next_customer_seq', 'current_subscription')
+
     def save(self, *args, **kwargs):
         from .utils import generate_partner_id
         if not self.partner_id:
             self.partner_id = generate_partner_id() 
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.DB_MANAGED_FIELDS
+            ]
         super().save(*args, **kwargs)
 
     @property
     def has_active_access(self):
         """Checks if the partner has any currently active subscription."""
-        return self.subscriptions.filter(is_active=True).exists()
+        return self.current_subscription_id is not None
 
 class PartnerDocument(models.Model):
     """Stores the documents for an approved partner."""
@@ -96,6 +114,12 @@ class PartnerSubscription(models.Model):
     end_date = models.DateTimeField(null=True, blank=True, help_text="Access expiry date. Null for lifetime plans.")
     is_active = models.BooleanField(default=True, help_text="Controls if the subscription benefits are currently active.")
 
+    class Meta:
+        indexes = [
+            # Only active rows are ever looked up by partner
+            models.Index(fields=['partner'], condition=models.Q(is_active=True), name='active_subscription_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         """
         Sets the end_date and credits the wallet based on the plan type upon creation.
@@ -109,29 +133,53 @@ class PartnerSubscription(models.Model):
 
             # --- FIX: Apply specific logic for Wallet Credit plans ---
             if self.plan.plan_type == PartnerPlan.PlanType.WALLET_CREDIT:
+                from .wallet import credit
                 try:
-                    wallet = self.partner.wallet
-                    wallet.balance += self.plan.price
-                    
                     # Use the calculated end_date for the wallet balance expiry
-                    wallet.balance_expires_at = self.end_date 
-                    wallet.save()
-
-                    # Create a transaction record for the credit
-                    WalletTransaction.objects.create(
-                        wallet=wallet,
-                        transaction_type=WalletTransaction.TransactionType.INITIAL_CREDIT,
-                        amount=self.plan.price,
-                        details=f"Initial credit from '{self.plan.name}' plan purchase."
+                    credit(
+                        self.partner.wallet,
+                        self.plan.price,
+                        WalletTransaction.TransactionType.INITIAL_CREDIT,
+                        details=f"Initial credit from '{self.plan.name}' plan purchase.",
+                        balance_expires_at=self.end_date,
                     )
                 except PartnerWallet.DoesNotExist:
                     # This case should ideally not happen if a wallet is created with a partner
                     pass
 
-        super().save(*args, **kwargs)
+        # Same transaction as the Partner.current_subscription update done by the save signal.
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.partner} on {self.plan.name}"
+# --- Denormalized Stats ---
+
+class PartnerStats(models.Model):
+    """
+    Running totals for the partner dashboard, kept current by partner.stats
+    as customers and orders change. rebuild_partner_stats recomputes them.
+    """
+    partner = models.OneToOneField(Partner, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    customer_count = models.IntegerField(default=0)
+    order_count = models.IntegerField(default=0)
+    orders_placed = models.IntegerField(default=0)
+    orders_in_progress = models.IntegerField(default=0)
+    orders_completed = models.IntegerField(default=0)
+    orders_cancelled = models.IntegerField(default=0)
+    lifetime_spend = models.DecimalField(
+        max_digits=14, decimal_places=2, default=Decimal('0.00'),
+        help_text="Total price of the partner's paid orders."
+    )
+    last_order_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "partner stats"
+
+    def __str__(self):
+        return f"Stats for {self.partner_id}"
+
 # --- Wallet and Transaction Models ---
 
 class PartnerWallet(models.Model):
@@ -201,6 +249,34 @@ class PartnerRequestDocument(models.Model):
     def __str__(self):
         return f"{self.document_type.name} for {self.partner_request.business_name}"
 
+class PartnerApprovalJob(models.Model):
+    """ A large selection of partner requests, approved in chunks by the process_approval_jobs worker. """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    request_ids = models.JSONField(help_text="PartnerRequest ids to approve, in order.")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0, help_text="Requests handled so far; a restarted job resumes here.")
+    approved = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True, help_text="[request id, business name, message] per rejected request.")
+    last_error = models.TextField(blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'created_at'])]
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Approval job #{self.pk}: {self.processed}/{self.total} ({self.status})"
+
 class Customer(models.Model):
     """Represents a customer created by a partner."""
     partner = models.ForeignKey(Partner, on_delete=models.CASCADE, related_name='customers')
@@ -214,6 +290,10 @@ class Customer(models.Model):
     class Meta:
         # A customer's email should be unique for a given partner
         unique_together = ('partner', 'email')
+        indexes = [
+            # Keyset pagination of a partner's customers (partner.customers.paginate_customers)
+            models.Index(fields=['partner', 'full_name', 'id'], name='partner_customer_name_idx'),
+        ]
 
     def __str__(self):
         return f"{self.full_name} ({self.partner_customer_id or 'No ID'})"
@@ -224,4 +304,10 @@ class Customer(models.Model):
         if not self.partner_customer_id:
             # FIX: Uncommented the ID generation logic
             self.partner_customer_id = generate_partner_customer_id(self.partner)
-        super().save(*args, **kwargs)
\ No newline at end of file
+        # Same transaction as the PartnerStats update done by the save signal.
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(savepoint=False):
+            return super().delete(*args, **kwargs)
\ No newline at end of file
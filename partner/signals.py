@@ -0,0 +1,30 @@
+# partner/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Customer, Partner, PartnerStats, PartnerSubscription
+from .stats import record_customers_added
+from .subscriptions import refresh_current_subscriptions
+
+
+@receiver(post_save, sender=Partner)
+def create_partner_stats(sender, instance, created, **kwargs):
+    if created:
+        PartnerStats.objects.get_or_create(partner=instance)
+
+
+@receiver(post_save, sender=Customer)
+def count_new_customer(sender, instance, created, **kwargs):
+    if created:
+        record_customers_added(instance.partner_id)
+
+
+@receiver(post_delete, sender=Customer)
+def count_deleted_customer(sender, instance, **kwargs):
+    record_customers_added(instance.partner_id, -1)
+
+
+@receiver([post_save, post_delete], sender=PartnerSubscription)
+def update_current_subscription(sender, instance, **kwargs):
+    refresh_current_subscriptions([instance.partner_id])
@@ -0,0 +1,146 @@
+# partner/stats.py
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Customer, Partner, PartnerStats
+
+# ServiceOrder fields that decide what an order adds to its partner's stats.
+ORDER_STAT_FIELDS = ('user_id', 'created_at', 'payment_status', 'progress_status', 'price')
+# progress_status -> PartnerStats counter
+ORDER_STATUS_COUNTERS = {
+    'placed': 'orders_placed',
+    'in_progress': 'orders_in_progress',
+    'completed': 'orders_completed',
+    'cancelled': 'orders_cancelled',
+}
+REBUILD_CHUNK_SIZE = 500
+
+
+def _order_contribution(values, sign):
+    contribution = {'order_count': sign}
+    counter = ORDER_STATUS_COUNTERS.get(values['progress_status'])
+    if counter:
+        contribution[counter] = sign
+    if values['payment_status'] == 'paid' and values['price']:
+        contribution['lifetime_spend'] = sign * values['price']
+    return contribution
+
+
+def _apply(stats, deltas, **extra):
+    updates = {name: F(name) + amount for name, amount in deltas.items() if amount}
+    updates.update(extra)
+    if updates:
+        stats.update(**updates)
+
+
+def record_customers_added(partner_id, count=1):
+    PartnerStats.objects.filter(partner_id=partner_id).update(customer_count=F('customer_count') + count)
+
+
+def record_order_change(old, new):
+    """
+    Applies an order create/change/delete to its partner's stats. `old` and
+    `new` are dicts of ORDER_STAT_FIELDS, or None for a created/deleted order.
+    Orders placed by non-partner users match no stats row and change nothing.
+    """
+    if old and new and old['user_id'] == new['user_id']:
+        deltas = _order_contribution(new, 1)
+        for name, amount in _order_contribution(old, -1).items():
+            deltas[name] = deltas.get(name, 0) + amount
+        _apply(PartnerStats.objects.filter(partner__user_id=new['user_id']), deltas)
+        return
+
+    if old:
+        stats = PartnerStats.objects.filter(partner__user_id=old['user_id'])
+        _apply(stats, _order_contribution(old, -1))
+        if new is None:
+            # The deleted order may have been the latest one.
+            _apply(stats, {}, last_order_at=_last_order_at(old['user_id']))
+    if new:
+        created_at = Value(new['created_at'])
+        _apply(
+            PartnerStats.objects.filter(partner__user_id=new['user_id']),
+            _order_contribution(new, 1),
+            last_order_at=Greatest(Coalesce('last_order_at', created_at), created_at),
+        )
+
+
+def _last_order_at(user_id):
+    from services.models import ServiceOrder
+
+    return ServiceOrder.objects.filter(user_id=user_id).aggregate(last=Max('created_at'))['last']
+
+
+def rebuild_partner_stats(partner_ids=None):
+    """
+    Recomputes PartnerStats from the customer and order tables, a chunk of
+    partners per transaction. Returns the number of partners rebuilt.
+    """
+    if partner_ids is None:
+        partner_ids = Partner.objects.order_by('pk').values_list('pk', flat=True)
+    partner_ids = list(partner_ids)
+    for start in range(0, len(partner_ids), REBUILD_CHUNK_SIZE):
+        _rebuild_chunk(partner_ids[start:start + REBUILD_CHUNK_SIZE])
+    return len(partner_ids)
+
+
+def _rebuild_chunk(partner_ids):
+    from services.models import ServiceOrder
+
+    with transaction.atomic():
+        # Row locks make concurrent increments wait for (and apply on top of)
+        # the rebuilt totals instead of being overwritten by them.
+        list(PartnerStats.objects.select_for_update().filter(partner_id__in=partner_ids).values_list('pk'))
+
+        customers = dict(
+            Customer.objects.filter(partner_id__in=partner_ids)
+            .order_by().values('partner_id').annotate(n=Count('id'))
+            .values_list('partner_id', 'n')
+        )
+        status_counts = {
+            counter: Count('id', filter=Q(progress_status=status))
+            for status, counter in ORDER_STATUS_COUNTERS.items()
+        }
+        orders = {
+            row['user__partner']: row
+            for row in ServiceOrder.objects.filter(user__partner__in=partner_ids)
+            .order_by().values('user__partner')
+            .annotate(
+                order_count=Count('id'),
+                lifetime_spend=Sum('price', filter=Q(payment_status='paid')),
+                last_order_at=Max('created_at'),
+                **status_counts,
+            )
+        }
+
+        rows = []
+        for partner_id in partner_ids:
+            totals = orders.get(partner_id, {})
+            rows.append(PartnerStats(
+                partner_id=partner_id,
+                customer_count=customers.get(partner_id, 0),
+                order_count=totals.get('order_count', 0),
+                lifetime_spend=totals.get('lifetime_spend') or 0,
+                last_order_at=totals.get('last_order_at'),
+                **{counter: totals.get(counter, 0) for counter in status_counts},
+            ))
+        PartnerStats.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['partner'],
+            update_fields=[
+                'customer_count', 'order_count', 'lifetime_spend', 'last_order_at', 'updated_at',
+                *status_counts,
+            ],
+        )
+
+
+def get_partner_stats(partner):
+    """The partner's stats row, rebuilding it if it doesn't exist yet."""
+    try:
+        return partner.stats
+    except PartnerStats.DoesNotExist:
+        rebuild_partner_stats([partner.pk])
+        return PartnerStats.objects.get(partner=partner)
@@ -0,0 +1,25 @@
+# partner/subscriptions.py
+
+from django.db.models import OuterRef, Subquery
+
+from .models import Partner, PartnerSubscription
+
+
+def active_subscription_subquery():
+    """The subscription plan checks use: the partner's oldest active one."""
+    return Subquery(
+        PartnerSubscription.objects.filter(partner=OuterRef('pk'), is_active=True)
+        .order_by('pk').values('pk')[:1]
+    )
+
+
+def refresh_current_subscriptions(partner_ids=None):
+    """
+    Re-points Partner.current_subscription in one UPDATE. Call it after
+    subscriptions are activated/deactivated in bulk (queryset.update skips
+    the signal that does this for single saves).
+    """
+    partners = Partner.objects.all()
+    if partner_ids is not None:
+        partners = partners.filter(pk__in=partner_ids)
+    return partners.update(current_subscription=active_subscription_subquery())
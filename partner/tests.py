@@ -0,0 +1,233 @@
+import threading
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.testing import QueryBudgetMixin
+from services.models import Service, ServiceCategory, ServiceOrder
+
+from partner.models import Partner, PartnerPlan, PartnerSubscription, PartnerWallet, WalletTransaction
+from partner.wallet import InsufficientBalance, credit, debit
+
+User = get_user_model()
+
+
+class WalletConcurrencyTests(TransactionTestCase):
+    """Parallel debits and credits against one wallet, each thread on its own connection."""
+
+    THREADS = 8
+    OPERATIONS = 25
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            # Its shared-cache database fails concurrent writers with "table is
+            # locked" instead of making them wait, as PostgreSQL's row locks do.
+            # WalletInterleavingTests covers the same races without threads.
+            self.skipTest("needs a database that can serve concurrent writers")
+        user = User.objects.create_user(email="wallet@example.com", phone="9100000001", password=None)
+        partner = Partner.objects.create(user=user, business_name="Wallet Test")
+        self.wallet = PartnerWallet.objects.create(partner=partner)
+        credit(self.wallet, Decimal('100.00'), WalletTransaction.TransactionType.TOP_UP)
+
+    def _worker(self, index, barrier, outcomes, errors):
+        try:
+            wallet = PartnerWallet.objects.get(pk=self.wallet.pk)
+            barrier.wait()
+            for n in range(self.OPERATIONS):
+                if (index + n) % 3:
+                    try:
+                        debit(wallet, Decimal('7.00'), WalletTransaction.TransactionType.SERVICE_PAYMENT)
+                    except InsufficientBalance:
+                        outcomes.append('refused')
+                    else:
+                        outcomes.append('debit')
+                else:
+                    credit(wallet, Decimal('5.00'), WalletTransaction.TransactionType.TOP_UP)
+                    outcomes.append('credit')
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    def test_no_lost_updates_or_negative_balance(self):
+        barrier = threading.Barrier(self.THREADS)
+        outcomes, errors = [], []
+        threads = [
+            threading.Thread(target=self._worker, args=(i, barrier, outcomes, errors))
+            for i in range(self.THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+        self.wallet.refresh_from_db()
+        ledger = WalletTransaction.objects.filter(wallet=self.wallet)
+        expected = (
+            Decimal('100.00')
+            + Decimal('5.00') * outcomes.count('credit')
+            - Decimal('7.00') * outcomes.count('debit')
+        )
+        self.assertEqual(self.wallet.balance, expected)
+        self.assertEqual(self.wallet.balance, ledger.aggregate(total=Sum('amount'))['total'])
+        self.assertEqual(ledger.count(), 1 + outcomes.count('credit') + outcomes.count('debit'))
+        self.assertGreater(outcomes.count('refused'), 0)
+
+        # Ledger rows are written under the wallet's row lock, so their order is
+        # the order the balance moved in: the running total never dips below 0.
+        running = Decimal('0.00')
+        for amount in ledger.order_by('pk').values_list('amount', flat=True):
+            running += amount
+            self.assertGreaterEqual(running, 0)
+
+
+class WalletInterleavingTests(TestCase):
+    """
+    Runs a second wallet operation at the points where a concurrent caller
+    could get in: after the first one read the wallet, and between its
+    balance UPDATE and its ledger row.
+    """
+
+    def setUp(self):
+        user = User.objects.create_user(email="wallet@example.com", phone="9100000001", password=None)
+        partner = Partner.objects.create(user=user, business_name="Wallet Test")
+        self.wallet = PartnerWallet.objects.create(partner=partner)
+        credit(self.wallet, Decimal('10.00'), WalletTransaction.TransactionType.TOP_UP)
+
+    def _interleave(self, operation):
+        """Runs `operation` once, in the middle of the next _apply call."""
+        create = WalletTransaction.objects.create
+        pending = [operation]
+
+        def create_after(**kwargs):
+            if pending:
+                pending.pop()()
+            return create(**kwargs)
+
+        return mock.patch.object(WalletTransaction.objects, 'create', side_effect=create_after)
+
+    def assertLedgerMatches(self, balance):
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal(balance))
+        total = WalletTransaction.objects.filter(wallet=self.wallet).aggregate(total=Sum('amount'))['total']
+        self.assertEqual(total, Decimal(balance))
+
+    def test_stale_wallet_cannot_overdraw(self):
+        first = PartnerWallet.objects.get(pk=self.wallet.pk)
+        second = PartnerWallet.objects.get(pk=self.wallet.pk)
+        debit(first, Decimal('7.00'), WalletTransaction.TransactionType.SERVICE_PAYMENT)
+        # `second` still holds a balance of 10; the UPDATE must check the row, not it.
+        self.assertEqual(second.balance, Decimal('10.00'))
+        with self.assertRaises(InsufficientBalance):
+            debit(second, Decimal('7.00'), WalletTransaction.TransactionType.SERVICE_PAYMENT)
+        self.assertLedgerMatches('3.00')
+
+    def test_stale_wallet_does_not_overwrite_credit(self):
+        stale = PartnerWallet.objects.get(pk=self.wallet.pk)
+        credit(self.wallet, Decimal('5.00'), WalletTransaction.TransactionType.TOP_UP)
+        debit(stale, Decimal('12.00'), WalletTransaction.TransactionType.SERVICE_PAYMENT)
+        self.assertEqual(stale.balance, Decimal('3.00'))
+        self.assertLedgerMatches('3.00')
+
+    def test_debit_between_update_and_ledger_row_is_refused(self):
+        other = PartnerWallet.objects.get(pk=self.wallet.pk)
+        refused = []
+
+        def competing_debit():
+            try:
+                debit(other, Decimal('7.00'), WalletTransaction.TransactionType.SERVICE_PAYMENT)
+            except InsufficientBalance:
+                refused.append(True)
+
+        with self._interleave(competing_debit):
+            debit(self.wallet, Decimal('7.00'), WalletTransaction.TransactionType.SERVICE_PAYMENT)
+        self.assertEqual(refused, [True])
+        self.assertLedgerMatches('3.00')
+
+    def test_credit_between_update_and_ledger_row_is_kept(self):
+        other = PartnerWallet.objects.get(pk=self.wallet.pk)
+
+        def competing_credit():
+            credit(other, Decimal('5.00'), WalletTransaction.TransactionType.TOP_UP)
+
+        with self._interleave(competing_credit):
+            debit(self.wallet, Decimal('7.00'), WalletTransaction.TransactionType.SERVICE_PAYMENT)
+        self.assertLedgerMatches('8.00')
+
+
+class PartnerAdminChangelistTests(QueryBudgetMixin, TestCase):
+    PARTNERS = 100
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser(email="admin@example.com", phone="9100000000", password=None)
+        plan = PartnerPlan.objects.create(name="Annual", plan_type=PartnerPlan.PlanType.SUBSCRIPTION, price=Decimal('0.00'), duration_days=365)
+        category = ServiceCategory.objects.create(name="Company", icon_class="fa-solid fa-building")
+        service = Service.objects.create(
+            category=category, title="Incorporation", short_description="-", long_description="-",
+            price_user=Decimal('999.00'), price_partner_default=Decimal('799.00'),
+        )
+        for i in range(cls.PARTNERS):
+            user = User.objects.create_user(
+                email=f"partner{i}@example.com", phone=f"92{i:08d}", password=None,
+                first_name=f"First{i}", last_name=f"Last{i}", user_type='partner',
+            )
+            partner = Partner.objects.create(user=user, business_name=f"Partner {i}")
+            PartnerWallet.objects.create(partner=partner, balance=Decimal(i))
+            PartnerSubscription.objects.create(partner=partner, plan=plan, is_active=i % 2 == 0)
+            for _ in range(i % 3):
+                ServiceOrder.objects.create(
+                    user=user, service=service, full_name="Client", email="client@example.com",
+                    phone="9000000000", price=Decimal('799.00'),
+                )
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+
+    def test_changelist_query_count_is_fixed(self):
+        url = reverse('admin:partner_partner_changelist')
+        variants = ['', '?q=Partner'] + [f"?o={sign}{column}" for column in range(1, 9) for sign in ('', '-')]
+        query_counts = set()
+        for query in variants:
+            with CaptureQueriesContext(connection) as captured:
+                response = self.assertWithinBudget(url + query)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.context['cl'].result_list), self.PARTNERS)
+            query_counts.add(len(captured))
+        # One page of 100 partners costs the same whatever the sort or search.
+        self.assertEqual(len(query_counts), 1, query_counts)
+
+
+class PartnerDashboardBudgetTests(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email="dashboard@example.com", phone="9100000002", password=None, user_type='partner',
+        )
+        partner = Partner.objects.create(user=cls.user, business_name="Dashboard Test")
+        PartnerWallet.objects.create(partner=partner, balance=Decimal('500.00'))
+        plan = PartnerPlan.objects.create(name="Annual", plan_type=PartnerPlan.PlanType.SUBSCRIPTION, price=Decimal('0.00'), duration_days=365)
+        PartnerSubscription.objects.create(partner=partner, plan=plan, is_active=True)
+        category = ServiceCategory.objects.create(name="Company", icon_class="fa-solid fa-building")
+        service = Service.objects.create(
+            category=category, title="Incorporation", short_description="-", long_description="-",
+            price_user=Decimal('999.00'), price_partner_default=Decimal('799.00'),
+        )
+        for _ in range(20):
+            ServiceOrder.objects.create(
+                user=cls.user, service=service, full_name="Client", email="client@example.com",
+                phone="9000000000", price=Decimal('799.00'),
+            )
+
+    def test_dashboard(self):
+        self.client.force_login(self.user)
+        response = self.assertWithinBudget(reverse('partner:dashboard'))
+        self.assertEqual(response.status_code, 200)
@@ -31,15 +31,20 @@ urlpatterns = [
     path('upgrade-plan/', views.upgrade_plan, name='upgrade_plan'), 
     path('wallet/', views.wallet_details, name='wallet_details'),
     path('wallet/top-up/', views.top_up_wallet, name='wallet_top_up'),
+    path('wallet/export/', views.export_wallet_transactions, name='export_wallet_transactions'),
 
     # --- Order Management ---
     path("orders/", views.partner_orders, name="orders"),
     path("orders/<int:order_id>/", views.partner_order_detail, name="order_detail"),
+    path("orders/export/", views.export_orders, name="export_orders"),
 
     
     # --- Customer Management ---
     path("customers/", views.partner_customers, name="customers"),
+    path("customers/import/", views.import_customers_view, name="import_customers"),
+    path("customers/export/", views.export_customers, name="export_customers"),
     path("create-order/select-customer/", views.select_customer_for_order, name="select_customer_for_order"),
+    path("api/customers/search/", views.customer_autocomplete, name="customer_autocomplete"),
     path('customers/edit/<int:customer_id>/', views.edit_customer, name='edit_customer'),
     path('customers/delete/<int:customer_id>/', views.delete_customer, name='delete_customer'),
 
@@ -5,50 +5,82 @@ from django.db import transaction
 
 
 
+def _partner_id_prefix():
+    return f"PRT-{datetime.date.today().year}"
+
+
 def generate_partner_id():
     """
     Generates a unique Partner ID in the format PRT-YYYY-NNNN.
     The sequence resets every year.
     e.g., PRT-2025-0001
     """
-    from .models import Partner  # Import locally to avoid circular import issues
-    
-    current_year = datetime.date.today().year
-    prefix = f"PRT-{current_year}"
-    
-    # Use a transaction to prevent race conditions
-    with transaction.atomic():
-        # Lock the table to ensure the sequence is correct
-        last_partner = Partner.objects.select_for_update().filter(partner_id__startswith=prefix).order_by('partner_id').last()
-        
-        if last_partner and last_partner.partner_id:
-            last_sequence = int(last_partner.partner_id.split('-')[-1])
-            new_sequence = last_sequence + 1
-        else:
-            new_sequence = 1
-            
-    return f"{prefix}-{new_sequence:04d}"
+    from core.sequences import next_value  # Import locally to avoid circular import issues
 
+    prefix = _partner_id_prefix()
+    return f"{prefix}-{next_value(prefix):04d}"
 
-def generate_partner_customer_id(partner):
+
+def reserve_partner_ids(n):
+    """Allocates `n` Partner IDs in one round trip, for bulk approvals and imports."""
+    from core.sequences import reserve_block
+
+    prefix = _partner_id_prefix()
+    return [f"{prefix}-{sequence:04d}" for sequence in reserve_block(prefix, n)]
+
+
+def reserve_partner_customer_seqs(partner, n=1):
     """
-    Generates a unique Customer ID for a specific partner.
-    The sequence is per partner.
+    Atomically takes `n` values from the partner's next_customer_seq counter
+    and returns them as a range. A single UPDATE ... RETURNING on PostgreSQL
+    and SQLite; only the partner's own row is locked.
+    """
+    from django.db import connection
+    from django.db.models import F
+    from .models import Partner # Import locally
+
+    if n < 1:
+        raise ValueError("n must be at least 1.")
+
+    if connection.vendor in ('postgresql', 'sqlite'):
+        table = connection.ops.quote_name(Partner._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET next_customer_seq = next_customer_seq + %s "
+                f"WHERE id = %s RETURNING next_customer_seq",
+                [n, partner.pk],
+            )
+            row = cursor.fetchone()
+        if row is None:
+            raise Partner.DoesNotExist(f"Partner #{partner.pk} does not exist.")
+        next_seq = row[0]
+    else:
+        with transaction.atomic():
+            Partner.objects.filter(pk=partner.pk).update(next_customer_seq=F('next_customer_seq') + n)
+            next_seq = Partner.objects.values_list('next_customer_seq', flat=True).get(pk=partner.pk)
+
+    partner.next_customer_seq = next_seq
+    return range(next_seq - n, next_seq)
+
+
+def generate_partner_customer_ids(partner, n):
+    """
+    Generates `n` unique Customer IDs for a specific partner in one round trip.
     e.g., PC-PRT-2025-0001-001
     """
-    from .models import Customer # Import locally
-    
     if not partner.partner_id:
         # This can happen if the partner is being created in the same transaction
         # and their ID hasn't been saved yet. Ensure partner is saved first.
         raise ValueError("Partner must have a valid partner_id to generate a customer ID.")
 
     prefix = f"PC-{partner.partner_id}"
-    
-    with transaction.atomic():
-        # Count existing customers for this specific partner
-        customer_count = Customer.objects.select_for_update().filter(partner=partner).count()
-        new_sequence = customer_count + 1
-        
-    return f"{prefix}-{new_sequence:03d}"
+    return [f"{prefix}-{sequence:03d}" for sequence in reserve_partner_customer_seqs(partner, n)]
+
 
+def generate_partner_customer_id(partner):
+    """
+    Generates a unique Customer ID for a specific partner.
+    The sequence is per partner and never reuses numbers, even after deletions.
+    e.g., PC-PRT-2025-0001-001
+    """
+    return generate_partner_customer_ids(partner, 1)[0]
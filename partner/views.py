@@ -2,7 +2,8 @@
 
 import json
 import random
-from decimal import Decimal
+from uuid import uuid4
+from decimal import Decimal, InvalidOperation
 from django.conf import settings
 from django.contrib.auth import get_user_model, authenticate, login
 from django.contrib.auth.hashers import make_password
@@ -21,11 +22,24 @@ from .models import (
     PartnerPlan, PartnerRequest, PartnerRequestDocument, DocumentType, 
     Partner, PartnerWallet, PartnerSubscription, WalletTransaction, Customer
 )
+from .wallet import credit
+from payments.intents import PaymentIntentMismatch, claim_payment_intent, record_payment_outcome
 from django.utils.crypto import get_random_string 
-from django.core.mail import send_mail
 from django.conf import settings
 from accounts.utils import send_otp_email 
-from .forms import CustomerEditForm
+from accounts.outbox import queue_email
+from .customers import AUTOCOMPLETE_LIMIT, paginate_customers, search_customers
+from accounts.otp import discard_otp, is_otp_verified, issue_otp, verify_otp
+from .forms import CustomerEditForm, CustomerImportForm
+from .imports import ImportFileError, import_customers
+from .stats import get_partner_stats
+from .context import get_partner_or_404
+from .exports import (
+    CUSTOMER_EXPORT_COLUMNS, WALLET_TRANSACTION_EXPORT_COLUMNS,
+    customer_export_queryset, wallet_transaction_export_queryset,
+)
+from core.exports import export_response
+from services.exports import ORDER_EXPORT_COLUMNS, order_export_queryset
 from django.views.decorators.http import require_POST
 
 
@@ -48,6 +62,8 @@ def _get_json_data(request):
 
 # --- AJAX OTP and Validation Views ---
 
+SIGNUP_OTP_SCOPE = "partner_signup"
+
 @csrf_exempt
 def ajax_send_otp(request):
     """
@@ -67,16 +83,11 @@ def ajax_send_otp(request):
     if User.objects.filter(email=email, partner__isnull=False).exists():
         return JsonResponse({"success": False, "message": "A partner with this email already exists."}, status=400)
 
-    # Generate a 6-digit OTP
-    otp = get_random_string(length=6, allowed_chars="0123456789")
-    
-    # Store the OTP in the session for later verification.
-    # We'll use a specific key to avoid conflicts.
-    request.session['signup_otp'] = otp
-    request.session['signup_otp_email'] = email # Store email to verify against
+    # Generate a 6-digit OTP; the shared OTP store handles expiry and attempts.
+    otp = issue_otp(SIGNUP_OTP_SCOPE, email)
     
-    # Set a session expiry for the OTP, e.g., 5 minutes (300 seconds)
-    request.session.set_expiry(300)
+    # Remember which email the OTP was sent to, to verify against.
+    request.session['signup_otp_email'] = email
 
     try:
         send_otp_email(email, otp, context="Partner Signup")
@@ -98,19 +109,18 @@ def ajax_verify_otp(request):
     data = _get_json_data(request)
     otp_entered = data.get('otp', '').strip()
     
-    # Retrieve OTP from session
-    session_otp = request.session.get('signup_otp')
-
-    if not session_otp:
+    email = request.session.get('signup_otp_email')
+    if not email:
         return JsonResponse({"success": False, "message": "OTP has expired or was not sent. Please request a new one."}, status=400)
 
-    if session_otp == otp_entered:
-        # OTP is correct. Clear it from the session to prevent reuse.
-        del request.session['signup_otp']
+    verified, message = verify_otp(SIGNUP_OTP_SCOPE, email, otp_entered)
+    if verified:
+        # OTP is correct. Clear it to prevent reuse.
+        discard_otp(SIGNUP_OTP_SCOPE, email)
         del request.session['signup_otp_email']
         return JsonResponse({"success": True, "message": "OTP verified successfully."})
     else:
-        return JsonResponse({"success": False, "message": "The OTP you entered is incorrect."}, status=400)
+        return JsonResponse({"success": False, "message": message}, status=400)
 
 from django.views.decorators.csrf import csrf_exempt
 from django.http import JsonResponse
@@ -234,7 +244,7 @@ def ajax_signup_submit(request):
 
 
         # Generate order_id for payment
-        order_id = f'plan_{partner_request.id}_{random.randint(1000, 9999)}'
+        order_id = f'plan_{partner_request.id}_{uuid4().hex}'
         partner_request.order_id = order_id
         partner_request.save()
 
@@ -290,17 +300,23 @@ def partner_payment_callback(request):
     order_id = request.GET.get('order_id')
     
     try:
-        partner_request = PartnerRequest.objects.get(order_id=order_id, payment_status='pending')
-        partner_request.payment_status = 'paid'
-        partner_request.save()
-
-        # Redirect to a page that tells the user to wait for admin approval
-        return redirect('partner:waiting_for_approval')
-
+        partner_request = PartnerRequest.objects.get(order_id=order_id)
     except PartnerRequest.DoesNotExist:
         messages.error(request, "Invalid payment order.")
         return redirect('partner:signup')
 
+    try:
+        intent, first = claim_payment_intent(order_id, 'plan_purchase', user=request.user)
+    except PaymentIntentMismatch:
+        messages.error(request, "This payment does not belong to your signup.")
+        return redirect('partner:signup')
+    if first:
+        PartnerRequest.objects.filter(pk=partner_request.pk, payment_status='pending').update(payment_status='paid')
+        record_payment_outcome(intent, reverse('partner:waiting_for_approval'))
+
+    # Redirect to a page that tells the user to wait for admin approval
+    return redirect(intent.result_url or 'partner:waiting_for_approval')
+
 def waiting_for_approval_view(request):
     """Renders a page telling the user to wait for manual approval."""
     return render(request, 'partner/waiting_for_approval.html')
@@ -310,22 +326,17 @@ def waiting_for_approval_view(request):
 
 def partner_dashboard(request):
     """Displays the main dashboard for a logged-in partner."""
-    partner = get_object_or_404(Partner, user=request.user)
-
-    is_partner = hasattr(request.user, 'partner')
-
-    
-    # --- Calculate stats and pass them to the template ---
-    wallet_balance = partner.wallet.balance if hasattr(partner, 'wallet') else 0
-    total_customers = Customer.objects.filter(partner=partner).count()
-    total_orders = ServiceOrder.objects.filter(user=request.user).count() # Uncomment when ServiceOrder is available
+    # request.partner_ctx joins wallet and stats in with the partner: one query.
+    partner = get_partner_or_404(request)
+    stats = get_partner_stats(partner)
 
     context = {
         'partner': partner,
-        'wallet_balance': wallet_balance,
-        'total_customers': total_customers,
-        'total_orders': total_orders, # Uncomment when ServiceOrder is available
-        'is_partner': is_partner,
+        'stats': stats,
+        'wallet_balance': partner.wallet.balance if hasattr(partner, 'wallet') else 0,
+        'total_customers': stats.customer_count,
+        'total_orders': stats.order_count,
+        'is_partner': True,
     }
     return render(request, 'partner/dashboard.html', context)
 
@@ -336,11 +347,11 @@ def upgrade_plan(request):
     """
     Allows a partner to view available plans and subscribe to a new one.
     """
-    if not hasattr(request.user, 'partner'):
+    if not request.partner_ctx.is_partner:
         messages.error(request, "You must be a partner to access this page.")
         return redirect('core:home')
 
-    current_subscription = request.user.partner.subscriptions.filter(is_active=True).first()
+    current_subscription = request.partner_ctx.subscription
     plans = PartnerPlan.objects.all().order_by('price')
 
     if request.method == 'POST':
@@ -355,7 +366,7 @@ def upgrade_plan(request):
         # This will automatically handle the wallet credit/expiration logic
         # if the plan type is WALLET_CREDIT
         new_subscription = PartnerSubscription.objects.create(
-            partner=request.user.partner,
+            partner=request.partner_ctx.partner,
             plan=selected_plan,
             is_active=True,
         )
@@ -379,7 +390,7 @@ def top_up_wallet(request):
     """
     Allows a partner to enter an amount and proceed to payment to top up their wallet.
     """
-    if not hasattr(request.user, 'partner'):
+    if not request.partner_ctx.is_partner:
         messages.error(request, "You must be a partner to access this page.")
         return redirect('core:home') # Or your home page
 
@@ -389,7 +400,7 @@ def top_up_wallet(request):
             amount = form.cleaned_data['amount']
             
             # Generate a unique order_id for this transaction
-            order_id = f"topup_{request.user.partner.id}_{random.randint(1000, 9999)}"
+            order_id = f"topup_{request.partner_ctx.partner.id}_{uuid4().hex}"
             
             # Redirect to your payment page with details
             payment_url = reverse('payments:payment_page') + f'?order_id={order_id}&amount={amount}&purpose=wallet_topup'
@@ -402,11 +413,10 @@ def top_up_wallet(request):
 
 @login_required
 def wallet_details(request):
-    partner = get_object_or_404(Partner, user=request.user)
+    partner = get_partner_or_404(request)
     
-    # This will get the wallet if it exists, or create it if it doesn't.
-    # The 'created' variable is a boolean (True/False) that we don't need here.
-    wallet, created = PartnerWallet.objects.get_or_create(partner=partner)
+    # Use the wallet loaded with the partner, or create it if it doesn't exist.
+    wallet = request.partner_ctx.wallet or PartnerWallet.objects.get_or_create(partner=partner)[0]
     
     transactions = wallet.transactions.order_by('-timestamp')
     context = { 'wallet': wallet, 'transactions': transactions }
@@ -417,8 +427,8 @@ def my_plan_details(request):
     """
     Displays the partner's current active plan details.
     """
-    partner = get_object_or_404(Partner, user=request.user)
-    current_subscription = partner.subscriptions.filter(is_active=True).first()
+    partner = get_partner_or_404(request)
+    current_subscription = request.partner_ctx.subscription
     
     context = {
         'subscription': current_subscription
@@ -431,8 +441,8 @@ def upgrade_plan(request):
     """
     Allows a partner to view available plans and select one to purchase.
     """
-    partner = get_object_or_404(Partner, user=request.user)
-    current_subscription = partner.subscriptions.filter(is_active=True).first()
+    partner = get_partner_or_404(request)
+    current_subscription = request.partner_ctx.subscription
     plans = PartnerPlan.objects.all().order_by('price')
 
     if request.method == 'POST':
@@ -444,7 +454,7 @@ def upgrade_plan(request):
             return redirect('partner:upgrade_plan')
 
         # Generate a unique order ID for this upgrade
-        order_id = f"upgrade_{partner.id}_{plan_id}_{random.randint(1000, 9999)}"
+        order_id = f"upgrade_{partner.id}_{plan_id}_{uuid4().hex}"
         amount = selected_plan.price
         
         # We now pass plan_id in the URL to use it in the callback after payment.
@@ -484,7 +494,7 @@ def partner_customers(request):
     View for listing a partner's customers and handling the 'add new customer' form submission.
     """
     # Get the logged-in partner
-    partner = get_object_or_404(Partner, user=request.user)
+    partner = get_partner_or_404(request)
     
     # Handle the form submission for adding a new customer
     if request.method == 'POST':
@@ -519,19 +529,93 @@ def partner_customers(request):
             messages.error(request, f"An error occurred while saving the customer: {str(e)}")
             return redirect('partner:customers')
 
-    # If it's a GET request, just display the customers page with the list
-    customers = Customer.objects.filter(partner=partner).order_by('full_name')
+    # If it's a GET request, display one keyset page of the (optionally searched) list
+    query = request.GET.get('q', '').strip()
+    page = paginate_customers(
+        search_customers(partner, query),
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
     context = {
-        'customers': customers
+        'customers': page.customers,
+        'page': page,
+        'query': query,
     }
     return render(request, 'partner/customers.html', context)
 
+@login_required
+def import_customers_view(request):
+    """Bulk-creates customers from an uploaded CSV/XLSX and shows a per-row report."""
+    partner = get_partner_or_404(request)
+
+    if request.method == 'POST':
+        form = CustomerImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            try:
+                result = import_customers(partner, form.cleaned_data['file'])
+            except ImportFileError as e:
+                form.add_error('file', str(e))
+            else:
+                if result.created:
+                    messages.success(request, f"Imported {result.created} of {result.rows} customers.")
+                return render(request, 'partner/customer_import.html', {'form': CustomerImportForm(), 'result': result})
+    else:
+        form = CustomerImportForm()
+
+    return render(request, 'partner/customer_import.html', {'form': form})
+
+@login_required
+def export_customers(request):
+    """Streams the partner's own customers as CSV (or XLSX with ?format=xlsx)."""
+    partner = get_partner_or_404(request)
+    customers = customer_export_queryset().filter(partner=partner)
+    return export_response(request, customers, CUSTOMER_EXPORT_COLUMNS, "customers")
+
+@login_required
+def export_orders(request):
+    """Streams the orders the partner has placed."""
+    partner = get_partner_or_404(request)
+    orders = order_export_queryset().filter(user=partner.user)
+    return export_response(request, orders, ORDER_EXPORT_COLUMNS, "orders")
+
+@login_required
+def export_wallet_transactions(request):
+    """Streams the partner's wallet ledger."""
+    partner = get_partner_or_404(request)
+    transactions = wallet_transaction_export_queryset().filter(wallet__partner=partner)
+    return export_response(request, transactions, WALLET_TRANSACTION_EXPORT_COLUMNS, "wallet-transactions")
+
 @login_required
 def select_customer_for_order(request):
     """View for selecting a customer before creating an order."""
-    partner = get_object_or_404(Partner, user=request.user)
-    customers = Customer.objects.filter(partner=partner)
-    return render(request, 'partner/select_customer_for_order.html', {'customers': customers})
+    partner = get_partner_or_404(request)
+    query = request.GET.get('q', '').strip()
+    page = paginate_customers(
+        search_customers(partner, query),
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
+    return render(request, 'partner/select_customer_for_order.html', {
+        'customers': page.customers,
+        'page': page,
+        'query': query,
+    })
+
+
+@login_required
+def customer_autocomplete(request):
+    """JSON search over the partner's customers for the order-selection page."""
+    partner = get_partner_or_404(request)
+    query = request.GET.get('q', '').strip()
+    if len(query) < 2:
+        return JsonResponse({"results": []})
+
+    customers = (
+        search_customers(partner, query)
+        .order_by('full_name', 'id')
+        .values('id', 'full_name', 'email', 'phone', 'partner_customer_id')[:AUTOCOMPLETE_LIMIT]
+    )
+    return JsonResponse({"results": list(customers)})
 
 
 # --- Login View ---
@@ -584,11 +668,11 @@ def payment_success_callback(request):
     amount_str = request.GET.get('amount')
     purpose = request.GET.get('purpose')
     
-    if not hasattr(request.user, 'partner'):
+    if not request.partner_ctx.is_partner:
         messages.error(request, "User is not a valid partner.")
         return redirect('core:home') # Or your main home page
 
-    partner = request.user.partner
+    partner = request.partner_ctx.partner
 
     if not all([order_id, amount_str, purpose]):
         messages.error(request, "Invalid payment callback received.")
@@ -596,31 +680,44 @@ def payment_success_callback(request):
 
     try:
         amount = Decimal(amount_str)
-    except (ValueError, TypeError):
+    except (ValueError, TypeError, InvalidOperation):
         messages.error(request, "Invalid amount in payment callback.")
         return redirect('partner:dashboard')
 
+    try:
+        intent, first = claim_payment_intent(order_id, purpose, amount=amount, user=request.user)
+    except PaymentIntentMismatch:
+        messages.error(request, "This payment does not belong to your account.")
+        return redirect('partner:dashboard')
+    if not first:
+        # Refresh or retry of a callback that already ran: replay, don't credit again.
+        messages.info(request, "This payment has already been processed.")
+        return redirect(intent.result_url or 'partner:dashboard')
+
+    # Trust the amount recorded when the payment was opened over the URL.
+    if intent.amount is not None:
+        amount = intent.amount
+
     if purpose == 'wallet_topup':
-        wallet, created = PartnerWallet.objects.get_or_create(partner=partner)
-        
-        wallet.balance += amount
-        wallet.save()
-        
-        WalletTransaction.objects.create(
-            wallet=wallet,
-            transaction_type=WalletTransaction.TransactionType.TOP_UP,
-            amount=amount,
+        wallet = request.partner_ctx.wallet or PartnerWallet.objects.get_or_create(partner=partner)[0]
+        credit(
+            wallet,
+            amount,
+            WalletTransaction.TransactionType.TOP_UP,
             details=f"Top-up via payment gateway. Order ID: {order_id}"
         )
-        messages.success(request, f"Successfully added ₹{amount} to your wallet.")
+        message = f"Successfully added ₹{amount} to your wallet."
+        record_payment_outcome(intent, reverse('partner:wallet_details'), message)
+        messages.success(request, message)
         return redirect('partner:wallet_details')
     
+    record_payment_outcome(intent, reverse('partner:dashboard'), "Payment processed.")
     messages.info(request, "Payment processed.")
     return redirect('partner:dashboard')
 
 # --- FORGOT PASSWORD LOGIC FOR PARTNERS ---
 
-partner_otp_store = {} 
+PASSWORD_RESET_OTP_SCOPE = "partner_password_reset"
 
 def partner_reset_password_view(request):
     """Render the single-page reset password flow for partners."""
@@ -637,14 +734,12 @@ def partner_ajax_send_otp(request):
             return JsonResponse({"success": False, "message": "No partner account found with that email."})
             
 
-        otp = get_random_string(length=6, allowed_chars="0123456789")
-        partner_otp_store[user.id] = otp
+        otp = issue_otp(PASSWORD_RESET_OTP_SCOPE, user.id)
 
-        send_mail(
-            subject="Partner Password Reset OTP",
-            message=f"Your OTP for LegalMunshi Partner Portal is: {otp}",
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
+        queue_email(
+            "Partner Password Reset OTP",
+            f"Your OTP for LegalMunshi Partner Portal is: {otp}",
+            user.email,
         )
         return JsonResponse({"success": True, "message": "OTP sent to your registered email."})
     return JsonResponse({"success": False, "message": "Invalid request method."})
@@ -660,10 +755,8 @@ def partner_ajax_verify_otp(request):
         except User.DoesNotExist:
             return JsonResponse({"success": False, "message": "Partner account not found."})
 
-        if partner_otp_store.get(user.id) == otp_entered:
-            return JsonResponse({"success": True, "message": "OTP verified."})
-        else:
-            return JsonResponse({"success": False, "message": "Invalid OTP."})
+        verified, message = verify_otp(PASSWORD_RESET_OTP_SCOPE, user.id, otp_entered)
+        return JsonResponse({"success": verified, "message": message})
     return JsonResponse({"success": False, "message": "Invalid request method."})
 
 def partner_ajax_reset_password(request):
@@ -677,9 +770,12 @@ def partner_ajax_reset_password(request):
         except User.DoesNotExist:
             return JsonResponse({"success": False, "message": "Partner account not found."})
 
+        if not is_otp_verified(PASSWORD_RESET_OTP_SCOPE, user.id):
+            return JsonResponse({"success": False, "message": "Please verify the OTP first."})
+
         user.password = make_password(new_password)
         user.save()
-        partner_otp_store.pop(user.id, None)
+        discard_otp(PASSWORD_RESET_OTP_SCOPE, user.id)
         return JsonResponse({"success": True, "message": "Password updated successfully."})
     return JsonResponse({"success": False, "message": "Invalid request method."})
 
@@ -688,7 +784,7 @@ def edit_customer(request, customer_id):
     """
     Handles editing an existing customer's details.
     """
-    partner = get_object_or_404(Partner, user=request.user)
+    partner = get_partner_or_404(request)
     # Security Check: Ensure the customer belongs to the logged-in partner
     customer = get_object_or_404(Customer, id=customer_id, partner=partner)
 
@@ -722,7 +818,7 @@ def delete_customer(request, customer_id):
     """
     Handles the deletion of a customer.
     """
-    partner = get_object_or_404(Partner, user=request.user)
+    partner = get_partner_or_404(request)
     # Security Check: Ensures a partner can only delete their own customers
     customer = get_object_or_404(Customer, id=customer_id, partner=partner)
     
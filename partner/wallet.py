@@ -0,0 +1,56 @@
+# partner/wallet.py
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+class InsufficientBalance(Exception):
+    """Raised when a debit would take a wallet below zero."""
+
+
+def _apply(wallet, delta, transaction_type, details, only_if_covered=False, **extra_fields):
+    """
+    Moves the balance by `delta` with a single conditional UPDATE and writes
+    the matching ledger row in the same transaction. The balance is never read
+    into Python first, so concurrent callers cannot overwrite each other.
+    """
+    from .models import PartnerWallet, WalletTransaction
+
+    with transaction.atomic():
+        wallets = PartnerWallet.objects.filter(pk=wallet.pk)
+        if only_if_covered:
+            wallets = wallets.filter(balance__gte=-delta)
+        updated = wallets.update(balance=F('balance') + delta, updated_at=timezone.now(), **extra_fields)
+        if not updated:
+            raise InsufficientBalance(f"Wallet #{wallet.pk} cannot cover {-delta}.")
+
+        entry = WalletTransaction.objects.create(
+            wallet=wallet,
+            transaction_type=transaction_type,
+            amount=delta,
+            details=details,
+        )
+
+    wallet.refresh_from_db(fields=['balance', 'balance_expires_at', 'updated_at'])
+    return entry
+
+
+def credit(wallet, amount, transaction_type, details="", **extra_fields):
+    """
+    Adds `amount` to the wallet and logs it. Extra keyword arguments are
+    written in the same UPDATE (e.g. balance_expires_at for plan credits).
+    """
+    if amount < 0:
+        raise ValueError("Credit amount cannot be negative.")
+    return _apply(wallet, amount, transaction_type, details, **extra_fields)
+
+
+def debit(wallet, amount, transaction_type, details=""):
+    """
+    Takes `amount` from the wallet and logs it as a negative transaction.
+    Raises InsufficientBalance, leaving the wallet untouched, if it can't cover it.
+    """
+    if amount < 0:
+        raise ValueError("Debit amount cannot be negative.")
+    return _apply(wallet, -amount, transaction_type, details, only_if_covered=True)
@@ -0,0 +1,56 @@
+# payments/intents.py
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import PaymentIntent
+
+
+class PaymentIntentMismatch(Exception):
+    """The order id belongs to an intent opened for another user or purpose."""
+
+
+def open_payment_intent(order_id, purpose, amount=None, user=None):
+    """Records a payment about to be attempted. Re-opening an existing id is a no-op."""
+    intent, _ = PaymentIntent.objects.get_or_create(
+        external_order_id=order_id,
+        defaults={
+            'purpose': purpose,
+            'amount': amount,
+            'user': user if user is not None and user.is_authenticated else None,
+        },
+    )
+    return intent
+
+
+def claim_payment_intent(order_id, purpose, amount=None, user=None):
+    """
+    Moves the intent for `order_id` from pending to succeeded and returns
+    (intent, True) for the first caller only. Every later call returns
+    (intent, False) so the caller can replay intent.result_url instead of
+    repeating its side effects. Raises PaymentIntentMismatch, claiming
+    nothing, when the intent was opened by another user or for another purpose.
+
+    Must run inside the caller's transaction: if the side effects roll back,
+    so does the claim.
+    """
+    if not transaction.get_connection().in_atomic_block:
+        raise RuntimeError("claim_payment_intent() must be called inside transaction.atomic().")
+
+    intent = open_payment_intent(order_id, purpose, amount=amount, user=user)
+    user_id = user.pk if user is not None and user.is_authenticated else None
+    if intent.purpose != purpose or (intent.user_id is not None and intent.user_id != user_id):
+        raise PaymentIntentMismatch(f"Payment {order_id} does not belong to this {purpose} callback.")
+    # The conditional UPDATE takes the row lock, so concurrent callbacks serialize here.
+    claimed = PaymentIntent.objects.filter(pk=intent.pk, state='pending').update(
+        state='succeeded', completed_at=timezone.now()
+    )
+    intent.refresh_from_db()
+    return intent, bool(claimed)
+
+
+def record_payment_outcome(intent, result_url, result_message=""):
+    """Stores what the first callback returned so retries can replay it."""
+    intent.result_url = result_url
+    intent.result_message = result_message
+    intent.save(update_fields=['result_url', 'result_message'])
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 
 class Order(models.Model):
@@ -9,3 +10,38 @@ class Order(models.Model):
     external_order_id = models.CharField(max_length=100, unique=True, null=True, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
+
+
+class PaymentIntent(models.Model):
+    """
+    One row per gateway order id. Payment callbacks claim it atomically, so a
+    refreshed or retried callback replays the stored outcome instead of
+    crediting wallets or marking orders paid a second time.
+    """
+    PURPOSE_CHOICES = [
+        ('wallet_topup', 'Wallet Top-up'),
+        ('plan_upgrade', 'Plan Upgrade'),
+        ('plan_purchase', 'Plan Purchase'),
+        ('service', 'Service Payment'),
+    ]
+    STATE_CHOICES = [
+        ('pending', 'Pending'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    external_order_id = models.CharField(max_length=100, unique=True)
+    purpose = models.CharField(max_length=20, choices=PURPOSE_CHOICES)
+    state = models.CharField(max_length=20, choices=STATE_CHOICES, default='pending')
+    amount = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+
+    # Stored outcome returned to every later hit of the callback
+    result_url = models.CharField(max_length=500, blank=True)
+    result_message = models.CharField(max_length=255, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.get_purpose_display()} {self.external_order_id} ({self.state})"
@@ -1,3 +1,80 @@
+from decimal import Decimal
+from urllib.parse import parse_qs, urlsplit
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
+
+from core.testing import QueryBudgetMixin
+from services.models import Service, ServiceCategory, ServiceOrder
+
+from payments.models import PaymentIntent
+
+User = get_user_model()
+
+
+class ServicePaymentBudgetTests(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="payer@example.com", phone="9100000003", password=None)
+        category = ServiceCategory.objects.create(name="Company", icon_class="fa-solid fa-building")
+        service = Service.objects.create(
+            category=category, title="Incorporation", short_description="-", long_description="-",
+            price_user=Decimal('999.00'), price_partner_default=Decimal('799.00'),
+        )
+        cls.order = ServiceOrder.objects.create(
+            user=cls.user, service=service, full_name="Payer", email="payer@example.com",
+            phone="9100000003", price=Decimal('999.00'), payment_status='pending',
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def _open_gateway_payment(self):
+        """Starts a gateway payment the way checkout does and returns its reference."""
+        response = self.client.post(
+            reverse('services:process_payment', args=[self.order.pk]), {'payment_method': 'gateway'},
+        )
+        payment_page_url = response['Location']
+        self.assertEqual(self.assertWithinBudget(payment_page_url).status_code, 200)
+        return parse_qs(urlsplit(payment_page_url).query)['order_id'][0]
+
+    def test_gateway_round_trip(self):
+        payment_ref = self._open_gateway_payment()
+        self.assertNotEqual(payment_ref, str(self.order.pk))
+        self.assertEqual(PaymentIntent.objects.get(external_order_id=payment_ref).state, 'pending')
+
+        success_url = reverse('payments:payment_success', kwargs={'order_id': payment_ref}) + "?purpose=service"
+        response = self.assertWithinBudget(success_url)
+        service_success_url = response['Location']
+        self.assertEqual(self.assertWithinBudget(service_success_url).status_code, 200)
+        self.order.refresh_from_db()
+        self.assertEqual((self.order.payment_status, self.order.payment_method), ('paid', 'gateway'))
+        self.assertEqual(self.order.invoice_status, 'queued')
+
+        # A replayed callback is answered from the stored outcome.
+        response = self.assertWithinBudget(success_url)
+        self.assertEqual(response['Location'], service_success_url)
+
+    def test_success_needs_an_opened_reference(self):
+        # The bare order id is no longer a payment reference; a made-up one was never opened.
+        for payment_ref, status_code in ((str(self.order.pk), 404), (f"service_{self.order.pk}_{'0' * 32}", 400)):
+            response = self.client.get(reverse('payments:service_success', kwargs={'order_id': payment_ref}))
+            self.assertEqual(response.status_code, status_code)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.payment_status, 'pending')
+
+    def test_success_is_scoped_to_the_order_owner(self):
+        payment_ref = self._open_gateway_payment()
+        url = reverse('payments:service_success', kwargs={'order_id': payment_ref})
+
+        self.client.logout()
+        self.assertEqual(self.client.get(url).status_code, 302)
+        other = User.objects.create_user(email="other@example.com", phone="9100000004", password=None)
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(url).status_code, 404)
 
-# Create your tests here.
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.payment_status, 'pending')
+        self.assertEqual(PaymentIntent.objects.get(external_order_id=payment_ref).state, 'pending')
@@ -13,7 +13,9 @@ from django.contrib.auth.decorators import login_required
 from services.models import ServiceOrder
 from partner.models import PartnerRequest, PartnerWallet, WalletTransaction
 from partner.models import Partner # Assuming this model is in partners.models
-from services.utils import generate_invoice
+from services.invoices import enqueue_invoice
+from .intents import PaymentIntentMismatch, claim_payment_intent, open_payment_intent, record_payment_outcome
+from .models import PaymentIntent
 
 
 
@@ -41,7 +43,11 @@ def payment_page(request):
         messages.error(request, "An invalid amount was specified in the payment link.")
         return redirect('partner:dashboard') # Redirect to a safe page
         
-    # 3. If all checks pass, build the context and render the template
+    # 3. Record the intent so the success callback can only be applied once
+    if purpose in dict(PaymentIntent.PURPOSE_CHOICES):
+        open_payment_intent(order_id, purpose, amount=amount_decimal, user=request.user)
+
+    # 4. If all checks pass, build the context and render the template
     context = {
         "order_id": order_id,
         "amount": amount_decimal,
@@ -69,6 +75,11 @@ def payment_success(request, order_id):
     if not order_id:
         return HttpResponseBadRequest("Missing order_id parameter.")
 
+    # Already handled: replay the stored outcome without touching anything else.
+    intent = PaymentIntent.objects.filter(external_order_id=order_id, state='succeeded').first()
+    if intent and intent.result_url:
+        return redirect(intent.result_url)
+
     if purpose == 'plan_purchase':
         try:
             PartnerRequest.objects.get(order_id=order_id)
@@ -78,11 +89,10 @@ def payment_success(request, order_id):
             return HttpResponseBadRequest("Invalid order ID for a partner plan.")
     
     elif purpose == 'service':
-        try:
-            ServiceOrder.objects.get(pk=order_id)
-            return redirect(reverse('payments:service_success', kwargs={'order_id': order_id}))
-        except ObjectDoesNotExist:
+        order_pk = service_order_pk(order_id)
+        if order_pk is None or not ServiceOrder.objects.filter(pk=order_pk).exists():
             return HttpResponseBadRequest("Invalid order ID for a service.")
+        return redirect(reverse('payments:service_success', kwargs={'order_id': order_id}))
 
     # --- Routing for Partner Wallet Top-Up ---
     elif purpose == 'wallet_topup':
@@ -112,17 +122,42 @@ def service_payment_page(request):
     """
     return render(request, "payments/service_checkout.html")
 
+def service_order_pk(payment_ref):
+    """
+    The ServiceOrder pk inside a 'service_<pk>_<hex>' gateway reference from
+    services.views.process_service_payment, or None if it isn't one.
+    """
+    prefix, _, rest = payment_ref.partition('_')
+    order_pk, _, token = rest.partition('_')
+    if prefix != 'service' or not order_pk.isdigit() or not token:
+        return None
+    return int(order_pk)
+
+
+@login_required
 def service_payment_success(request, order_id):
-    order = get_object_or_404(ServiceOrder, pk=order_id)
-    
-    if order.payment_status != 'paid':
-        order.payment_status = 'paid'
-        order.payment_method = 'gateway'
-        order.save()
-
-    if not order.invoice:
-        generate_invoice(order)
-        order.refresh_from_db()
+    """`order_id` is the gateway reference the payment page was opened with."""
+    order = get_object_or_404(ServiceOrder, pk=service_order_pk(order_id), user=request.user)
+
+    with transaction.atomic():
+        # Only a reference the payment page opened for this order's price can be claimed.
+        if not PaymentIntent.objects.filter(external_order_id=order_id, purpose='service', amount=order.price).exists():
+            return HttpResponseBadRequest("Unknown payment reference for this order.")
+        try:
+            intent, first = claim_payment_intent(order_id, 'service', amount=order.price, user=request.user)
+        except PaymentIntentMismatch:
+            return HttpResponseBadRequest("This payment does not belong to your account.")
+        if first:
+            if order.payment_status != 'paid' or order.payment_method == 'not_paid':
+                order.payment_status = 'paid'
+                order.payment_method = 'gateway'
+                order.save()
+
+            # The PDF is rendered by the invoice worker; the page shows a placeholder until then.
+            if not order.invoice:
+                enqueue_invoice(order)
+
+            record_payment_outcome(intent, reverse('payments:service_success', kwargs={'order_id': order_id}))
 
     return render(request, "payments/payment_success.html", {"order": order})
 
@@ -5,6 +5,7 @@ from .models import ServiceCategory, Service, ServiceOrder, RequiredDocument, Or
 from import_export import resources
 from import_export.admin import ImportExportModelAdmin
 from .views import service_order_chart 
+from .rollups import update_orders
 from django.urls import path
 
 # --- Inlines for the Admin Panel ---
@@ -96,13 +97,14 @@ class DynamicFieldResponseInline(admin.TabularInline):
 @admin.register(ServiceOrder)
 class ServiceOrderAdmin(ImportExportModelAdmin):
     list_display = ('id', 'service', 'user', 'payment_status', 'progress_status', 'created_at')
+    list_select_related = ('service__category', 'user')
     list_filter = ('payment_status', 'progress_status', 'created_at')
     search_fields = ('user__email', 'service__title', 'user__partner__partner_id')
     actions = ['mark_as_paid', 'mark_as_cancelled', 'mark_in_progress', 'mark_completed']
     
     inlines = [OrderDocumentInline,DynamicFieldResponseInline]
 
-    readonly_fields = ('user', 'customer', 'service', 'price', 'payment_status', 'created_at')
+    readonly_fields = ('user', 'customer', 'service', 'price', 'payment_status', 'invoice_status', 'created_at')
 
     fieldsets = (
         ("Order & Customer Details", {
@@ -122,7 +124,7 @@ class ServiceOrderAdmin(ImportExportModelAdmin):
             "fields": (
                 "returned_document", 
                 "remarks", 
-                "invoice",
+                ("invoice", "invoice_status"),
                 ("payment_status", "progress_status")
             )
         }),
@@ -133,22 +135,22 @@ class ServiceOrderAdmin(ImportExportModelAdmin):
 
     # --- Payment Actions ---
     def mark_as_paid(self, request, queryset):
-        updated = queryset.update(payment_status='paid')
+        updated = update_orders(queryset, payment_status='paid')
         self.message_user(request, f"{updated} order(s) marked as Paid.")
     mark_as_paid.short_description = "Mark selected orders as Paid"
 
     def mark_as_cancelled(self, request, queryset):
-        updated = queryset.update(payment_status='cancelled')
+        updated = update_orders(queryset, payment_status='cancelled')
         self.message_user(request, f"{updated} order(s) marked as Cancelled.")
     mark_as_cancelled.short_description = "Mark selected orders as Cancelled"
 
     def mark_in_progress(self, request, queryset):
-        updated = queryset.update(progress_status='in_progress')
+        updated = update_orders(queryset, progress_status='in_progress')
         self.message_user(request, f"{updated} order(s) marked as In Progress.")
     mark_in_progress.short_description = "Mark selected orders as In Progress"
 
     def mark_completed(self, request, queryset):
-        updated = queryset.update(progress_status='completed')
+        updated = update_orders(queryset, progress_status='completed')
         self.message_user(request, f"{updated} order(s) marked as Completed.")
     mark_completed.short_description = "Mark selected orders as Completed"
 
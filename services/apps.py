@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class ServicesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'services'
+
+    def ready(self):
+        # Connect the catalog cache invalidation receivers.
+        from . import signals  # noqa: F401
@@ -0,0 +1,76 @@
+# services/catalog.py
+
+import time
+
+from django.core.cache import cache
+
+NAVBAR_VERSION_KEY = "services:navbar:version"
+NAVBAR_SNAPSHOT_KEY = "services:navbar:snapshot:{version}"
+NAVBAR_SNAPSHOT_TIMEOUT = 60 * 60 * 24
+
+# Per-process copy of the last snapshot we built or fetched, as a single
+# (version, categories) tuple so readers never see a mismatched pair.
+_local_snapshot = (None, None)
+
+
+def _build_navbar_snapshot():
+    """
+    Reads the category -> service tree from the database and flattens it
+    into plain dicts so it can be pickled into the shared cache.
+    """
+    from .models import ServiceCategory
+
+    categories = []
+    for cat in ServiceCategory.objects.prefetch_related('services').all():
+        categories.append({
+            'id': cat.id,
+            'name': cat.name,
+            'icon_class': cat.icon_class,
+            'services': [
+                {
+                    'title': service.title,
+                    'slug': service.slug,
+                    'icon_class': service.icon_class,
+                    'icon_url': service.icon.url if service.icon else '',
+                }
+                for service in cat.services.all()
+            ],
+        })
+    return categories
+
+
+def get_navbar_version():
+    """Returns the current catalog version, creating one if the cache was cleared."""
+    version = cache.get(NAVBAR_VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(NAVBAR_VERSION_KEY, version, timeout=None):
+            version = cache.get(NAVBAR_VERSION_KEY, version)
+    return version
+
+
+def bump_navbar_version():
+    """Invalidates every process's navbar snapshot."""
+    cache.set(NAVBAR_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def get_navbar_categories():
+    """
+    Returns the navbar catalog, served from process memory when the shared
+    version stamp hasn't moved, then from the shared cache, then from the DB.
+    """
+    global _local_snapshot
+
+    version = get_navbar_version()
+    local_version, local_categories = _local_snapshot
+    if local_version == version:
+        return local_categories
+
+    snapshot_key = NAVBAR_SNAPSHOT_KEY.format(version=version)
+    categories = cache.get(snapshot_key)
+    if categories is None:
+        categories = _build_navbar_snapshot()
+        cache.set(snapshot_key, categories, timeout=NAVBAR_SNAPSHOT_TIMEOUT)
+
+    _local_snapshot = (version, categories)
+    return categories
@@ -1,5 +1,7 @@
-from .models import ServiceCategory
+from django.utils.functional import SimpleLazyObject
+
+from .catalog import get_navbar_categories
 
 def navbar_categories(request):
-    categories = ServiceCategory.objects.prefetch_related('services').all()
-    return {'navbar_categories': categories}
+    # Lazy so responses that never render the navbar never touch the cache/DB.
+    return {'navbar_categories': SimpleLazyObject(get_navbar_categories)}
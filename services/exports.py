@@ -0,0 +1,34 @@
+# services/exports.py
+
+from .models import ServiceOrder
+
+# (header, attribute path) pairs for core.exports.export_response
+ORDER_EXPORT_COLUMNS = [
+    ("Order ID", 'id'),
+    ("Created At", 'created_at'),
+    ("Service", 'service.title'),
+    ("Full Name", 'full_name'),
+    ("Email", 'email'),
+    ("Phone", 'phone'),
+    ("Customer ID", 'customer.partner_customer_id'),
+    ("Placed By", 'user.email'),
+    ("Price", 'price'),
+    ("Payment Status", 'get_payment_status_display'),
+    ("Payment Method", 'get_payment_method_display'),
+    ("Progress", 'get_progress_status_display'),
+    ("Gateway Order ID", 'external_order_id'),
+]
+
+
+def order_export_queryset():
+    """Orders with every exported FK joined in, loading only the exported columns."""
+    return (
+        ServiceOrder.objects
+        .select_related('service', 'user', 'customer')
+        .only(
+            'id', 'created_at', 'full_name', 'email', 'phone', 'price', 'payment_status',
+            'payment_method', 'progress_status', 'external_order_id',
+            'service__title', 'user__email', 'customer__partner_customer_id',
+        )
+        .order_by('id')
+    )
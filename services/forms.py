@@ -3,6 +3,15 @@ from .models import ServiceOrder
 from django.utils.text import slugify
 
 class ServiceOrderForm(forms.ModelForm):
+    """
+    Base order form. Per-service subclasses carrying the document and dynamic
+    fields are built once by get_service_order_form() and reused.
+    """
+    # (form field name, RequiredDocument name) for each upload field
+    document_fields = ()
+    # (form field name, DynamicServiceField id) for each dynamic field
+    dynamic_fields = ()
+
     class Meta:
         model = ServiceOrder
         fields = ['full_name', 'email', 'phone', 'additional_info']
@@ -10,35 +19,61 @@ class ServiceOrderForm(forms.ModelForm):
             'additional_info': forms.Textarea(attrs={'rows': 4}),
         }
 
-    def __init__(self, *args, **kwargs):
-        # Pop dynamic_fields_data and required_docs from kwargs
-        dynamic_fields_data = kwargs.pop('dynamic_fields', [])
-        required_docs = kwargs.pop('required_docs', [])
-        
-        super().__init__(*args, **kwargs)
-
-        # Add dynamic document fields
-        for doc in required_docs:
-            field_name = f'document_{slugify(doc.name)}'
-            self.fields[field_name] = forms.FileField(
-                label=doc.name,
-                required=doc.is_mandatory,
-                help_text=doc.description
-            )
-        
-        for field in dynamic_fields_data:
-            field_name = f'dynamic_field_{slugify(field.name)}'
-            field_label = field.label
-            field_type = field.field_type
-            is_required = field.is_mandatory
-            
-            # Create form field based on the object's attributes
-            if field_type == 'text':
-                self.fields[field_name] = forms.CharField(label=field_label, required=is_required)
-            elif field_type == 'textarea':
-                self.fields[field_name] = forms.CharField(label=field_label, widget=forms.Textarea, required=is_required)
+
+def compile_service_order_form(service, required_docs, dynamic_fields):
+    """
+    Builds a ServiceOrderForm subclass with one field per required document
+    and dynamic field of the service.
+    """
+    attrs = {}
+    document_fields = []
+    dynamic_field_map = []
+
+    # Add dynamic document fields
+    for doc in required_docs:
+        field_name = f'document_{slugify(doc.name)}'
+        attrs[field_name] = forms.FileField(
+            label=doc.name,
+            required=doc.is_mandatory,
+            help_text=doc.description
+        )
+        document_fields.append((field_name, doc.name))
+
+    for field in dynamic_fields:
+        field_name = f'dynamic_field_{slugify(field.name)}'
+
+        # Create form field based on the object's attributes
+        if field.field_type == 'text':
+            attrs[field_name] = forms.CharField(label=field.label, required=field.is_mandatory)
+        elif field.field_type == 'textarea':
+            attrs[field_name] = forms.CharField(label=field.label, widget=forms.Textarea, required=field.is_mandatory)
+        else:
             # Add other field types (number, etc.) here
+            continue
+        dynamic_field_map.append((field_name, field.pk))
 
-    class Meta:
-        model = ServiceOrder
-        fields = ['full_name', 'email', 'phone', 'additional_info']
\ No newline at end of file
+    attrs['document_fields'] = tuple(document_fields)
+    attrs['dynamic_fields'] = tuple(dynamic_field_map)
+    return type(f'ServiceOrderForm_{service.pk}', (ServiceOrderForm,), attrs)
+
+
+# service pk -> (schema_version, form class), filled lazily per process
+_form_class_registry = {}
+
+
+def get_service_order_form(service):
+    """
+    Returns the compiled form class for a service, rebuilding it only when the
+    service's schema_version has moved since it was last compiled.
+    """
+    cached = _form_class_registry.get(service.pk)
+    if cached and cached[0] == service.schema_version:
+        return cached[1]
+
+    form_class = compile_service_order_form(
+        service,
+        list(service.required_documents.all()),
+        list(service.dynamic_fields.order_by('id')),
+    )
+    _form_class_registry[service.pk] = (service.schema_version, form_class)
+    return form_class
@@ -0,0 +1,83 @@
+# services/invoices.py
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import InvoiceJob, ServiceOrder
+
+# Retry delay is RETRY_BASE_DELAY * 2 ** (attempts - 1), capped at RETRY_MAX_DELAY.
+RETRY_BASE_DELAY = timedelta(seconds=30)
+RETRY_MAX_DELAY = timedelta(hours=1)
+# A job still "running" after this long belongs to a worker that died; reclaim it.
+RUNNING_TIMEOUT = timedelta(minutes=10)
+
+
+def enqueue_invoice(order):
+    """
+    Queues the invoice PDF for an order instead of rendering it in the request.
+    Safe to call repeatedly and concurrently: the conditional UPDATE lets only
+    one caller queue a job. Orders that are queued, ready or failed are left
+    alone; retries belong to the worker's backoff and regenerate_invoices.
+    """
+    with transaction.atomic():
+        claimed = ServiceOrder.objects.filter(pk=order.pk).exclude(
+            invoice_status__in=('queued', 'ready', 'failed')
+        ).update(invoice_status='queued')
+        if claimed:
+            InvoiceJob.objects.create(order=order)
+            order.invoice_status = 'queued'
+
+
+def claim_invoice_jobs(limit):
+    """
+    Marks up to `limit` due jobs as running and returns them. Rows locked by
+    another worker are skipped, so several workers can drain the table at once.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            InvoiceJob.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status='pending', run_after__lte=now)
+                | Q(status='running', updated_at__lt=now - RUNNING_TIMEOUT)
+            )
+            .order_by('run_after')[:limit]
+        )
+        if jobs:
+            InvoiceJob.objects.filter(pk__in=[job.pk for job in jobs]).update(status='running', updated_at=now)
+    return jobs
+
+
+def run_invoice_job(job):
+    """
+    Renders the invoice for a claimed job. Failures are rescheduled with
+    exponential backoff until max_attempts, then the order is marked failed.
+    Returns True when the invoice was written.
+    """
+    # Imported here so request processes that only enqueue never load WeasyPrint.
+    from .utils import generate_invoice
+
+    job.attempts += 1
+    try:
+        order = ServiceOrder.objects.select_related('service', 'user', 'customer').get(pk=job.order_id)
+        generate_invoice(order)
+    except Exception as e:
+        job.last_error = str(e)
+        if job.attempts >= job.max_attempts:
+            job.status = 'failed'
+            ServiceOrder.objects.filter(pk=job.order_id).update(invoice_status='failed')
+        else:
+            job.status = 'pending'
+            job.run_after = timezone.now() + min(
+                RETRY_BASE_DELAY * 2 ** (job.attempts - 1), RETRY_MAX_DELAY
+            )
+        job.save(update_fields=['attempts', 'status', 'last_error', 'run_after', 'updated_at'])
+        return False
+
+    job.status = 'done'
+    job.last_error = ''
+    job.save(update_fields=['attempts', 'status', 'last_error', 'updated_at'])
+    return True
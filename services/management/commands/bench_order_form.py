@@ -0,0 +1,49 @@
+# services/management/commands/bench_order_form.py
+
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from services.forms import compile_service_order_form
+from services.models import DynamicServiceField, RequiredDocument, Service
+
+
+class Command(BaseCommand):
+    help = 'Micro-benchmarks building the apply form per request vs. reusing the compiled form class.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fields', type=int, default=50, help='Number of dynamic fields (and as many documents).')
+        parser.add_argument('--iterations', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        n = options['fields']
+        iterations = options['iterations']
+
+        # Unsaved instances: the benchmark measures form construction only, not the DB.
+        service = Service(pk=0, title='Benchmark')
+        docs = [
+            RequiredDocument(name=f'Document {i}', description='', is_mandatory=i % 2 == 0)
+            for i in range(n)
+        ]
+        fields = [
+            DynamicServiceField(pk=i, name=f'field {i}', label=f'Field {i}',
+                                field_type='textarea' if i % 3 == 0 else 'text')
+            for i in range(n)
+        ]
+        initial = {'full_name': 'Bench User', 'email': 'bench@example.com', 'phone': '9999999999'}
+
+        def per_request():
+            compile_service_order_form(service, docs, fields)(initial=initial)
+
+        form_class = compile_service_order_form(service, docs, fields)
+
+        def compiled():
+            form_class(initial=initial)
+
+        rebuild = timeit.timeit(per_request, number=iterations)
+        cached = timeit.timeit(compiled, number=iterations)
+
+        self.stdout.write(f"{n} documents + {n} dynamic fields, {iterations} iterations")
+        self.stdout.write(f"  build per request : {rebuild / iterations * 1e6:9.1f} us/form")
+        self.stdout.write(f"  compiled class    : {cached / iterations * 1e6:9.1f} us/form")
+        self.stdout.write(self.style.SUCCESS(f"Speed-up: {rebuild / cached:.1f}x"))
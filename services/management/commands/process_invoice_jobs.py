@@ -0,0 +1,42 @@
+# services/management/commands/process_invoice_jobs.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from services.invoices import claim_invoice_jobs, run_invoice_job
+
+
+class Command(BaseCommand):
+    help = 'Worker that renders queued invoice PDFs (see services.invoices).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10, help='Jobs claimed per round.')
+        parser.add_argument('--sleep', type=float, default=2.0, help='Seconds to wait when the queue is empty.')
+        parser.add_argument('--once', action='store_true', help='Drain the due jobs and exit instead of polling.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        self.stdout.write("Invoice worker started.")
+
+        while True:
+            jobs = claim_invoice_jobs(batch_size)
+            if not jobs:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+
+            for job in jobs:
+                if run_invoice_job(job):
+                    self.stdout.write(self.style.SUCCESS(f"Rendered invoice for Order #{job.order_id}."))
+                elif job.status == 'failed':
+                    self.stderr.write(self.style.ERROR(
+                        f"Giving up on invoice for Order #{job.order_id} after {job.attempts} attempts: {job.last_error}"
+                    ))
+                else:
+                    self.stderr.write(self.style.WARNING(
+                        f"Invoice for Order #{job.order_id} failed (attempt {job.attempts}), retrying at {job.run_after}: {job.last_error}"
+                    ))
+
+        self.stdout.write(self.style.SUCCESS("Invoice queue drained."))
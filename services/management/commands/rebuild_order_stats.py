@@ -0,0 +1,56 @@
+# services/management/commands/rebuild_order_stats.py
+
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from services.models import ServiceOrder
+from services.rollups import order_day, rebuild_daily_stats
+
+
+class Command(BaseCommand):
+    help = 'Backfills or repairs the daily_order_stats rollup from the ServiceOrder table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='First day to rebuild (YYYY-MM-DD). Defaults to the first order.')
+        parser.add_argument('--until', help='Last day to rebuild (YYYY-MM-DD). Defaults to today.')
+        parser.add_argument('--days', type=int, help='Rebuild only the last N days, e.g. from a nightly cron.')
+        parser.add_argument('--chunk-days', type=int, default=31, help='Days rebuilt per transaction.')
+
+    def _parse_date(self, value):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD.")
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        if options['days']:
+            since, until = today - timedelta(days=options['days'] - 1), today
+        else:
+            bounds = ServiceOrder.objects.aggregate(first=Min('created_at'), last=Max('created_at'))
+            if bounds['first'] is None and not options['since']:
+                self.stdout.write("No orders; nothing to rebuild.")
+                return
+            since = self._parse_date(options['since']) if options['since'] else order_day(bounds['first'])
+            last = order_day(bounds['last']) if bounds['last'] else today
+            until = self._parse_date(options['until']) if options['until'] else max(today, last)
+        if since > until:
+            raise CommandError("--since must not be after --until.")
+
+        started = time.monotonic()
+        rows = 0
+        chunk_start = since
+        while chunk_start <= until:
+            chunk_end = min(chunk_start + timedelta(days=options['chunk_days'] - 1), until)
+            rows += rebuild_daily_stats(chunk_start, chunk_end)
+            self.stdout.write(f"Rebuilt {chunk_start} .. {chunk_end} ({rows} rows so far).")
+            chunk_start = chunk_end + timedelta(days=1)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {rows} rollup rows for {since} .. {until} in {elapsed:.1f}s."
+        ))
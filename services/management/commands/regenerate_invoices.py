@@ -0,0 +1,137 @@
+# services/management/commands/regenerate_invoices.py
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, time as dt_time
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from services.models import ServiceOrder
+
+DEFAULT_CHECKPOINT = os.path.join(settings.BASE_DIR, '.regenerate_invoices.json')
+
+
+def _init_worker():
+    """Runs once in each pool process: sets Django up and warms WeasyPrint."""
+    django.setup()
+    from services.utils import get_invoice_render_assets
+    get_invoice_render_assets()
+
+
+def _render_one(order_id):
+    """Re-renders a single invoice. Returns (order_id, error message or None)."""
+    from services.utils import generate_invoice
+
+    try:
+        order = ServiceOrder.objects.select_related('service', 'user', 'customer').get(pk=order_id)
+        # Writes only the invoice columns; a full save() here would race live edits to the order.
+        generate_invoice(order, replace=True)
+    except Exception as e:
+        return order_id, str(e)
+    return order_id, None
+
+
+class Command(BaseCommand):
+    help = 'Re-renders invoice PDFs for existing orders across a process pool, with resumable checkpoints.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='Only orders created on or after this date (YYYY-MM-DD).')
+        parser.add_argument('--until', help='Only orders created on or before this date (YYYY-MM-DD).')
+        parser.add_argument('--service', action='append', default=[], help='Service slug; may be repeated.')
+        parser.add_argument(
+            '--payment-status', action='append', default=[],
+            choices=[choice for choice, _ in ServiceOrder.PAYMENT_STATUS_CHOICES],
+            help="Payment status to include; may be repeated. Defaults to 'paid'.",
+        )
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--chunk-size', type=int, default=200, help='Order ids fetched and checkpointed per round.')
+        parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT, help='Path of the resume file.')
+        parser.add_argument('--restart', action='store_true', help='Ignore any existing checkpoint.')
+
+    def _parse_date(self, value, end_of_day=False):
+        if not value:
+            return None
+        try:
+            day = datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD.")
+        return timezone.make_aware(datetime.combine(day, dt_time.max if end_of_day else dt_time.min))
+
+    def _load_checkpoint(self, path, filters, restart):
+        if restart or not os.path.exists(path):
+            return {'filters': filters, 'last_id': 0, 'rendered': 0, 'failed': []}
+        with open(path) as fh:
+            state = json.load(fh)
+        if state.get('filters') != filters:
+            self.stdout.write(self.style.WARNING("Checkpoint was written for different filters; starting over."))
+            return {'filters': filters, 'last_id': 0, 'rendered': 0, 'failed': []}
+        self.stdout.write(f"Resuming after order #{state['last_id']} ({state['rendered']} already rendered).")
+        return state
+
+    def _save_checkpoint(self, path, state):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as fh:
+            json.dump(state, fh)
+        os.replace(tmp_path, path)
+
+    def handle(self, *args, **options):
+        filters = {
+            'since': options['since'],
+            'until': options['until'],
+            'services': sorted(options['service']),
+            'payment_statuses': sorted(options['payment_status'] or ['paid']),
+        }
+
+        orders = ServiceOrder.objects.filter(payment_status__in=filters['payment_statuses'])
+        since = self._parse_date(filters['since'])
+        until = self._parse_date(filters['until'], end_of_day=True)
+        if since:
+            orders = orders.filter(created_at__gte=since)
+        if until:
+            orders = orders.filter(created_at__lte=until)
+        if filters['services']:
+            orders = orders.filter(service__slug__in=filters['services'])
+
+        checkpoint = options['checkpoint']
+        state = self._load_checkpoint(checkpoint, filters, options['restart'])
+        chunk_size = options['chunk_size']
+        started = time.monotonic()
+
+        # Workers open their own connections; never share the parent's socket.
+        connections.close_all()
+
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker) as pool:
+            while True:
+                ids = list(
+                    orders.filter(id__gt=state['last_id'])
+                    .order_by('id')
+                    .values_list('id', flat=True)[:chunk_size]
+                )
+                if not ids:
+                    break
+
+                for order_id, error in pool.map(_render_one, ids):
+                    if error:
+                        state['failed'].append(order_id)
+                        self.stderr.write(self.style.ERROR(f"Order #{order_id}: {error}"))
+                    else:
+                        state['rendered'] += 1
+
+                state['last_id'] = ids[-1]
+                self._save_checkpoint(checkpoint, state)
+                self.stdout.write(f"Rendered {state['rendered']} invoices (up to order #{state['last_id']}).")
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {state['rendered']} rendered, {len(state['failed'])} failed in {elapsed:.1f}s."
+        ))
+        if state['failed']:
+            self.stdout.write(f"Failed order ids: {', '.join(map(str, state['failed']))}")
+        elif os.path.exists(checkpoint):
+            os.remove(checkpoint)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 03:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='schema_version',
+            field=models.PositiveIntegerField(default=1, editable=False, help_text='Bumped whenever required documents or dynamic fields change.'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.5 on 2026-10-18 03:32
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def mark_existing_invoices_ready(apps, schema_editor):
+    ServiceOrder = apps.get_model('services', 'ServiceOrder')
+    ServiceOrder.objects.exclude(invoice__isnull=True).exclude(invoice='').update(invoice_status='ready')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0002_service_schema_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='serviceorder',
+            name='invoice_status',
+            field=models.CharField(choices=[('none', 'Not Generated'), ('queued', 'Queued'), ('ready', 'Ready'), ('failed', 'Failed')], default='none', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='InvoiceJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('max_attempts', models.PositiveIntegerField(default=5)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, help_text='Earliest time the worker may pick this job up.')),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='invoice_jobs', to='services.serviceorder')),
+            ],
+            options={
+                'ordering': ['run_after'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='services_in_status_a2be88_idx')],
+            },
+        ),
+        migrations.RunPython(mark_existing_invoices_ready, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-18 03:58
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0003_invoice_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyOrderStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('payment_status', models.CharField(choices=[('pending', 'Pending'), ('paid', 'Paid'), ('failed', 'Failed'), ('refunded', 'Refunded')], max_length=20)),
+                ('progress_status', models.CharField(choices=[('placed', 'Order Placed'), ('in_progress', 'In Progress'), ('completed', 'Completed'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_order_stats', to='services.service')),
+            ],
+            options={
+                'db_table': 'daily_order_stats',
+                'ordering': ['date'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'service', 'payment_status', 'progress_status'), name='daily_order_stats_bucket_uniq')],
+            },
+        ),
+    ]
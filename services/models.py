@@ -1,9 +1,10 @@
 from decimal import Decimal
-from django.db import models
+from django.db import models, transaction
 from django.urls import NoReverseMatch, reverse
 from django.utils.text import slugify
 from django.core.validators import MinValueValidator
 from django.conf import settings
+from django.utils import timezone
 import os
 from partner.models import Customer
 
@@ -56,6 +57,10 @@ class Service(models.Model):
                                                 validators=[MinValueValidator(Decimal('0.00'))])
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    schema_version = models.PositiveIntegerField(
+        default=1, editable=False,
+        help_text="Bumped whenever required documents or dynamic fields change."
+    )
 
     
 
@@ -79,9 +84,18 @@ class Service(models.Model):
             counter += 1
         return slug
 
+    # Moved only by the schema signals' single-row UPDATE; a full save from an
+    # instance loaded earlier (e.g. the admin form) would rewind it.
+    DB_MANAGED_FIELDS = ('schema_version',)
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = self._generate_unique_slug(self.title)
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.DB_MANAGED_FIELDS
+            ]
         super().save(*args, **kwargs)
 
     def get_absolute_url(self):
@@ -242,6 +256,19 @@ class ServiceOrder(models.Model):
         default='placed'
     )
 
+    # ✅ Invoice rendering (done by the process_invoice_jobs worker)
+    INVOICE_STATUS_CHOICES = [
+        ('none', 'Not Generated'),
+        ('queued', 'Queued'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+    invoice_status = models.CharField(
+        max_length=20,
+        choices=INVOICE_STATUS_CHOICES,
+        default='none'
+    )
+
     price = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00'))
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -258,7 +285,9 @@ class ServiceOrder(models.Model):
         indexes = [
             models.Index(fields=['payment_status']),
             models.Index(fields=['progress_status']),
-            models.Index(fields=['created_at'])
+            models.Index(fields=['created_at']),
+            # A user's/partner's orders, newest first
+            models.Index(fields=['user', '-created_at'], name='order_user_created_idx'),
         ]
         ordering = ['-created_at']
 
@@ -266,6 +295,68 @@ class ServiceOrder(models.Model):
         service_name = self.service.title if self.service else "No Service"
         return f"Order #{self.pk} - {service_name} by {self.user.email}"
 
+    def save(self, *args, **kwargs):
+        # The save signals update daily_order_stats and PartnerStats; keep
+        # them in the same transaction as the order row.
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(savepoint=False):
+            return super().delete(*args, **kwargs)
+
+
+class InvoiceJob(models.Model):
+    """ A queued request to render an order's invoice PDF in the background. """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    order = models.ForeignKey(ServiceOrder, on_delete=models.CASCADE, related_name="invoice_jobs")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now, help_text="Earliest time the worker may pick this job up.")
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'run_after'])]
+        ordering = ['run_after']
+
+    def __str__(self):
+        return f"Invoice job for Order #{self.order_id} ({self.status})"
+
+
+class DailyOrderStat(models.Model):
+    """
+    Orders rolled up per local day, service and status pair. Kept current by
+    services.rollups on every order save; rebuild_order_stats repairs it.
+    """
+    date = models.DateField()
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name="daily_order_stats")
+    payment_status = models.CharField(max_length=20, choices=ServiceOrder.PAYMENT_STATUS_CHOICES)
+    progress_status = models.CharField(max_length=20, choices=ServiceOrder.ORDER_PROGRESS_CHOICES)
+    count = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        db_table = 'daily_order_stats'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'service', 'payment_status', 'progress_status'],
+                name='daily_order_stats_bucket_uniq',
+            ),
+        ]
+        ordering = ['date']
+
+    def __str__(self):
+        return f"{self.date} {self.service_id} {self.payment_status}/{self.progress_status}: {self.count}"
+
 
 class DynamicFieldResponse(models.Model):
     """ Stores the user's response for a specific dynamic field in an order. """
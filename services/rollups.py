@@ -0,0 +1,199 @@
+# services/rollups.py
+
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import DailyOrderStat, ServiceOrder
+from .stats import invalidate_dashboard_stats
+
+GRANULARITIES = ('day', 'week', 'month')
+# Fields that decide which DailyOrderStat bucket an order counts towards.
+ROLLUP_FIELDS = ('created_at', 'service_id', 'payment_status', 'progress_status', 'price')
+
+
+def order_day(created_at):
+    """The local calendar day an order belongs to (matches TruncDate below)."""
+    return timezone.localtime(created_at, timezone.get_default_timezone()).date()
+
+
+def order_bucket(values):
+    """(bucket key, revenue) for a dict or object carrying ROLLUP_FIELDS."""
+    get = values.get if isinstance(values, dict) else lambda name: getattr(values, name)
+    key = (order_day(get('created_at')), get('service_id'), get('payment_status'), get('progress_status'))
+    return key, get('price') or Decimal('0.00')
+
+
+def add_to_bucket(key, count, revenue):
+    """
+    Adds count/revenue to one bucket, creating the row on first use. On
+    PostgreSQL and SQLite that is one INSERT ... ON CONFLICT DO UPDATE, so a
+    new bucket costs the same single query as an existing one.
+    """
+    day, service_id, payment_status, progress_status = key
+    if connection.vendor in ('postgresql', 'sqlite'):
+        table = connection.ops.quote_name(DailyOrderStat._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (date, service_id, payment_status, progress_status, count, revenue) "
+                f"VALUES (%s, %s, %s, %s, %s, %s) "
+                f"ON CONFLICT (date, service_id, payment_status, progress_status) DO UPDATE SET "
+                f"count = {table}.count + EXCLUDED.count, revenue = {table}.revenue + EXCLUDED.revenue",
+                [
+                    connection.ops.adapt_datefield_value(day), service_id, payment_status, progress_status,
+                    count, connection.ops.adapt_decimalfield_value(revenue),
+                ],
+            )
+        return
+
+    bucket = DailyOrderStat.objects.filter(
+        date=day, service_id=service_id, payment_status=payment_status, progress_status=progress_status,
+    )
+    if bucket.update(count=F('count') + count, revenue=F('revenue') + revenue):
+        return
+    try:
+        with transaction.atomic():
+            DailyOrderStat.objects.create(
+                date=day, service_id=service_id, payment_status=payment_status,
+                progress_status=progress_status, count=count, revenue=revenue,
+            )
+    except IntegrityError:
+        # Another request created the bucket between our UPDATE and INSERT.
+        bucket.update(count=F('count') + count, revenue=F('revenue') + revenue)
+
+
+def record_order_change(old, new):
+    """
+    Moves an order between buckets. `old`/`new` are order_bucket() results,
+    or None for a created/deleted order.
+    """
+    if old == new:
+        return
+    if old is not None:
+        add_to_bucket(old[0], -1, -old[1])
+    if new is not None:
+        add_to_bucket(new[0], 1, new[1])
+
+
+def rebuild_daily_stats(start=None, end=None):
+    """
+    Recomputes the rollup from ServiceOrder for local days start..end
+    (inclusive; either may be None for open-ended). Returns rows written.
+    """
+    stats = DailyOrderStat.objects.all()
+    orders = ServiceOrder.objects.all()
+    if start:
+        stats = stats.filter(date__gte=start)
+        orders = orders.filter(created_at__gte=_day_start(start))
+    if end:
+        stats = stats.filter(date__lte=end)
+        orders = orders.filter(created_at__lt=_day_start(end + timedelta(days=1)))
+
+    rows = (
+        orders.order_by()
+        .annotate(day=TruncDate('created_at', tzinfo=timezone.get_default_timezone()))
+        .values('day', 'service_id', 'payment_status', 'progress_status')
+        .annotate(count=Count('id'), revenue=Sum('price'))
+    )
+    with transaction.atomic():
+        stats.delete()
+        created = DailyOrderStat.objects.bulk_create(
+            [
+                DailyOrderStat(
+                    date=row['day'], service_id=row['service_id'],
+                    payment_status=row['payment_status'], progress_status=row['progress_status'],
+                    count=row['count'], revenue=row['revenue'] or Decimal('0.00'),
+                )
+                for row in rows.iterator()
+            ],
+            batch_size=1000,
+        )
+    return len(created)
+
+
+def update_orders(orders, **changes):
+    """
+    queryset.update() for orders that keeps the rollups right: update() skips
+    the save signals, so the touched days and partners' stats are rebuilt
+    afterwards and the dashboard stats dropped.
+    """
+    from partner.stats import rebuild_partner_stats
+
+    ids = list(orders.values_list('pk', flat=True))
+    touched = ServiceOrder.objects.filter(pk__in=ids)
+    with transaction.atomic():
+        days = {order_day(created_at) for created_at in touched.values_list('created_at', flat=True)}
+        partner_ids = set(touched.values_list('user__partner', flat=True))
+        updated = touched.update(**changes)
+        if 'created_at' in changes:
+            days.update(order_day(created_at) for created_at in touched.values_list('created_at', flat=True))
+        if 'user' in changes or 'user_id' in changes:
+            partner_ids.update(touched.values_list('user__partner', flat=True))
+        for day in sorted(days):
+            rebuild_daily_stats(day, day)
+        partner_ids.discard(None)
+        if partner_ids:
+            rebuild_partner_stats(sorted(partner_ids))
+    invalidate_dashboard_stats()
+    return updated
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min), timezone.get_default_timezone())
+
+
+def _period_start(day, granularity):
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def _periods(start, end, granularity):
+    period = _period_start(start, granularity)
+    while period <= end:
+        yield period
+        if granularity == 'week':
+            period += timedelta(days=7)
+        elif granularity == 'month':
+            period = date(period.year + period.month // 12, period.month % 12 + 1, 1)
+        else:
+            period += timedelta(days=1)
+
+
+def order_chart_data(start, end, granularity='day', service_ids=None):
+    """
+    Order counts and paid revenue per period between start and end (inclusive),
+    read from the rollup so the cost depends on the range, not on history.
+    Periods without orders are included as zeros.
+    """
+    stats = DailyOrderStat.objects.filter(date__gte=start, date__lte=end)
+    if service_ids:
+        stats = stats.filter(service_id__in=service_ids)
+    if granularity == 'week':
+        stats = stats.annotate(period=TruncWeek('date'))
+    elif granularity == 'month':
+        stats = stats.annotate(period=TruncMonth('date'))
+    else:
+        stats = stats.annotate(period=F('date'))
+    totals = {
+        row['period']: row
+        for row in stats.order_by().values('period').annotate(
+            count=Sum('count'),
+            # Only paid orders are revenue, as on the dashboard KPIs.
+            revenue=Coalesce(Sum('revenue', filter=Q(payment_status='paid')), Decimal('0.00')),
+        )
+    }
+
+    periods = list(_periods(start, end, granularity))
+    empty = {'count': 0, 'revenue': Decimal('0.00')}
+    return {
+        'periods': periods,
+        'counts': [totals.get(period, empty)['count'] for period in periods],
+        'revenue': [totals.get(period, empty)['revenue'] for period in periods],
+    }
@@ -0,0 +1,81 @@
+# services/signals.py
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .catalog import bump_navbar_version
+from .models import DynamicServiceField, RequiredDocument, Service, ServiceCategory, ServiceOrder
+from .rollups import ROLLUP_FIELDS, order_bucket, record_order_change
+from .stats import invalidate_dashboard_stats
+from partner.stats import ORDER_STAT_FIELDS, record_order_change as record_partner_order_change
+
+
+@receiver([post_save, post_delete], sender=ServiceCategory)
+@receiver([post_save, post_delete], sender=Service)
+def invalidate_navbar_catalog(sender, **kwargs):
+    """
+    Any change to a category or service makes the cached navbar stale. Bumped
+    on commit, so no request can re-cache the catalog before the change is visible.
+    """
+    transaction.on_commit(bump_navbar_version)
+
+
+@receiver([post_save, post_delete], sender=RequiredDocument)
+@receiver([post_save, post_delete], sender=DynamicServiceField)
+def invalidate_order_form_schema(sender, instance, **kwargs):
+    """
+    Document or dynamic field edits change the shape of the apply form. The
+    version moves after the commit: moved earlier, a worker could recompile the
+    form from the old rows and keep it under the new number.
+    """
+    service_id = instance.service_id
+    transaction.on_commit(lambda: Service.objects.filter(pk=service_id).update(
+        schema_version=F('schema_version') + 1
+    ))
+
+
+# Stored values the order's rollup bucket and partner stats depend on.
+TRACKED_ORDER_FIELDS = tuple(dict.fromkeys(ROLLUP_FIELDS + ORDER_STAT_FIELDS))
+
+
+def _order_values(order):
+    return {name: getattr(order, name) for name in TRACKED_ORDER_FIELDS}
+
+
+@receiver(pre_save, sender=ServiceOrder)
+def remember_order_values(sender, instance, **kwargs):
+    """Reads the stored row so post_save knows what the order is moving away from."""
+    instance._previous_values = None
+    if instance._state.adding or instance.pk is None:
+        return
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and not {'service', 'user', *TRACKED_ORDER_FIELDS} & set(update_fields):
+        instance._previous_values = False  # nothing tracked can change
+        return
+    instance._previous_values = ServiceOrder.objects.filter(pk=instance.pk).values(*TRACKED_ORDER_FIELDS).first()
+
+
+@receiver(post_save, sender=ServiceOrder)
+def update_order_totals(sender, instance, created, **kwargs):
+    """Moves the order between rollup buckets and updates its partner's stats."""
+    previous = None if created else getattr(instance, '_previous_values', None)
+    if previous is False:
+        return
+    current = _order_values(instance)
+    record_order_change(order_bucket(previous) if previous else None, order_bucket(current))
+    record_partner_order_change(previous, current)
+
+
+@receiver(post_delete, sender=ServiceOrder)
+def remove_order_totals(sender, instance, **kwargs):
+    previous = _order_values(instance)
+    record_order_change(order_bucket(previous), None)
+    record_partner_order_change(previous, None)
+
+
+@receiver([post_save, post_delete], sender=ServiceOrder)
+def invalidate_order_stats(sender, **kwargs):
+    """New, edited or deleted orders change the admin dashboard KPIs."""
+    invalidate_dashboard_stats()
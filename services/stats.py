@@ -0,0 +1,55 @@
+# services/stats.py
+
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+
+DASHBOARD_STATS_KEY = "services:dashboard:stats"
+# Short enough that a change made in another process (local-memory cache)
+# shows up quickly; saves in this process drop the entry straight away.
+DASHBOARD_STATS_TIMEOUT = 60
+RECENT_ORDERS_LIMIT = 5
+
+
+def _compute_dashboard_stats():
+    from .models import ServiceOrder
+
+    # One pass over the table: every KPI is a filtered aggregate.
+    stats = ServiceOrder.objects.aggregate(
+        total_orders=Count('id'),
+        pending_orders=Count('id', filter=Q(payment_status='pending')),
+        completed_orders=Count('id', filter=Q(progress_status='completed')),
+        rejected_orders=Count('id', filter=Q(progress_status='cancelled') | Q(payment_status='failed')),
+        total_sales=Sum('price', filter=Q(payment_status='paid')),
+    )
+    stats['total_sales'] = stats['total_sales'] or Decimal('0.00')
+
+    # Plain dicts so the snapshot pickles cheaply into the cache.
+    status_labels = dict(ServiceOrder.ORDER_PROGRESS_CHOICES)
+    stats['recent_orders'] = [
+        {
+            'pk': order['pk'],
+            'service_title': order['service__title'],
+            'full_name': order['full_name'],
+            'progress_status': status_labels.get(order['progress_status'], order['progress_status']),
+            'created_at': order['created_at'],
+        }
+        for order in ServiceOrder.objects.order_by('-created_at').values(
+            'pk', 'service__title', 'full_name', 'progress_status', 'created_at',
+        )[:RECENT_ORDERS_LIMIT]
+    ]
+    return stats
+
+
+def get_dashboard_stats():
+    """Order KPIs and recent orders for the admin dashboard, cached briefly."""
+    stats = cache.get(DASHBOARD_STATS_KEY)
+    if stats is None:
+        stats = _compute_dashboard_stats()
+        cache.set(DASHBOARD_STATS_KEY, stats, timeout=DASHBOARD_STATS_TIMEOUT)
+    return stats
+
+
+def invalidate_dashboard_stats():
+    cache.delete(DASHBOARD_STATS_KEY)
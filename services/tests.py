@@ -0,0 +1,126 @@
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import resolve, reverse
+
+from benchmarks.fixtures import seed_funnel_data
+from benchmarks.scenarios import _order_form_data
+from core.testing import QueryBudgetMixin
+from partner.models import PartnerWallet
+
+from services.models import DailyOrderStat, ServiceOrder
+
+User = get_user_model()
+
+
+class FunnelTestMixin(QueryBudgetMixin):
+    """Catalog, customer and partner from benchmarks.fixtures; uploads go to a temporary MEDIA_ROOT."""
+
+    @classmethod
+    def setUpClass(cls):
+        media_root = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(media_root.cleanup)
+        cls.enterClassContext(override_settings(
+            MEDIA_ROOT=media_root.name,
+            PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+        ))
+        super().setUpClass()
+
+    @classmethod
+    def seed(cls):
+        cls.data = seed_funnel_data(categories=2, services_per_category=3)
+        cls.customer = User.objects.get(email=cls.data['customer_email'])
+        cls.partner_user = User.objects.get(email=cls.data['partner_email'])
+        cls.info_url = reverse('services:info', args=[cls.data['service_slug']])
+        cls.apply_url = reverse('services:apply', args=[cls.data['service_slug']])
+        cls.customer_query = f"?customer_id={cls.data['partner_customer_id']}"
+
+    def apply(self, query='', full_name="Bench Customer"):
+        """Opens and submits the apply form within budget and returns the new order."""
+        self.assertEqual(self.assertWithinBudget(self.apply_url + query).status_code, 200)
+        response = self.assertWithinBudget(
+            self.apply_url + query, 'post', data=_order_form_data(full_name, "client@example.com", "9000000009"),
+        )
+        self.assertEqual(response.status_code, 302)
+        return ServiceOrder.objects.get(pk=resolve(response['Location']).kwargs['order_id'])
+
+
+class ServicePageBudgetTests(FunnelTestMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seed()
+
+    def test_service_info(self):
+        self.client.force_login(self.customer)
+        self.assertEqual(self.assertWithinBudget(self.info_url).status_code, 200)
+        self.client.force_login(self.partner_user)
+        self.assertEqual(self.assertWithinBudget(self.info_url + self.customer_query).status_code, 200)
+
+    def test_apply_form(self):
+        self.client.force_login(self.customer)
+        self.assertEqual(self.assertWithinBudget(self.apply_url).status_code, 200)
+        self.client.force_login(self.partner_user)
+        self.assertEqual(self.assertWithinBudget(self.apply_url + self.customer_query).status_code, 200)
+
+
+class ServiceOrderBudgetTests(FunnelTestMixin, TransactionTestCase):
+    """
+    Requests that write. Run outside a test transaction so the view's own
+    atomic() costs what it does in production instead of two extra savepoint queries.
+    """
+
+    def setUp(self):
+        self.seed()
+
+    def test_apply_creates_order(self):
+        # The first order of the day also creates its rollup bucket.
+        self.assertFalse(DailyOrderStat.objects.exists())
+        self.client.force_login(self.customer)
+        order = self.apply()
+        self.assertEqual(order.user, self.customer)
+        self.assertEqual(order.payment_status, 'pending')
+        self.assertEqual(DailyOrderStat.objects.get().count, 1)
+
+        self.client.force_login(self.partner_user)
+        order = self.apply(self.customer_query, full_name="Bench Client")
+        self.assertEqual(order.customer_id, self.data['partner_customer_id'])
+        self.assertEqual(DailyOrderStat.objects.get().count, 2)
+
+    def test_checkout_and_gateway_hand_off(self):
+        self.client.force_login(self.customer)
+        order = self.apply()
+        self.assertEqual(self.assertWithinBudget(reverse('services:checkout', args=[order.pk])).status_code, 200)
+        response = self.assertWithinBudget(
+            reverse('services:process_payment', args=[order.pk]), 'post', data={'payment_method': 'gateway'},
+        )
+        self.assertTrue(response['Location'].startswith(reverse('payments:payment_page')))
+
+    def test_wallet_payment(self):
+        self.client.force_login(self.partner_user)
+        order = self.apply(self.customer_query, full_name="Bench Client")
+        self.assertEqual(self.assertWithinBudget(reverse('services:checkout', args=[order.pk])).status_code, 200)
+        wallet = PartnerWallet.objects.get(partner__user=self.partner_user)
+        url = reverse('services:process_payment', args=[order.pk])
+
+        response = self.assertWithinBudget(url, 'post', data={'payment_method': 'wallet'})
+        self.assertRedirects(response, reverse('accounts:orders'), fetch_redirect_response=False)
+        order.refresh_from_db()
+        self.assertEqual((order.payment_status, order.payment_method), ('paid', 'wallet'))
+
+        # A second submit finds the order paid and does not debit again.
+        self.assertWithinBudget(url, 'post', data={'payment_method': 'wallet'})
+        balance = wallet.balance
+        wallet.refresh_from_db()
+        self.assertEqual(balance - wallet.balance, order.price)
+
+    def test_wallet_payment_needs_a_partner(self):
+        self.client.force_login(self.customer)
+        order = self.apply()
+        response = self.assertWithinBudget(
+            reverse('services:process_payment', args=[order.pk]), 'post', data={'payment_method': 'wallet'},
+        )
+        self.assertRedirects(response, reverse('services:checkout', args=[order.pk]), fetch_redirect_response=False)
+        order.refresh_from_db()
+        self.assertEqual(order.payment_status, 'pending')
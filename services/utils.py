@@ -1,21 +1,47 @@
 # utils.py
-import os
-from django.conf import settings
+from functools import lru_cache
 from django.template.loader import render_to_string
-from weasyprint import HTML
-from io import BytesIO
-from django.core.files import File
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
+from django.core.files.base import ContentFile
 
-def generate_invoice(order):
-    # Render invoice HTML template
+from .models import ServiceOrder
+
+
+@lru_cache(maxsize=1)
+def get_invoice_render_assets():
+    """
+    Builds WeasyPrint's font configuration and parses the invoice stylesheet.
+    Both are expensive, so each process does it once and reuses the result.
+    """
+    font_config = FontConfiguration()
+    stylesheet = CSS(string=render_to_string('payments/invoice.css'), font_config=font_config)
+    return font_config, [stylesheet]
+
+
+def render_invoice_pdf(order):
+    """Returns the invoice PDF for an order as bytes."""
+    font_config, stylesheets = get_invoice_render_assets()
     html_string = render_to_string('payments/invoice.html', {'order': order})
-    
-    # Create a PDF file in memory
-    pdf_file = BytesIO()
-    HTML(string=html_string).write_pdf(target=pdf_file)
-    
-    # Save PDF to order.invoice
-    pdf_file.seek(0)
+    return HTML(string=html_string).write_pdf(stylesheets=stylesheets, font_config=font_config)
+
+
+def generate_invoice(order, replace=False):
+    """
+    Renders the invoice, stores it through the storage API and marks the
+    order's invoice ready. With replace=True an existing file is deleted first
+    so the new PDF keeps the canonical name instead of getting a random suffix.
+    Only the invoice columns are written: a full save() would put back
+    whatever else changed on the order since it was loaded, and fire the
+    order signals for nothing.
+    """
+    pdf = render_invoice_pdf(order)
+
+    if replace and order.invoice:
+        order.invoice.delete(save=False)
+
     filename = f"invoice_order_{order.id}.pdf"
-    order.invoice.save(filename, File(pdf_file))
+    order.invoice.save(filename, ContentFile(pdf), save=False)
+    order.invoice_status = 'ready'
+    ServiceOrder.objects.filter(pk=order.pk).update(invoice=order.invoice.name, invoice_status='ready')
     return order.invoice
@@ -7,15 +7,18 @@ from django.utils.text import slugify
 from django.urls import reverse
 from django.db import transaction
 from django.http import HttpResponseBadRequest
+from datetime import timedelta
 from decimal import Decimal
+from uuid import uuid4
 
 # App-specific imports
-from .models import Service, ServiceOrder, ServiceCategory, OrderDocument
-from .forms import ServiceOrderForm
-from .utils import generate_invoice
+from .models import Service, ServiceOrder, ServiceCategory, OrderDocument, DynamicFieldResponse
+from .forms import get_service_order_form
+from .invoices import enqueue_invoice
 
 # Cross-app imports
 from partner.models import Partner, Customer, PartnerWallet, WalletTransaction, PartnerPlan
+from partner.wallet import InsufficientBalance, debit
 
 
 
@@ -26,12 +29,8 @@ def service_list(request):
     categories = ServiceCategory.objects.prefetch_related('services').all()
     customer_id = request.GET.get('customer_id')
 
-    is_partner_logged_in = False
-    if request.user.is_authenticated and hasattr(request.user, 'partner'):
-        is_partner_logged_in = True
+    is_partner_logged_in = request.partner_ctx.is_partner
 
-        
-    
     context = {
         "categories": categories,
         "customer_id": customer_id,
@@ -45,7 +44,7 @@ def service_info(request, slug):
     service = get_object_or_404(Service, slug=slug, is_active=True)
     required_documents = service.required_documents.all()
     customer_id = request.GET.get('customer_id')
-    is_partner = request.user.is_authenticated and hasattr(request.user, 'partner')
+    is_partner = request.partner_ctx.is_partner
 
     # ✅ --- NEW REDIRECT LOGIC ---
     # If the user is a partner and no customer_id is in the URL,
@@ -57,19 +56,9 @@ def service_info(request, slug):
         return redirect('partner:select_customer_for_order')
     # --- END OF NEW LOGIC ---
     
-    # Default to B2C pricing
-    price = service.get_price_for_user()
-    is_partner_logged_in = False
-
-    # If user is a partner, update the price and the flag
-    if request.user.is_authenticated and hasattr(request.user, 'partner'):
-        is_partner_logged_in = True
-        price = service.price_partner_default
-
-    # If user is a partner, determine their specific price
-    if request.user.is_authenticated and hasattr(request.user, 'partner'):
-        is_partner_logged_in = True
-        price = service.price_partner_default
+    # Partners pay the partner price; everyone else the B2C price
+    is_partner_logged_in = is_partner
+    price = service.price_partner_default if is_partner else service.get_price_for_user()
 
     # Advanved SEO for Google
     structured_data = {
@@ -108,11 +97,10 @@ def service_order_create(request, slug):
     A single view to handle service order creation for both B2C and Partners.
     """
     service = get_object_or_404(Service, slug=slug, is_active=True)
-    required_documents = service.required_documents.all()
-    is_partner = hasattr(request.user, 'partner')
-    
-    # Get the dynamic fields and notes from the service object
-    dynamic_fields = service.dynamic_fields.all()
+    is_partner = request.partner_ctx.is_partner
+
+    # The form class (documents + dynamic fields) is compiled once per schema version
+    form_class = get_service_order_form(service)
     dynamic_notes = service.notes.all()
 
 
@@ -120,7 +108,7 @@ def service_order_create(request, slug):
     initial_data = {}
 
     if is_partner:
-        partner = request.user.partner
+        partner = request.partner_ctx.partner
         customer_id = request.GET.get('customer_id')
         if not customer_id:
             messages.error(request, "Please select a customer for this order.")
@@ -133,45 +121,34 @@ def service_order_create(request, slug):
         initial_data = {'full_name': request.user.get_full_name(), 'email': request.user.email, 'phone': request.user.phone}
 
     if request.method == 'POST':
-        # Pass dynamic_fields and required_docs to the form
-        form = ServiceOrderForm(
-            request.POST,
-            request.FILES,
-            required_docs=required_documents,
-            dynamic_fields=dynamic_fields
-        )
+        form = form_class(request.POST, request.FILES)
         if form.is_valid():
-            order = form.save(commit=False)
-            order.service = service
-            order.user = request.user
-            order.price = price
-            order.customer = customer
-            
-            # Save dynamic field responses
-            dynamic_responses = {}
-            for field in dynamic_fields:
-                field_name = f'dynamic_field_{slugify(field.name)}'
-                dynamic_responses[field.name] = form.cleaned_data.get(field_name)
-                
-                
-                order.dynamic_field_responses = dynamic_responses
-            order.save()
-
-            for doc in required_documents:
-                field_name = f'document_{slugify(doc.name)}'
-                uploaded_file = request.FILES.get(field_name)
-                if uploaded_file:
-                    OrderDocument.objects.create(order=order, document_name=doc.name, file=uploaded_file)
+            # One transaction for the order and its answers: no half-saved
+            # orders, and one BEGIN/COMMIT instead of one per write.
+            with transaction.atomic():
+                order = form.save(commit=False)
+                order.service = service
+                order.user = request.user
+                order.price = price
+                order.customer = customer
+                order.payment_status = 'pending'
+                order.save()
+
+                # Save dynamic field responses
+                DynamicFieldResponse.objects.bulk_create([
+                    DynamicFieldResponse(order=order, field_id=field_id, value=form.cleaned_data.get(field_name) or '')
+                    for field_name, field_id in form.dynamic_fields
+                ])
+
+                for field_name, document_name in form.document_fields:
+                    uploaded_file = request.FILES.get(field_name)
+                    if uploaded_file:
+                        OrderDocument.objects.create(order=order, document_name=document_name, file=uploaded_file)
             
             messages.success(request, "Application submitted. Please proceed to payment.")
             return redirect('services:checkout', order_id=order.pk)
     else:
-        # Pass dynamic_fields and required_docs to the form on GET
-        form = ServiceOrderForm(
-            initial=initial_data,
-            required_docs=required_documents,
-            dynamic_fields=dynamic_fields
-        )
+        form = form_class(initial=initial_data)
 
     return render(request, "services/service_form.html", {
         "service": service,
@@ -191,14 +168,13 @@ def service_checkout(request, order_id):
     order = get_object_or_404(ServiceOrder, pk=order_id, user=request.user)
     context = {'order': order}
     
-    if hasattr(request.user, 'partner'):
-        partner = request.user.partner
-        active_subscription = partner.subscriptions.filter(is_active=True).first()
-        wallet, created = PartnerWallet.objects.get_or_create(partner=partner)
-        
+    partner_ctx = request.partner_ctx
+    if partner_ctx.is_partner:
+        wallet = partner_ctx.wallet or PartnerWallet.objects.get_or_create(partner=partner_ctx.partner)[0]
+
         context['is_partner'] = True
         context['wallet_balance'] = wallet.balance
-        context['plan_type'] = active_subscription.plan.plan_type if active_subscription else None
+        context['plan_type'] = partner_ctx.plan_type
     
     return render(request, 'services/checkout.html', context)
 
@@ -211,33 +187,43 @@ def process_service_payment(request, order_id):
     if request.method != 'POST':
         return HttpResponseBadRequest("Invalid request method.")
 
-    order = get_object_or_404(ServiceOrder, pk=order_id, user=request.user)
+    # Locked until the transaction ends, so a double-submitted form waits here
+    # and then sees the order already paid instead of debiting again.
+    order = get_object_or_404(ServiceOrder.objects.select_for_update(), pk=order_id, user=request.user)
+    # Orders used to be created 'paid' before checkout; payment_method tells those apart.
+    if order.payment_status == 'paid' and order.payment_method != 'not_paid':
+        messages.info(request, "This order has already been paid.")
+        return redirect('accounts:orders')
+
     payment_method = request.POST.get('payment_method')
 
     if payment_method == 'wallet':
-        partner = request.user.partner
-        wallet = partner.wallet
-        if wallet.balance >= order.price:
-            wallet.balance -= order.price
-            wallet.save()
-            WalletTransaction.objects.create(
-                wallet=wallet,
-                transaction_type=WalletTransaction.TransactionType.SERVICE_PAYMENT,
-                amount=-order.price,
+        wallet = request.partner_ctx.wallet if request.partner_ctx.is_partner else None
+        if wallet is None:
+            messages.error(request, "Wallet payment is only available to partners with a wallet.")
+            return redirect('services:checkout', order_id=order.id)
+        try:
+            debit(
+                wallet,
+                order.price,
+                WalletTransaction.TransactionType.SERVICE_PAYMENT,
                 details=f"Payment for Service Order #{order.id}"
             )
-            order.payment_status = 'paid'
-            order.payment_method = 'wallet'
-            order.save()
-            generate_invoice(order)
-            messages.success(request, "Payment successful! Your order has been placed.")
-            return redirect('accounts:orders')
-        else:
+        except InsufficientBalance:
             messages.error(request, "Insufficient wallet balance.")
             return redirect('partner:wallet_top_up')
 
+        order.payment_status = 'paid'
+        order.payment_method = 'wallet'
+        order.save()
+        enqueue_invoice(order)
+        messages.success(request, "Payment successful! Your order has been placed.")
+        return redirect('accounts:orders')
+
     elif payment_method == 'gateway':
-        return redirect(f"{reverse('payments:payment_page')}?order_id={order.id}&amount={order.price}&purpose=service")
+        # A fresh reference per attempt; the payment intent is keyed on it, not on the guessable order id.
+        payment_ref = f"service_{order.id}_{uuid4().hex}"
+        return redirect(f"{reverse('payments:payment_page')}?order_id={payment_ref}&amount={order.price}&purpose=service")
 
     messages.error(request, "Invalid payment method selected.")
     return redirect('services:checkout', order_id=order.id)
@@ -246,32 +232,51 @@ def process_service_payment(request, order_id):
 
 
 from django.contrib.admin.views.decorators import staff_member_required
-from django.db.models import Count
-from django.db.models.functions import TruncDay
 from django.http import JsonResponse
-from .models import ServiceOrder # Make sure ServiceOrder is imported
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from .rollups import GRANULARITIES, order_chart_data
+
+CHART_DEFAULT_SPAN = {'day': 30, 'week': 7 * 12, 'month': 365}  # days shown when no start is given
+MAX_CHART_SPAN = 3 * 366  # days
 
-# ... your other views ...
 
 @staff_member_required
 def service_order_chart(request):
     """
     Provides data for the service order chart in the admin dashboard.
+    Reads the daily_order_stats rollup. Accepts ?start=/?end= (YYYY-MM-DD),
+    ?granularity=day|week|month and one or more ?service=<id>.
     """
-    # Query to count service orders grouped by the day they were created
-    chart_data = (
-        ServiceOrder.objects
-        .annotate(date=TruncDay('created_at')) # Assumes your model has a 'created_at' field
-        .values('date')
-        .annotate(count=Count('id'))
-        .order_by('date')
-    )
-    
+    granularity = request.GET.get('granularity') or 'day'
+    if granularity not in GRANULARITIES:
+        return JsonResponse({"error": "granularity must be day, week or month."}, status=400)
+
+    try:
+        end = parse_date(request.GET['end']) if request.GET.get('end') else timezone.localdate()
+        start = parse_date(request.GET['start']) if request.GET.get('start') else None
+    except ValueError:
+        end = None
+    if end is None or (request.GET.get('start') and start is None):
+        return JsonResponse({"error": "start and end must be YYYY-MM-DD dates."}, status=400)
+    if start is None:
+        start = end - timedelta(days=CHART_DEFAULT_SPAN[granularity] - 1)
+    if start > end or (end - start).days > MAX_CHART_SPAN:
+        return JsonResponse({"error": f"start must be before end and at most {MAX_CHART_SPAN} days earlier."}, status=400)
+
+    try:
+        service_ids = [int(value) for value in request.GET.getlist('service')]
+    except ValueError:
+        return JsonResponse({"error": "service must be a service id."}, status=400)
+
+    chart = order_chart_data(start, end, granularity, service_ids)
+    label_format = '%b %Y' if granularity == 'month' else '%b %d, %Y'
     # Format the data into lists that Chart.js can read
-    labels = [data['date'].strftime('%b %d, %Y') for data in chart_data]
-    counts = [data['count'] for data in chart_data]
-    
     return JsonResponse({
-        'labels': labels,
-        'data': counts,
-    })
\ No newline at end of file
+        'labels': [period.strftime(label_format) for period in chart['periods']],
+        'data': chart['counts'],
+        'revenue': [float(amount) for amount in chart['revenue']],
+        'granularity': granularity,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+    })